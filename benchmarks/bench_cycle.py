@@ -0,0 +1,219 @@
+"""End-to-end benchmark: poll cycles of ETLNotifier against a synthetic source and stub sinks.
+
+For every (rows, cache size) pair it runs a cold cycle (every row is new and is
+notified to a local HTTP Teams stub and a fake Mongo collection) and a warm
+cycle (every row is already cached). Each cycle reports wall time and the time
+spent in cache load, query processing, sink dispatch, eviction and cache save.
+It also times process_query_results alone against an in-memory cache, then
+repeats the cold cycle under tracemalloc for peak memory and net allocations.
+The cache is pre-seeded with ``cache size`` entries from an unrelated query, so
+load/save/evict costs scale with it. Results are printed as JSON.
+
+    python benchmarks/bench_cycle.py --rows 10,1000,100000 --cache-sizes 0,10000,1000000
+    python benchmarks/bench_cycle.py --cache json --output results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import etl_notifier.main as notifier_main  # noqa: E402
+from etl_notifier.main import ETLNotifier, create_cache_strategy  # noqa: E402
+from etl_notifier.services.cache.entry import CONFIRMED, make_entry  # noqa: E402
+
+from fakes import FakeMongoStrategy, NullCache, SyntheticSource, TeamsStub  # noqa: E402
+
+QUERY = "failures"
+
+
+class BenchNotifier(ETLNotifier):
+    SOURCE_TYPES = {"synthetic": SyntheticSource}
+    NOTIFICATION_TYPES = {**ETLNotifier.NOTIFICATION_TYPES, "fake_mongo": FakeMongoStrategy}
+
+
+class PhaseTimer:
+    """Accumulates wall time spent inside wrapped callables, per phase name."""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+
+    def wrap(self, phase: str, func: Callable) -> Callable:
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[phase] = self.totals.get(phase, 0.0) + time.perf_counter() - start
+
+        return timed
+
+
+def build_config(rows: int, webhook_url: str) -> Dict[str, Any]:
+    return {
+        "notifications": {
+            "teams": {"type": "teams", "webhook_url": webhook_url},
+            "mongo": {"type": "fake_mongo"},
+        },
+        "sources": {"synthetic": {"type": "synthetic", "rows": rows}},
+        "queries": {
+            QUERY: {
+                "source": "synthetic",
+                "notifications": ["teams", "mongo"],
+                "query": {"sql": "synthetic"},
+                "message_single": "Pipeline [{account} - {env}]({url}) failed: {errorMessage}",
+                "message_multiple": "Multiple pipelines failed:",
+            }
+        },
+    }
+
+
+def seed_cache(cache_size: int) -> Dict[str, Any]:
+    now = time.time()
+    entry = make_entry(CONFIRMED, now)
+    return {"historic": {f"Account{i}|Env{i % 4}|2024-01-01 00:00:{i}": dict(entry) for i in range(cache_size)}}
+
+
+@contextmanager
+def timed_notifier(notifier: ETLNotifier, timer: PhaseTimer) -> Iterator[None]:
+    cache = notifier.cache_manager
+    with patch.object(cache, "load", timer.wrap("cache_load", cache.load)), \
+            patch.object(cache, "save", timer.wrap("cache_save", cache.save)), \
+            patch.object(notifier.dispatcher, "dispatch", timer.wrap("dispatch", notifier.dispatcher.dispatch)), \
+            patch.object(notifier, "process_query_results", timer.wrap("process", notifier.process_query_results)), \
+            patch.object(notifier_main, "evict_expired", timer.wrap("evict", notifier_main.evict_expired)):
+        yield
+
+
+def run_cycle(notifier: ETLNotifier) -> Dict[str, float]:
+    timer = PhaseTimer()
+    with timed_notifier(notifier, timer):
+        gc.collect()
+        start = time.perf_counter()
+        notifier.run()
+        total = time.perf_counter() - start
+    phases = {name: round(value, 4) for name, value in timer.totals.items()}
+    # Dispatch happens inside process_query_results; report the two separately
+    phases["process"] = round(phases.get("process", 0.0) - phases.get("dispatch", 0.0), 4)
+    return {"cycle_s": round(total, 4), "phases_s": phases}
+
+
+def make_notifier(rows: int, cache_size: int, cache_type: str, directory: str, stub: TeamsStub) -> ETLNotifier:
+    path = os.path.join(directory, f"cache-{rows}-{cache_size}.{cache_type}")
+    seed = create_cache_strategy(cache_type, path)
+    seed.save(seed_cache(cache_size))
+    seed.close()
+    return BenchNotifier(config=build_config(rows, stub.url), cache_strategy=create_cache_strategy(cache_type, path))
+
+
+def bench_process_only(rows: int, cache_size: int) -> float:
+    # The state machine alone, with no I/O and no sinks
+    notifier = BenchNotifier(config={**build_config(rows, "http://unused"), "notifications": {}}, cache_strategy=NullCache())
+    source = SyntheticSource(rows)
+    cache = seed_cache(cache_size)
+    query_info = {**notifier.config["queries"][QUERY], "notifications": []}
+    gc.collect()
+    start = time.perf_counter()
+    notifier.process_query_results(QUERY, source.stream_records({}), cache, query_info)
+    elapsed = time.perf_counter() - start
+    notifier.close()
+    return round(elapsed, 4)
+
+
+def bench_memory(rows: int, cache_size: int, cache_type: str, directory: str, stub: TeamsStub) -> Dict[str, int]:
+    notifier = make_notifier(rows, cache_size, cache_type, directory, stub)
+    try:
+        gc.collect()
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        notifier.run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        gc.collect()
+        return {"peak_bytes": peak, "net_allocated_blocks": sys.getallocatedblocks() - blocks_before}
+    finally:
+        notifier.close()
+
+
+def bench_scenario(rows: int, cache_size: int, cache_type: str, memory: bool) -> Dict[str, Any]:
+    FakeMongoStrategy.collection.documents = FakeMongoStrategy.collection.calls = 0
+    with tempfile.TemporaryDirectory() as directory, TeamsStub() as stub:
+        notifier = make_notifier(rows, cache_size, cache_type, directory, stub)
+        try:
+            cold = run_cycle(notifier)
+            warm = run_cycle(notifier)
+        finally:
+            notifier.close()
+        result = {
+            "rows": rows,
+            "cache_size": cache_size,
+            "cold": cold,
+            "warm": warm,
+            "process_query_results_s": bench_process_only(rows, cache_size),
+            "teams_posts": stub.requests,
+            "teams_bytes": stub.bytes,
+            "mongo_documents": FakeMongoStrategy.collection.documents,
+        }
+        if memory:
+            result["memory"] = bench_memory(rows, cache_size, cache_type, directory, stub)
+        return result
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(",") if size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_sizes, default=parse_sizes("10,1000,100000"))
+    parser.add_argument("--cache-sizes", type=parse_sizes, default=parse_sizes("0,10000,1000000"))
+    parser.add_argument("--cache", choices=sorted(notifier_main.CACHE_TYPES), default="sqlite")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="write the JSON report to this file as well as stdout")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cache": args.cache,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "scenarios": [
+            bench_scenario(rows, cache_size, args.cache, not args.no_memory)
+            for cache_size in args.cache_sizes
+            for rows in args.rows
+        ],
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
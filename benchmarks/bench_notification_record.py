@@ -0,0 +1,106 @@
+"""Micro-benchmark: NotificationRecord against the previous plain dataclass.
+
+Builds N records the way a large result set does (few distinct accounts and
+environments, fresh driver strings per row that are dropped once mapped),
+then reads each unique key twice as ``process_query_results`` used to.
+Reports construction time, key time and the memory retained by the records.
+
+    python benchmarks/bench_notification_record.py --rows 100000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from etl_notifier.models.notification_record import NotificationRecord  # noqa: E402
+
+
+@dataclass
+class PlainNotificationRecord:
+    account_name: str
+    environment: str
+    start_time: datetime
+    url: Optional[str] = None
+    error_message: Optional[str] = None
+    over_hour: Optional[str] = None
+    run_id: Optional[str] = None
+
+    def get_unique_key(self) -> str:
+        return f"{self.account_name}|{self.environment}|{self.start_time}"
+
+
+def iter_rows(count: int):
+    base = datetime(2025, 1, 1)
+    # Fresh string objects per row, as a database driver returns them
+    return (
+        (
+            "".join(["Account", str(i % 50)]),
+            "".join(["Env", str(i % 4)]),
+            base + timedelta(seconds=i),
+            f"https://adf/{i}",
+            "Activity failed",
+            None,
+            f"run-{i}",
+        )
+        for i in range(count)
+    )
+
+
+def measure(cls, count: int):
+    rows = list(iter_rows(count))
+    gc.collect()
+    start = time.perf_counter()
+    records = [cls(*row) for row in rows]
+    built = time.perf_counter()
+
+    keys_start = time.perf_counter()
+    for record in records:
+        record.get_unique_key()
+        record.get_unique_key()
+    keys_done = time.perf_counter()
+    del records, rows
+
+    gc.collect()
+    tracemalloc.start()
+    records = [cls(*row) for row in iter_rows(count)]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return {
+        "construct_s": round(built - start, 4),
+        "unique_key_x2_s": round(keys_done - keys_start, 4),
+        "retained_bytes": retained,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    baseline = measure(PlainNotificationRecord, args.rows)
+    current = measure(NotificationRecord, args.rows)
+    result = {
+        "rows": args.rows,
+        "baseline": baseline,
+        "current": current,
+        "retained_ratio": round(current["retained_bytes"] / baseline["retained_bytes"], 3),
+        "total_cpu_ratio": round(
+            (current["construct_s"] + current["unique_key_x2_s"])
+            / (baseline["construct_s"] + baseline["unique_key_x2_s"]),
+            3,
+        ),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
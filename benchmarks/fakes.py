@@ -0,0 +1,122 @@
+"""In-process stand-ins used by the end-to-end benchmarks: a synthetic source and stub sinks."""
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+
+from etl_notifier.models.notification_record import NotificationRecord
+from etl_notifier.services.cache import CacheStrategy
+from etl_notifier.services.data_source import DataSource
+from etl_notifier.services.data_source.record_mapper import RecordMapper
+from etl_notifier.services.notification import MongoNotificationStrategy
+
+COLUMNS = list(RecordMapper.COLUMNS.values())
+
+
+class SyntheticSource(DataSource):
+    """Returns ``rows`` failure rows, mapped by column position like DatabaseSource.
+
+    Rows are generated up front so the benchmark measures the notifier, not the generator. Strings are
+    rebuilt per row because a database driver hands out fresh objects for every fetched row.
+    """
+
+    def __init__(self, rows: int, accounts: int = 50, environments: int = 4):
+        base = datetime(2025, 1, 1)
+        self._rows = [
+            (
+                "".join(["Account", str(i % accounts)]),
+                "".join(["Env", str(i % environments)]),
+                base + timedelta(seconds=i),
+                f"https://adf.example/runs/{i}",
+                "Activity failed",
+                None,
+                f"run-{i}",
+            )
+            for i in range(rows)
+        ]
+
+    def execute_query(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [dict(zip(COLUMNS, row)) for row in self._rows]
+
+    def stream_records(self, query: Dict[str, Any]) -> Iterator[NotificationRecord]:
+        return map(RecordMapper(query.get("columns")).bind(COLUMNS), self._rows)
+
+
+class NullCache(CacheStrategy):
+    def load(self) -> Dict[str, Any]:
+        return {}
+
+    def save(self, data: Dict[str, Any]) -> None:
+        pass
+
+
+class TeamsStub:
+    """Local HTTP server accepting webhook posts, counting requests and bytes received."""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub._lock:
+                    stub.requests += 1
+                    stub.bytes += len(body)
+                self.send_response(200)
+                self.send_header("Content-Length", "1")
+                self.end_headers()
+                self.wfile.write(b"1")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/webhook"
+
+    def __enter__(self) -> "TeamsStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FakeCollection:
+    """Counts writes instead of sending them to MongoDB."""
+
+    def __init__(self):
+        self.documents = 0
+        self.calls = 0
+
+    def insert_many(self, docs, ordered=True):
+        self.calls += 1
+        self.documents += len(docs)
+
+    def bulk_write(self, operations, ordered=True):
+        self.calls += 1
+        self.documents += len(operations)
+
+    def create_index(self, *args, **kwargs):
+        return "index"
+
+    def with_options(self, **kwargs):
+        return self
+
+
+class FakeMongoStrategy(MongoNotificationStrategy):
+    # Shared so the benchmark can read the counts after the notifier has built its own instance
+    collection = FakeCollection()
+
+    def __init__(self):
+        # MongoClient connects lazily, so nothing leaves the process once the collection is swapped out
+        super().__init__(connection_string="mongodb://127.0.0.1:1", database="bench", collection="bench")
+        self._col = self.collection
@@ -17,6 +17,7 @@ setup(
         "dev": [
             "pytest",
             "pytest-cov",
+            "hypothesis",
             "black",
             "isort",
             "mypy",
@@ -1,19 +1,54 @@
 #!/usr/bin/env python3
+import contextvars
 import logging
 import os
+import signal
+import threading
 import time
-from typing import Dict, List, Type
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 
 from dotenv import load_dotenv
 
 from etl_notifier.models.notification_record import NotificationRecord
-from etl_notifier.services.cache import CacheStrategy, JsonFileCache
+from etl_notifier.services.cache import CacheStrategy, JsonFileCache, SqliteCache, WriteBehindCache
+from etl_notifier.services.cache.entry import (
+    CONFIRMED,
+    PENDING,
+    WATERMARK_KEY,
+    entry_state,
+    evict_expired,
+    make_entry,
+    make_watermark,
+    watermark_value,
+)
 from etl_notifier.services.config_loader import ConfigLoader
-from etl_notifier.services.data_source import AzureSqlDBSource, DatabaseSource, DataSource
+from etl_notifier.services.data_source import (
+    AzureSqlDBSource,
+    AzureTokenProvider,
+    ConnectionPool,
+    DatabaseSource,
+    DataSource,
+)
+from etl_notifier.services.metrics import MetricsServer, NotifierMetrics
 from etl_notifier.services.notification import MongoNotificationStrategy, NotificationStrategy, TeamsNotificationStrategy
+from etl_notifier.services.notification.coalescing import CoalescingStrategy
+from etl_notifier.services.notification.dispatcher import NotificationDispatcher
+from etl_notifier.services.notification.http_session import close_sessions
+from etl_notifier.services.notification.outbox import OutboxWorker, SqliteOutbox
+from etl_notifier.services.notification.rate_limit import RateLimitedStrategy
+from etl_notifier.services.profiling import CycleProfiler, install_signal_handler
+from etl_notifier.services.scheduler import QueryScheduler, build_schedule
+from etl_notifier.services.tracing import JsonlFileExporter, Tracer, current_span
 
 logger = logging.getLogger(__name__)
 
+CACHE_TYPES: Dict[str, Tuple[Type[CacheStrategy], str]] = {
+    "json": (JsonFileCache, "cache.json"),
+    "sqlite": (SqliteCache, "cache.db"),
+}
+
 
 class ETLNotifier:
     SOURCE_TYPES: Dict[str, Type[DataSource]] = {
@@ -24,108 +59,438 @@ class ETLNotifier:
         "teams": TeamsNotificationStrategy,
         "mongodb": MongoNotificationStrategy,
     }
+    # Config keys consumed by the notifier rather than the DataSource / NotificationStrategy constructors
+    SOURCE_OPTIONS = {"type", "max_workers"}
+    NOTIFICATION_OPTIONS = {"type", "deadline", "coalesce_window", "rate", "burst", "max_delay"}
 
-    def __init__(self, config: Dict, cache_strategy: CacheStrategy):
+    def __init__(
+        self,
+        config: Dict,
+        cache_strategy: CacheStrategy,
+        max_workers: int = 1,
+        pool_max_idle: float = 600,
+        cache_retention: Optional[float] = 7 * 24 * 3600,
+        sink_workers: int = 8,
+        sink_deadline: float = 30,
+        outbox_path: Optional[str] = None,
+        outbox_max_attempts: int = 10,
+        default_interval: float = 300,
+        schedule_jitter: float = 0,
+        metrics_port: Optional[int] = None,
+        trace_path: Optional[str] = None,
+        trace_sample_rate: float = 1.0,
+        tracer: Optional[Tracer] = None,
+        profile_dir: str = "profiles",
+        profile_cycles: int = 0,
+        profile_top: int = 20,
+    ):
         self.cache_manager = cache_strategy
         self.config = config
+        self.default_interval = default_interval
+        self.schedule_jitter = schedule_jitter
+        self.cache_retention = cache_retention
+        self.max_workers = max(1, max_workers)
+        self.tracer = tracer or Tracer(
+            JsonlFileExporter(trace_path) if trace_path else None, sample_rate=trace_sample_rate
+        )
+        self.profiler = CycleProfiler(profile_dir, top=profile_top)
+        self.profiler.request(profile_cycles)
+        self.pool = ConnectionPool(self._connect_source, max_idle_seconds=pool_max_idle)
+        self.metrics = NotifierMetrics()
+        self.sink_deadline = sink_deadline
+        self.sink_deadlines: Dict[str, float] = {
+            name: float(cfg["deadline"]) for name, cfg in config["notifications"].items() if "deadline" in cfg
+        }
+        self.dispatcher = NotificationDispatcher(
+            max_workers=sink_workers, default_deadline=sink_deadline, metrics=self.metrics, tracer=self.tracer
+        )
+        # With an outbox, coalescing happens in the outbox worker so buffered notifications are durable
         self.notification_strategies: Dict[str, NotificationStrategy] = {
-            name: self._create_notification_strategy(cfg)
+            name: self._create_notification_strategy(name, cfg, coalesce=not outbox_path)
             for name, cfg in config["notifications"].items()
         }
+        self.metrics_server: Optional[MetricsServer] = None
+        if metrics_port is not None:
+            self.metrics_server = MetricsServer(self.metrics.registry, metrics_port)
+            self.metrics_server.start()
+        # With an outbox, notifications are persisted and delivered by a background worker instead of inline
+        self.outbox: Optional[SqliteOutbox] = None
+        self.outbox_worker: Optional[OutboxWorker] = None
+        if outbox_path:
+            self.outbox = SqliteOutbox(outbox_path)
+            windows = {
+                name: float(cfg["coalesce_window"])
+                for name, cfg in config["notifications"].items()
+                if cfg.get("coalesce_window")
+            }
+            self.outbox_worker = OutboxWorker(
+                self.outbox,
+                self.notification_strategies,
+                self.dispatcher,
+                self.sink_deadlines,
+                windows,
+                max_attempts=outbox_max_attempts,
+                metrics=self.metrics,
+            )
+            self.outbox_worker.start()
 
-    def _create_notification_strategy(self, sink_config: Dict) -> NotificationStrategy:
+    def _create_notification_strategy(
+        self, name: str, sink_config: Dict, coalesce: bool = True
+    ) -> NotificationStrategy:
         sink_type = sink_config["type"]
         cls = self.NOTIFICATION_TYPES.get(sink_type)
         if not cls:
             raise ValueError(f"Unknown notification type: {sink_type}")
-        return cls(**{k: v for k, v in sink_config.items() if k != "type"})
+        strategy = cls(**{k: v for k, v in sink_config.items() if k not in self.NOTIFICATION_OPTIONS})
+        if sink_config.get("rate"):
+            # Waiting for a token counts against the send's deadline, so leave at least half of it for the send
+            strategy = RateLimitedStrategy(
+                strategy,
+                rate=float(sink_config["rate"]),
+                burst=float(sink_config["burst"]) if "burst" in sink_config else None,
+                max_delay=float(sink_config.get("max_delay", 30)),
+                max_wait=self.sink_deadlines.get(name, self.sink_deadline) / 2,
+                outcomes=self.metrics.rate_limit,
+                name=name,
+            )
+        # Coalescing sits in front of rate limiting so each merged message costs a single token
+        # Its timed flush runs through the dispatcher so the real send shows up in the sink metrics and traces
+        if coalesce and sink_config.get("coalesce_window"):
+            strategy = CoalescingStrategy(
+                strategy,
+                float(sink_config["coalesce_window"]),
+                dispatcher=self.dispatcher,
+                name=name,
+                deadline=self.sink_deadlines.get(name),
+            )
+        return strategy
+
+    def _connect_source(self, source_name: str) -> DataSource:
+        # Only called when the pool has no idle connection, so reused connections record no connect span
+        with self.tracer.span("source.connect", source=source_name):
+            return self._create_data_source(self.config["sources"][source_name])
 
     def _create_data_source(self, source_config: Dict) -> DataSource:
         source_type = source_config["type"]
         source_class = self.SOURCE_TYPES.get(source_type)
         if not source_class:
             raise ValueError(f"Unknown source type: {source_type}")
-        return source_class(**{k: v for k, v in source_config.items() if k != "type"})
+        return source_class(**{k: v for k, v in source_config.items() if k not in self.SOURCE_OPTIONS})
 
     def _get_sinks(self, query_info: Dict) -> List[NotificationStrategy]:
-        return [
-            self.notification_strategies[name]
+        return list(self._get_named_sinks(query_info).values())
+
+    def _get_named_sinks(self, query_info: Dict) -> Dict[str, NotificationStrategy]:
+        return {
+            name: self.notification_strategies[name]
             for name in query_info.get("notifications", [])
             if name in self.notification_strategies
-        ]
+        }
 
-    def process_query_results(self, query_name: str, records: list, cache: dict, query_info: dict) -> None:
-        current_keys = {record.get_unique_key() for record in records}
+    def process_query_results(
+        self, query_name: str, records: Iterable[NotificationRecord], cache: dict, query_info: dict
+    ) -> int:
+        """Updates ``cache[query_name]`` from ``records``, notifies the query's sinks and returns the row count."""
         existing_cache = cache.get(query_name, {})
+        notify_on_first_sight = query_name == "failures"
+        now = time.time()
 
-        if query_name == "failures":
-            cache[query_name] = {k: "confirmed" for k in current_keys}
-            new_items = [r for r in records if r.get_unique_key() in (current_keys - existing_cache.keys())]
-        else:
-            new_pending_items = {k: "pending" for k in (current_keys - existing_cache.keys())}
-            confirmed_items = [r for r in records if existing_cache.get(r.get_unique_key()) == "pending"]
-            cache[query_name] = {
-                **{k: "confirmed" for k in current_keys if existing_cache.get(k) in ("pending", "confirmed")},
-                **new_pending_items,
-            }
-            new_items = confirmed_items
+        # One pass over a possibly lazy stream. "failures": unseen -> notify, everything -> confirmed.
+        # Others: unseen -> pending, pending -> notify + confirmed, confirmed -> confirmed.
+        # Delta queries only return rows past the watermark, so earlier entries are kept rather than replaced.
+        section: Dict[str, Any] = dict(existing_cache) if "watermark" in query_info else {}
+        new_items = []
+        rows = 0
+        for record in records:
+            rows += 1
+            key = record.get_unique_key()
+            if key not in existing_cache:
+                if notify_on_first_sight:
+                    new_items.append(record)
+                    section[key] = make_entry(CONFIRMED, now)
+                else:
+                    section[key] = make_entry(PENDING, now)
+                continue
+            previous = existing_cache[key]
+            state = entry_state(previous)
+            if notify_on_first_sight:
+                section[key] = make_entry(CONFIRMED, now, previous)
+            elif state == PENDING:
+                new_items.append(record)
+                section[key] = make_entry(CONFIRMED, now, previous)
+            elif state == CONFIRMED:
+                section[key] = make_entry(CONFIRMED, now, previous)
+        cache[query_name] = section
 
+        current_span().set_attribute("new_items", len(new_items))
         if not new_items:
-            return
+            return rows
+
+        self.metrics.notified_records.inc(len(new_items), query=query_name)
+        if self.outbox is not None:
+            self.outbox.enqueue(
+                list(self._get_named_sinks(query_info)),
+                new_items,
+                query_info["message_single"],
+                query_info["message_multiple"],
+                query_info.get("priority"),
+            )
+            self.outbox_worker.wake()
+            return rows
+
+        args = (new_items, query_info["message_single"], query_info["message_multiple"])
+        priority = query_info.get("priority")
+        calls = {
+            name: partial(sink.send_with_priority, *args, priority) if priority else partial(sink.send_notification, *args)
+            for name, sink in self._get_named_sinks(query_info).items()
+        }
+        for result in self.dispatcher.dispatch(calls, self.sink_deadlines).values():
+            if not result.ok:
+                logger.error("Error sending %s notification to %s: %s", query_name, result.sink, result.error)
+        return rows
+
+    def _run_queries(self, source_name: str, queries: List[Tuple[str, Dict]], cache: Dict) -> Dict[str, Any]:
+        # Returns the updated cache sections; ``cache`` itself is only read, so workers can share it.
+        # An unreachable source only skips its own queries: their cache sections are kept as they were.
+        try:
+            with self.tracer.span("source", source=source_name), self.pool.connection(source_name) as source:
+                return self._query_source(source_name, source, queries, cache)
+        except Exception as e:
+            self.metrics.source_errors.inc(source=source_name)
+            logger.error("Error connecting to source %s: %s", source_name, e)
+            return {}
+
+    def _query_source(
+        self, source_name: str, source: DataSource, queries: List[Tuple[str, Dict]], cache: Dict
+    ) -> Dict[str, Any]:
+        updates: Dict[str, Any] = {}
+        for query_name, query_info in queries:
+            section = {query_name: cache[query_name]} if query_name in cache else {}
+            previous = section.get(query_name, {})
+            labels = {"source": source_name, "query": query_name}
+            # Records are streamed, so execution, fetching and processing are timed together
+            start = time.monotonic()
+            try:
+                with self.tracer.span("query", **labels) as span:
+                    mark = {"value": watermark_value(previous.get(WATERMARK_KEY))}
+                    with self.tracer.span("query.execute", **labels):
+                        query = self._bind_query(query_info, previous)
+                        if "watermark" in query_info:
+                            pairs = source.stream_watermarked_records(query, query_info["watermark"])
+                            records = self._track_watermark(pairs, mark)
+                        else:
+                            records = source.stream_records(query)
+                    with self.tracer.span("query.process", **labels):
+                        rows = self.process_query_results(query_name, records, section, query_info)
+                    if "watermark" in query_info:
+                        section[query_name][WATERMARK_KEY] = make_watermark(
+                            mark["value"], time.time(), previous.get(WATERMARK_KEY)
+                        )
+                    span.set_attribute("rows", rows)
+                self.metrics.query_rows.inc(rows, **labels)
+            except Exception as e:
+                self.metrics.query_errors.inc(**labels)
+                logger.error("Error processing query %s: %s", query_name, e)
+            self.metrics.query_duration.observe(time.monotonic() - start, **labels)
+            updates.update(section)
+        return updates
+
+    @staticmethod
+    def _track_watermark(
+        pairs: Iterable[Tuple[NotificationRecord, Any]], mark: Dict[str, Any]
+    ) -> Iterator[NotificationRecord]:
+        # Passes records through unchanged; ``mark["value"]`` ends on the highest watermark seen, never lowered
+        for record, value in pairs:
+            if value is not None and (mark["value"] is None or value > mark["value"]):
+                mark["value"] = value
+            yield record
+
+    @staticmethod
+    def _bind_query(query_info: Dict, section: Dict[str, Any]) -> Dict[str, Any]:
+        # The watermark is bound as the last SQL parameter; it is None (NULL) until the first row is seen
+        query = query_info["query"]
+        if "watermark" not in query_info:
+            return query
+        return {**query, "params": [*query.get("params", ()), watermark_value(section.get(WATERMARK_KEY))]}
+
+    def _run_source(self, source_name: str, queries: List[Tuple[str, Dict]], cache: Dict) -> Dict[str, Any]:
+        workers = min(int(self.config["sources"][source_name].get("max_workers", 1)), len(queries))
+        if workers <= 1:
+            return self._run_queries(source_name, queries, cache)
 
-        for sink in self._get_sinks(query_info):
-            sink.send_notification(new_items, query_info["message_single"], query_info["message_multiple"])
+        # Each worker checks out its own DataSource, so concurrent queries never share a cursor
+        updates: Dict[str, Any] = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"etl-{source_name}") as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._run_queries, source_name, [query], cache)
+                for query in queries
+            ]
+            for future in futures:
+                updates.update(future.result())
+        return updates
 
-    def run(self) -> None:
+    def run(self, query_names: Optional[Collection[str]] = None) -> None:
+        """Runs ``query_names`` (all queries by default) in one cycle sharing a cache load and save.
+
+        Up to ``max_workers`` sources are polled at once; a source's own ``max_workers`` bounds its queries.
+        """
+        with self.profiler.profile(), self.metrics.cycle_duration.time(), self.tracer.span("cycle") as span:
+            if query_names is not None:
+                span.set_attribute("queries", sorted(query_names))
+            self._run_cycle(query_names)
+
+    def _run_cycle(self, query_names: Optional[Collection[str]]) -> None:
+        phases = self.metrics.phase_duration
         try:
-            cache = self.cache_manager.load()
-            sources_config = self.config["sources"]
-            queries_config = self.config["queries"]
+            with phases.time(phase="cache_load"):
+                cache = self.cache_manager.load()
 
             source_queries: Dict[str, list] = {}
-            for query_name, query_info in queries_config.items():
+            for query_name, query_info in self.config["queries"].items():
+                if query_names is not None and query_name not in query_names:
+                    continue
                 source_queries.setdefault(query_info["source"], []).append((query_name, query_info))
 
-            for source_name, queries in source_queries.items():
-                source_config = sources_config[source_name]
-                with self._create_data_source(source_config) as source:
-                    for query_name, query_info in queries:
-                        try:
-                            raw_records = source.execute_query(query_info["query"])
-                            records = [
-                                NotificationRecord(
-                                    account_name=record["AccountName"],
-                                    environment=record["Environment"],
-                                    start_time=record["StartTime"],
-                                    url=record.get("PipelineURL"),
-                                    error_message=record.get("errorMessage"),
-                                    over_hour=record.get("over_hour"),
-                                    run_id=record.get("PipelineRunId"),
-                                )
-                                for record in raw_records
-                            ]
-                            self.process_query_results(query_name, records, cache, query_info)
-                        except Exception as e:
-                            logger.error("Error processing query %s: %s", query_name, e)
-
-            self.cache_manager.save(cache)
+            workers = min(self.max_workers, len(source_queries))
+            if workers <= 1:
+                results = [self._run_source(name, queries, cache) for name, queries in source_queries.items()]
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etl-source") as executor:
+                    # Workers run in a copy of this context so their spans nest under the cycle span
+                    futures = [
+                        executor.submit(contextvars.copy_context().run, self._run_source, name, queries, cache)
+                        for name, queries in source_queries.items()
+                    ]
+                    results = [future.result() for future in futures]
+
+            # Workers only read the loaded cache; their sections are merged here on the calling thread
+            for updates in results:
+                cache.update(updates)
+
+            retention = {
+                name: float(info["retention"]) for name, info in self.config["queries"].items() if "retention" in info
+            }
+            with phases.time(phase="evict"):
+                evicted = evict_expired(cache, time.time(), self.cache_retention, retention)
+            if evicted:
+                logger.info("Evicted %d expired cache entries", evicted)
+
+            with phases.time(phase="cache_save"):
+                self.cache_manager.save(cache)
+            self._record_cache_metrics(cache)
         except Exception as e:
+            self.metrics.cycle_errors.inc()
             logger.error("Error in ETL notification process: %s", e)
 
+    def _record_cache_metrics(self, cache: Dict[str, Any]) -> None:
+        # Replaced as a whole so sections evicted from the cache stop being exported
+        self.metrics.cache_entries.replace(
+            (len(section), {"query": query_name}) for query_name, section in cache.items()
+        )
+        size = self.cache_manager.size_bytes()
+        if size is not None:
+            self.metrics.cache_size.set(size)
+
+    def serve(self, stop: Optional[threading.Event] = None) -> None:
+        # Runs each query on its own schedule until ``stop`` is set; queries due together share one run.
+        # Runs never overlap: a query falling due during a long run waits for it, and missed ticks are skipped.
+        stop = stop or threading.Event()
+        scheduler = QueryScheduler(
+            {name: build_schedule(info, self.default_interval) for name, info in self.config["queries"].items()},
+            jitter=self.schedule_jitter,
+        )
+        while not stop.is_set():
+            due = scheduler.due()
+            if due:
+                self.run(due)
+                continue
+            next_due = scheduler.next_due()
+            # With no queries configured there is nothing to wait for; idle on the default interval until stopped
+            stop.wait(self.default_interval if next_due is None else max(next_due - time.time(), 0))
+
+    def close(self) -> None:
+        if self.outbox_worker is not None:
+            self.outbox_worker.stop()
+            self.outbox.close()
+        for name, strategy in self.notification_strategies.items():
+            try:
+                strategy.close()
+            except Exception as e:
+                logger.error("Error closing notification sink %s: %s", name, e)
+        self.dispatcher.close()
+        self.pool.close()
+        self.cache_manager.close()
+        close_sessions()
+        AzureTokenProvider.close_all()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+        self.tracer.close()
+
+
+def create_cache_strategy(
+    cache_type: str,
+    path: Optional[str] = None,
+    flush_interval: float = 0,
+    max_dirty_entries: int = 10000,
+) -> CacheStrategy:
+    if cache_type not in CACHE_TYPES:
+        raise ValueError(f"Unknown cache type: {cache_type}")
+    cache_class, default_path = CACHE_TYPES[cache_type]
+    cache = cache_class(path or default_path)
+    if flush_interval > 0:
+        cache = WriteBehindCache(cache, flush_interval=flush_interval, max_dirty_entries=max_dirty_entries)
+    return cache
+
+
+def install_shutdown_handlers(stop: threading.Event) -> None:
+    """Set ``stop`` on SIGTERM or SIGINT so ``serve()`` returns after the current run and ``close()`` runs."""
+
+    def handle(received, frame):
+        logger.info("Received signal %d, shutting down", received)
+        stop.set()
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, handle)
+
 
 def main():
     load_dotenv()
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     config = ConfigLoader.load_queries("config/queries.yml")
-    notifier = ETLNotifier(config=config, cache_strategy=JsonFileCache("cache.json"))
+    notifier = ETLNotifier(
+        config=config,
+        cache_strategy=create_cache_strategy(
+            os.getenv("ETL_CACHE_TYPE", "json"),
+            os.getenv("ETL_CACHE_PATH"),
+            flush_interval=float(os.getenv("ETL_CACHE_FLUSH_INTERVAL", 0)),
+            max_dirty_entries=int(os.getenv("ETL_CACHE_FLUSH_ENTRIES", 10000)),
+        ),
+        max_workers=int(os.getenv("ETL_MAX_WORKERS", 1)),
+        pool_max_idle=float(os.getenv("ETL_POOL_MAX_IDLE", 600)),
+        cache_retention=float(os.getenv("ETL_CACHE_RETENTION", 7 * 24 * 3600)),
+        sink_workers=int(os.getenv("ETL_SINK_WORKERS", 8)),
+        sink_deadline=float(os.getenv("ETL_SINK_DEADLINE", 30)),
+        outbox_path=os.getenv("ETL_OUTBOX_PATH"),
+        outbox_max_attempts=int(os.getenv("ETL_OUTBOX_MAX_ATTEMPTS", 10)),
+        default_interval=float(os.getenv("ETL_SLEEP_TIME", 300)),
+        schedule_jitter=float(os.getenv("ETL_SCHEDULE_JITTER", 0)),
+        metrics_port=int(os.environ["ETL_METRICS_PORT"]) if os.getenv("ETL_METRICS_PORT") else None,
+        trace_path=os.getenv("ETL_TRACE_FILE"),
+        trace_sample_rate=float(os.getenv("ETL_TRACE_SAMPLE_RATE", 1.0)),
+        profile_dir=os.getenv("ETL_PROFILE_DIR", "profiles"),
+        profile_cycles=int(os.getenv("ETL_PROFILE_CYCLES", 0)),
+        profile_top=int(os.getenv("ETL_PROFILE_TOP", 20)),
+    )
+    # SIGUSR1 profiles the next ETL_PROFILE_CYCLES cycles (at least one) without a restart
+    install_signal_handler(notifier.profiler, max(int(os.getenv("ETL_PROFILE_CYCLES", 0)), 1))
+    # Without these, SIGTERM (docker stop, systemd) kills the process before close() flushes buffered state
+    stop = threading.Event()
+    install_shutdown_handlers(stop)
 
-    while True:
-        try:
-            notifier.run()
-        except Exception as e:
-            logger.error("Error in main loop: %s", e)
-        finally:
-            time.sleep(int(os.getenv("ETL_SLEEP_TIME", 300)))
+    try:
+        notifier.serve(stop)
+    finally:
+        notifier.close()
 
 
 if __name__ == "__main__":
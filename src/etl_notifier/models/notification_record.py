@@ -1,16 +1,96 @@
-from dataclasses import dataclass
+import sys
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional, Tuple
+
 
-@dataclass
 class NotificationRecord:
+    # A hand-written slotted class rather than a frozen dataclass: no per-instance __dict__, and the slots are
+    # filled through their descriptors instead of the object.__setattr__ call per field that frozen dataclasses make
+    __slots__ = (
+        "account_name", "environment", "start_time", "url", "error_message", "over_hour", "run_id", "unique_key"
+    )
+
     account_name: str
     environment: str
     start_time: datetime
-    url: Optional[str] = None
-    error_message: Optional[str] = None
-    over_hour: Optional[str] = None
-    run_id: Optional[str] = None
+    url: Optional[str]
+    error_message: Optional[str]
+    over_hour: Optional[str]
+    run_id: Optional[str]
+    unique_key: str
+
+    def __init__(
+        self,
+        account_name: str,
+        environment: str,
+        start_time: datetime,
+        url: Optional[str] = None,
+        error_message: Optional[str] = None,
+        over_hour: Optional[str] = None,
+        run_id: Optional[str] = None,
+    ):
+        # Account and environment names repeat across thousands of rows; share one string object each
+        if type(account_name) is str:
+            account_name = sys.intern(account_name)
+        if type(environment) is str:
+            environment = sys.intern(environment)
+        _set_account_name(self, account_name)
+        _set_environment(self, environment)
+        _set_start_time(self, start_time)
+        _set_url(self, url)
+        _set_error_message(self, error_message)
+        _set_over_hour(self, over_hour)
+        _set_run_id(self, run_id)
+        _set_unique_key(self, f"{account_name}|{environment}|{start_time}")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"NotificationRecord is immutable, cannot set {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"NotificationRecord is immutable, cannot delete {name!r}")
+
+    def astuple(self) -> Tuple[Any, ...]:
+        """Returns the constructor arguments in field order; ``unique_key`` is derived and left out."""
+        return (
+            self.account_name,
+            self.environment,
+            self.start_time,
+            self.url,
+            self.error_message,
+            self.over_hour,
+            self.run_id,
+        )
+
+    # Copies and pickles go back through __init__, so the key is rebuilt and strings are interned again
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return type(self), self.astuple()
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    def __hash__(self) -> int:
+        return hash(self.astuple())
+
+    def __repr__(self) -> str:
+        return (
+            f"NotificationRecord(account_name={self.account_name!r}, environment={self.environment!r}, "
+            f"start_time={self.start_time!r}, url={self.url!r}, error_message={self.error_message!r}, "
+            f"over_hour={self.over_hour!r}, run_id={self.run_id!r})"
+        )
 
     def get_unique_key(self) -> str:
-        return f"{self.account_name}|{self.environment}|{self.start_time}"
+        return self.unique_key
+
+
+(
+    _set_account_name,
+    _set_environment,
+    _set_start_time,
+    _set_url,
+    _set_error_message,
+    _set_over_hour,
+    _set_run_id,
+    _set_unique_key,
+) = (getattr(NotificationRecord, name).__set__ for name in NotificationRecord.__slots__)
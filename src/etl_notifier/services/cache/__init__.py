@@ -1,12 +1,18 @@
 """Cache implementations for ETL Notifier"""
 
 from .base import CacheStrategy
+from .entry import evict_expired
 from .json_cache import JsonFileCache
+from .sqlite_cache import SqliteCache
+from .write_behind import WriteBehindCache
 from .exceptions import CacheError, CacheLoadError, CacheSaveError
 
 __all__ = [
     'CacheStrategy',
     'JsonFileCache',
+    'SqliteCache',
+    'WriteBehindCache',
+    'evict_expired',
     'CacheError',
     'CacheLoadError',
     'CacheSaveError'
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 class CacheStrategy(ABC):
@@ -10,3 +10,10 @@ class CacheStrategy(ABC):
     @abstractmethod
     def save(self, data: Dict[str, Any]) -> None:
         pass
+
+    def close(self) -> None:
+        pass
+
+    def size_bytes(self) -> Optional[int]:
+        """Size of the persisted cache, or None when it is not stored in a file."""
+        return None
@@ -0,0 +1,86 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Mapping, Optional
+from uuid import UUID
+
+PENDING = "pending"
+CONFIRMED = "confirmed"
+# Reserved key in a query's cache section holding its high-water mark (record keys always contain "|")
+WATERMARK_KEY = "_watermark"
+
+
+def make_entry(state: str, now: float, previous: Any = None) -> Dict[str, Any]:
+    first_seen = previous.get("first_seen", now) if isinstance(previous, dict) else now
+    return {"state": state, "first_seen": first_seen, "last_seen": now}
+
+
+def entry_state(entry: Any) -> Optional[str]:
+    # Caches written before entries carried timestamps store the bare state string
+    if isinstance(entry, dict):
+        return entry.get("state")
+    return entry
+
+
+def make_watermark(value: Any, now: float, previous: Any = None) -> Dict[str, Any]:
+    first_seen = previous.get("first_seen", now) if isinstance(previous, dict) else now
+    entry = {"value": value, "first_seen": first_seen, "last_seen": now}
+    # Keep the column's type through JSON so the watermark binds back as the same SQL type
+    if isinstance(value, datetime):
+        entry.update(value=value.isoformat(), type="datetime")
+    elif isinstance(value, date):
+        entry.update(value=value.isoformat(), type="date")
+    elif isinstance(value, Decimal):
+        entry.update(value=str(value), type="decimal")
+    elif isinstance(value, UUID):
+        entry.update(value=str(value), type="uuid")
+    elif value is not None and not isinstance(value, (str, int, float)):
+        # Refuse it here rather than let every cache save fail and the same rows be announced each cycle
+        raise TypeError(f"Watermark of type {type(value).__name__} cannot be stored in the cache")
+    return entry
+
+
+def watermark_value(entry: Any) -> Any:
+    if not isinstance(entry, dict) or entry.get("value") is None:
+        return None
+    value_type = entry.get("type")
+    if value_type == "datetime":
+        return datetime.fromisoformat(entry["value"])
+    if value_type == "date":
+        return date.fromisoformat(entry["value"])
+    if value_type == "decimal":
+        return Decimal(entry["value"])
+    if value_type == "uuid":
+        return UUID(entry["value"])
+    return entry["value"]
+
+
+def evict_expired(
+    data: Dict[str, Any],
+    now: float,
+    default_retention: Optional[float],
+    retention: Optional[Mapping[str, Optional[float]]] = None,
+) -> int:
+    """Drop entries not seen within their section's retention; returns how many were evicted.
+
+    Sections without a configured retention (e.g. queries removed from config) use ``default_retention``;
+    ``None`` keeps entries forever. Legacy entries without timestamps are stamped with ``now``.
+    """
+    retention = retention or {}
+    evicted = 0
+    for section_name, section in list(data.items()):
+        if not isinstance(section, dict):
+            continue
+        ttl = retention.get(section_name, default_retention)
+        kept = {}
+        for key, entry in section.items():
+            if not isinstance(entry, dict):
+                entry = make_entry(entry, now)
+            if ttl is not None and now - entry.get("last_seen", now) > ttl:
+                continue
+            kept[key] = entry
+        evicted += len(section) - len(kept)
+        if kept or not section:
+            data[section_name] = kept
+        else:
+            del data[section_name]
+    return evicted
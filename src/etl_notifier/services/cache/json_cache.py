@@ -1,31 +1,84 @@
 import json
+import logging
 import os
-from typing import Any, Dict
+import tempfile
+from typing import Any, Dict, Optional
 
 from .base import CacheStrategy
 from .exceptions import CacheLoadError, CacheSaveError
 
+logger = logging.getLogger(__name__)
+
 
 class JsonFileCache(CacheStrategy):
     def __init__(self, file_path: str):
         self.file_path = file_path
+        self.backup_path = f"{file_path}.bak"
+        # Only a cache file known to parse is rotated into the backup slot
+        self._primary_valid = False
 
     def load(self) -> Dict[str, Any]:
         try:
             if not os.path.exists(self.file_path):
-                with open(self.file_path, "w+") as f:
-                    json.dump({}, f)
+                if os.path.exists(self.backup_path):
+                    logger.warning("Cache file %s missing; restoring from backup", self.file_path)
+                    return self._read(self.backup_path)
+                self._write({})
                 return {}
-            with open(self.file_path, "r+") as f:
-                return json.load(f)
+            data = self._read(self.file_path)
+            self._primary_valid = True
+            return data
         except json.JSONDecodeError as e:
+            if os.path.exists(self.backup_path):
+                logger.warning("Invalid JSON in cache file %s (%s); falling back to backup", self.file_path, e)
+                try:
+                    return self._read(self.backup_path)
+                except Exception as backup_error:
+                    raise CacheLoadError(f"Invalid JSON in cache file and backup: {e}; {backup_error}")
             raise CacheLoadError(f"Invalid JSON in cache file: {e}")
         except Exception as e:
             raise CacheLoadError(f"Error loading cache: {e}")
 
     def save(self, data: Dict[str, Any]) -> None:
         try:
-            with open(self.file_path, "w+") as f:
-                json.dump(data, f, indent=2)
+            self._write(data)
         except Exception as e:
             raise CacheSaveError(f"Error saving to cache: {e}")
+
+    def size_bytes(self) -> Optional[int]:
+        return os.path.getsize(self.file_path) if os.path.exists(self.file_path) else None
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, Any]:
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        # Write a temp file next to the cache, fsync it, then swap it in so a crash never leaves a torn file.
+        # The previous cache becomes the backup that load() falls back to.
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".cache-", suffix=".tmp", dir=directory)
+        try:
+            with open(fd, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            if self._primary_valid and os.path.exists(self.file_path):
+                os.replace(self.file_path, self.backup_path)
+            os.replace(tmp_path, self.file_path)
+            self._primary_valid = True
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._fsync_directory(directory)
+
+    @staticmethod
+    def _fsync_directory(directory: str) -> None:
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
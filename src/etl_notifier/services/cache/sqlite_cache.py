@@ -0,0 +1,109 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import CacheStrategy
+from .exceptions import CacheLoadError, CacheSaveError
+
+
+class SqliteCache(CacheStrategy):
+    """Cache stored one row per (section, key); each save writes only the entries that changed."""
+
+    def __init__(self, file_path: str, compact_every: int = 500):
+        self.file_path = file_path
+        self.compact_every = compact_every
+        self._connection: Optional[sqlite3.Connection] = None
+        # Serialized values as last persisted, used to compute the delta on save
+        self._persisted: Optional[Dict[str, Dict[str, str]]] = None
+        self._saves = 0
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Any]:
+        try:
+            with self._lock:
+                rows = self._connect().execute("SELECT section, key, value FROM cache_entries").fetchall()
+                data: Dict[str, Any] = {}
+                persisted: Dict[str, Dict[str, str]] = {}
+                for section, key, value in rows:
+                    data.setdefault(section, {})[key] = json.loads(value)
+                    persisted.setdefault(section, {})[key] = value
+                self._persisted = persisted
+                return data
+        except (sqlite3.Error, ValueError) as e:
+            raise CacheLoadError(f"Error loading cache: {e}")
+
+    def save(self, data: Dict[str, Any]) -> None:
+        try:
+            with self._lock:
+                connection = self._connect()
+                if self._persisted is None:
+                    self._persisted = self._read_persisted(connection)
+                upserts, deletes, persisted = self._diff(data)
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO cache_entries (section, key, value) VALUES (?, ?, ?)", upserts
+                    )
+                    connection.executemany("DELETE FROM cache_entries WHERE section = ? AND key = ?", deletes)
+                self._persisted = persisted
+                self._saves += 1
+                if self.compact_every and self._saves % self.compact_every == 0:
+                    self._compact(connection)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            raise CacheSaveError(f"Error saving to cache: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _diff(self, data: Dict[str, Any]) -> Tuple[List[tuple], List[tuple], Dict[str, Dict[str, str]]]:
+        upserts: List[tuple] = []
+        deletes: List[tuple] = []
+        persisted: Dict[str, Dict[str, str]] = {}
+        for section, entries in data.items():
+            if not isinstance(entries, dict):
+                raise TypeError(f"cache section '{section}' must be a mapping")
+            previous = self._persisted.get(section, {})
+            encoded = {}
+            for key, value in entries.items():
+                encoded[key] = serialized = json.dumps(value, separators=(",", ":"))
+                if previous.get(key) != serialized:
+                    upserts.append((section, key, serialized))
+            deletes.extend((section, key) for key in previous.keys() - encoded.keys())
+            persisted[section] = encoded
+        for section in self._persisted.keys() - data.keys():
+            deletes.extend((section, key) for key in self._persisted[section])
+        return upserts, deletes, persisted
+
+    def size_bytes(self) -> Optional[int]:
+        # Committed pages may still sit in the write-ahead log until the next checkpoint
+        paths = [path for path in (self.file_path, f"{self.file_path}-wal") if os.path.exists(path)]
+        return sum(os.path.getsize(path) for path in paths) if paths else None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.file_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "section TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (section, key)) WITHOUT ROWID"
+            )
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def _read_persisted(connection: sqlite3.Connection) -> Dict[str, Dict[str, str]]:
+        persisted: Dict[str, Dict[str, str]] = {}
+        for section, key, value in connection.execute("SELECT section, key, value FROM cache_entries"):
+            persisted.setdefault(section, {})[key] = value
+        return persisted
+
+    @staticmethod
+    def _compact(connection: sqlite3.Connection) -> None:
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.execute("VACUUM")
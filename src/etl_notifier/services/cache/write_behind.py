@@ -0,0 +1,81 @@
+import logging
+import threading
+from typing import Any, Dict, Optional, Set
+
+from .base import CacheStrategy
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindCache(CacheStrategy):
+    """Keeps cache state resident in memory and persists it to ``backing`` in the background.
+
+    The backing store is read once, on the first ``load``. ``save`` only records which sections changed;
+    they are written every ``flush_interval`` seconds, as soon as the changed sections hold
+    ``max_dirty_entries`` entries, and on ``close``. A crash loses at most the unflushed changes, which
+    means some notifications may be sent again after a restart.
+    """
+
+    def __init__(self, backing: CacheStrategy, flush_interval: float = 60, max_dirty_entries: int = 10000):
+        self.backing = backing
+        self.flush_interval = flush_interval
+        self.max_dirty_entries = max_dirty_entries
+        self._data: Optional[Dict[str, Any]] = None
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        # Serializes writes to the backing store so an older snapshot can never overwrite a newer one
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._data is None:
+                self._data = self.backing.load()
+                self._thread = threading.Thread(target=self._flush_loop, name="etl-cache-flush", daemon=True)
+                self._thread.start()
+            # Callers replace sections rather than mutating them, so a shallow copy isolates the resident state
+            return dict(self._data)
+
+    def save(self, data: Dict[str, Any]) -> None:
+        with self._lock:
+            previous = self._data or {}
+            self._dirty.update(name for name, section in data.items() if previous.get(name) != section)
+            self._dirty.update(previous.keys() - data.keys())
+            self._data = dict(data)
+            pending = sum(len(self._data.get(name, ())) for name in self._dirty)
+        if pending >= self.max_dirty_entries:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty or self._data is None:
+                    return
+                snapshot, dirty = dict(self._data), self._dirty
+                self._dirty = set()
+            try:
+                self.backing.save(snapshot)
+            except Exception:
+                with self._lock:
+                    self._dirty |= dirty
+                raise
+
+    def close(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.flush()
+        finally:
+            self.backing.close()
+
+    def size_bytes(self) -> Optional[int]:
+        return self.backing.size_bytes()
+
+    def _flush_loop(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Error flushing cache: %s", e)
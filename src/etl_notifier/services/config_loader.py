@@ -1,8 +1,23 @@
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 import yaml
 
+from .data_source.params import validate_params
+from .data_source.record_mapper import RecordMapper
+from .notification.rate_limit import NORMAL, PRIORITIES
+from .notification.template import compile_template
+from .scheduler import Schedule
+
+# Numeric sink options read by ETLNotifier: (minimum, whether the minimum itself is allowed)
+SINK_NUMBER_OPTIONS: Dict[str, Tuple[float, bool]] = {
+    "rate": (0, False),
+    "burst": (1, True),
+    "max_delay": (0, True),
+    "coalesce_window": (0, True),
+    "deadline": (0, False),
+}
+
 
 class ConfigLoader:
     @staticmethod
@@ -23,6 +38,12 @@ class ConfigLoader:
         for name, sink in processed["notifications"].items():
             if "type" not in sink:
                 raise ValueError(f"Notification sink '{name}' must specify a 'type'")
+            for option, (minimum, inclusive) in SINK_NUMBER_OPTIONS.items():
+                if option in sink:
+                    try:
+                        _validate_number(sink[option], minimum, inclusive)
+                    except ValueError as e:
+                        raise ValueError(f"Notification sink '{name}' has invalid '{option}': {e}")
 
         if "sources" not in processed:
             raise ValueError("Configuration must contain 'sources' section")
@@ -39,12 +60,45 @@ class ConfigLoader:
                 raise ValueError(f"Query '{name}' references undefined source '{query['source']}'")
             if "query" not in query:
                 raise ValueError(f"Query '{name}' must contain a 'query' section")
+            if "params" in query["query"]:
+                try:
+                    validate_params(query["query"]["params"])
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"Query '{name}' has invalid params: {e}")
+            if "columns" in query["query"]:
+                try:
+                    RecordMapper(query["query"]["columns"])
+                except (TypeError, ValueError, AttributeError) as e:
+                    raise ValueError(f"Query '{name}' has an invalid column mapping: {e}")
             if "message_single" not in query:
                 raise ValueError(f"Query '{name}' must specify 'message_single'")
+            try:
+                compile_template(query["message_single"])
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Query '{name}' has an invalid 'message_single' template: {e}")
             if "message_multiple" not in query:
                 raise ValueError(f"Query '{name}' must specify 'message_multiple'")
             if "notifications" not in query:
                 raise ValueError(f"Query '{name}' must specify 'notifications'")
+            if "watermark" in query:
+                # Delta queries return each row once, so only notify-on-first-sight can use them
+                if name != "failures":
+                    raise ValueError(f"Query '{name}': 'watermark' is only supported for the 'failures' query")
+                # Any result column works, e.g. EndTime or an ingestion id, so late-finishing failures are not skipped
+                if not isinstance(query["watermark"], str) or not query["watermark"]:
+                    raise ValueError(f"Query '{name}': 'watermark' must be a column name")
+            if "retention" in query:
+                try:
+                    _validate_number(query["retention"], 0, False)
+                except ValueError as e:
+                    raise ValueError(f"Query '{name}' has invalid 'retention': {e}")
+            if "interval" in query or "cron" in query:
+                try:
+                    Schedule(interval=query.get("interval"), cron=query.get("cron"))
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"Query '{name}' has an invalid schedule: {e}")
+            if query.get("priority", NORMAL) not in PRIORITIES:
+                raise ValueError(f"Query '{name}' has invalid priority; expected one of {', '.join(PRIORITIES)}")
             for sink_name in query["notifications"]:
                 if sink_name not in processed["notifications"]:
                     raise ValueError(f"Query '{name}' references undefined notification sink '{sink_name}'")
@@ -70,3 +124,15 @@ class ConfigLoader:
                 raise ValueError(f"Environment variable not set: {var}")
             return result
         return value
+
+
+def _validate_number(value: Any, minimum: float, inclusive: bool) -> None:
+    # Values substituted from environment variables arrive as strings, so accept anything float() parses
+    if isinstance(value, bool):
+        raise ValueError(f"expected a number, got {value!r}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"expected a number, got {value!r}")
+    if number != number or (number < minimum if inclusive else number <= minimum):
+        raise ValueError(f"must be {'at least' if inclusive else 'greater than'} {minimum:g}, got {value!r}")
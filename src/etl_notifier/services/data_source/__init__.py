@@ -1,7 +1,9 @@
 """Data source implementations for ETL Notifier"""
 
 from .azure_sql_db import AzureSqlDBSource
+from .azure_token import AzureTokenProvider
 from .base import DataSource
 from .database import DatabaseSource
+from .pool import ConnectionPool, SourceUnavailable
 
-__all__ = ["DataSource", "DatabaseSource", "AzureSqlDBSource"]
+__all__ = ["DataSource", "DatabaseSource", "AzureSqlDBSource", "AzureTokenProvider", "ConnectionPool", "SourceUnavailable"]
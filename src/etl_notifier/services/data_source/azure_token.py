@@ -0,0 +1,123 @@
+import logging
+import struct
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from azure.identity import DefaultAzureCredential
+
+logger = logging.getLogger(__name__)
+
+SQL_DATABASE_SCOPE = "https://database.windows.net/.default"
+
+
+class AzureTokenProvider:
+    """Process-wide access token cache per (client id, scope), refreshed in the background before expiry."""
+
+    _providers: Dict[Tuple[str, str], "AzureTokenProvider"] = {}
+    _providers_lock = threading.Lock()
+
+    RETRY_SECONDS = 30
+
+    def __init__(
+        self,
+        client_id: str,
+        scope: str = SQL_DATABASE_SCOPE,
+        refresh_ahead: float = 600,
+        expiry_margin: float = 60,
+    ):
+        self.client_id = client_id
+        self.scope = scope
+        self.refresh_ahead = refresh_ahead
+        self.expiry_margin = expiry_margin
+        self._credential = None
+        self._token_struct: Optional[bytes] = None
+        self._expires_on = 0.0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    @classmethod
+    def for_client(cls, client_id: str, scope: str = SQL_DATABASE_SCOPE) -> "AzureTokenProvider":
+        with cls._providers_lock:
+            provider = cls._providers.get((client_id, scope))
+            if provider is None:
+                provider = cls._providers[(client_id, scope)] = cls(client_id, scope)
+            return provider
+
+    @classmethod
+    def close_all(cls) -> None:
+        with cls._providers_lock:
+            providers, cls._providers = cls._providers, {}
+        for provider in providers.values():
+            provider.close()
+
+    def get_token_struct(self) -> bytes:
+        with self._lock:
+            if self._token_struct is None or time.time() >= self._expires_on - self.expiry_margin:
+                self._refresh()
+            return self._token_struct
+
+    def close(self) -> None:
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+    def _refresh(self) -> None:
+        self._store(*self._fetch(self._get_credential()))
+
+    def _get_credential(self) -> DefaultAzureCredential:
+        if self._credential is None:
+            # Client id is passed explicitly; mutating AZURE_CLIENT_ID is not safe with concurrent sources
+            self._credential = DefaultAzureCredential(
+                exclude_interactive_browser_credential=False,
+                managed_identity_client_id=self.client_id,
+                workload_identity_client_id=self.client_id,
+            )
+        return self._credential
+
+    def _fetch(self, credential: DefaultAzureCredential) -> Tuple[bytes, float]:
+        token = credential.get_token(self.scope)
+        token_bytes = token.token.encode("UTF-16-LE")
+        return struct.pack(f"<I{len(token_bytes)}s", len(token_bytes), token_bytes), float(token.expires_on)
+
+    def _store(self, token_struct: bytes, expires_on: float) -> None:
+        self._token_struct = token_struct
+        self._expires_on = expires_on
+        # A token issued with less than ``refresh_ahead`` left would otherwise be refreshed immediately, and
+        # azure-identity hands back the same cached token, so wait at least RETRY_SECONDS between refreshes
+        self._schedule(max(self._expires_on - self.refresh_ahead - time.time(), self.RETRY_SECONDS))
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(delay, 0), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self) -> None:
+        # The token is fetched without holding the lock, so connections keep using the current, still valid token
+        # instead of waiting on the identity endpoint; only the swap happens under the lock
+        with self._lock:
+            if self._timer is None:
+                return
+            credential = self._get_credential()
+        try:
+            fetched = self._fetch(credential)
+        except Exception as e:
+            logger.warning("Background Azure token refresh failed for client %s: %s", self.client_id, e)
+            with self._lock:
+                if self._timer is None:
+                    return
+                if time.time() < self._expires_on - self.expiry_margin:
+                    self._schedule(self.RETRY_SECONDS)
+                else:
+                    self._timer = None
+            return
+        with self._lock:
+            # Closed meanwhile, a caller already refreshed an expired token, or the credential returned the token
+            # it had cached: keep what is there. An unchanged token is renewed on demand once it nears expiry.
+            if self._timer is None or fetched[1] <= self._expires_on:
+                return
+            self._store(*fetched)
+        logger.info("Refreshed Azure access token for client %s", self.client_id)
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Tuple
+
+from ...models.notification_record import NotificationRecord
+from .record_mapper import RecordMapper
 
 
 class DataSource(ABC):
@@ -7,6 +10,23 @@ class DataSource(ABC):
     def execute_query(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
         pass
 
+    def stream_query(self, query: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        yield from self.execute_query(query)
+
+    def stream_records(self, query: Dict[str, Any]) -> Iterator[NotificationRecord]:
+        mapper = RecordMapper(query.get("columns"))
+        return map(mapper.from_dict, self.stream_query(query))
+
+    def stream_watermarked_records(
+        self, query: Dict[str, Any], column: str
+    ) -> Iterator[Tuple[NotificationRecord, Any]]:
+        # Pairs each record with its raw ``column`` value, which need not be one of the record's fields
+        mapper = RecordMapper(query.get("columns"))
+        for row in self.stream_query(query):
+            if column not in row:
+                raise ValueError(f"Query result is missing watermark column: {column}")
+            yield mapper.from_dict(row), row[column]
+
     def __enter__(self):
         return self
 
@@ -18,3 +38,6 @@ class DataSource(ABC):
 
     def disconnect(self) -> None:
         pass
+
+    def is_alive(self) -> bool:
+        return True
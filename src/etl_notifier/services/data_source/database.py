@@ -1,12 +1,23 @@
-from typing import List, Any, Dict
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Iterator, List, Any, Dict, Tuple
 import pyodbc
+from ...models.notification_record import NotificationRecord
 from .base import DataSource
+from .params import resolve_params
+from .record_mapper import RecordMapper
 
 class DatabaseSource(DataSource):
+    DEFAULT_BATCH_SIZE = 1000
+    # Distinct statements kept prepared per connection
+    MAX_PREPARED_STATEMENTS = 32
+
     def __init__(self, connection_string: str):
         self.connection_string = connection_string
         self.connection = None
         self.cursor = None
+        # One cursor per SQL text: pyodbc re-executes a cursor's last prepared statement without re-preparing it
+        self._statements: "OrderedDict[str, Any]" = OrderedDict()
         self.connect()
 
     def connect(self):
@@ -15,6 +26,9 @@ class DatabaseSource(DataSource):
             self.cursor = self.connection.cursor()
 
     def disconnect(self):
+        for cursor in self._statements.values():
+            cursor.close()
+        self._statements.clear()
         if self.cursor:
             self.cursor.close()
         if self.connection:
@@ -22,14 +36,71 @@ class DatabaseSource(DataSource):
         self.cursor = None
         self.connection = None
 
+    def is_alive(self) -> bool:
+        if not self.connection:
+            return False
+        try:
+            self.cursor.execute("SELECT 1")
+            self.cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
     def __del__(self):
         self.disconnect()
 
     def execute_query(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return list(self.stream_query(query))
+
+    def stream_query(self, query: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        cursor, batch_size = self._execute(query)
+        columns = [column[0] for column in cursor.description]
+        for row in self._fetch_rows(cursor, batch_size):
+            yield dict(zip(columns, row))
+
+    def stream_records(self, query: Dict[str, Any]) -> Iterator[NotificationRecord]:
+        # Column positions are resolved once from cursor.description; rows are mapped without building dicts
+        cursor, batch_size = self._execute(query)
+        to_record = RecordMapper(query.get("columns")).bind([column[0] for column in cursor.description])
+        return map(to_record, self._fetch_rows(cursor, batch_size))
+
+    def stream_watermarked_records(
+        self, query: Dict[str, Any], column: str
+    ) -> Iterator[Tuple[NotificationRecord, Any]]:
+        cursor, batch_size = self._execute(query)
+        columns = [description[0] for description in cursor.description]
+        if column not in columns:
+            raise ValueError(f"Query result is missing watermark column: {column}")
+        to_record = RecordMapper(query.get("columns")).bind(columns)
+        get_watermark = itemgetter(columns.index(column))
+        return ((to_record(row), get_watermark(row)) for row in self._fetch_rows(cursor, batch_size))
+
+    def _execute(self, query: Dict[str, Any]) -> Tuple[Any, int]:
         sql = query.get("sql")
         if not sql:
             raise ValueError("SQL query is required for database source")
-            
-        self.cursor.execute(sql)
-        columns = [column[0] for column in self.cursor.description]
-        return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
\ No newline at end of file
+        batch_size = int(query.get("batch_size", self.DEFAULT_BATCH_SIZE))
+        cursor = self._statement_cursor(sql)
+        cursor.arraysize = batch_size
+        # Parameters are always bound, never interpolated, so the statement text (and its plan) stays stable
+        cursor.execute(sql, *resolve_params(query.get("params", ())))
+        return cursor, batch_size
+
+    def _statement_cursor(self, sql: str) -> Any:
+        cursor = self._statements.get(sql)
+        if cursor is not None:
+            self._statements.move_to_end(sql)
+            return cursor
+        cursor = self._statements[sql] = self.connection.cursor()
+        if len(self._statements) > self.MAX_PREPARED_STATEMENTS:
+            _, evicted = self._statements.popitem(last=False)
+            evicted.close()
+        return cursor
+
+    @staticmethod
+    def _fetch_rows(cursor: Any, batch_size: int) -> Iterator[Any]:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
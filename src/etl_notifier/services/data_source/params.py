@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Sequence
+
+# Keys accepted under ``now_minus``, passed to ``timedelta``
+INTERVAL_UNITS = ("weeks", "days", "hours", "minutes", "seconds")
+
+
+def validate_params(params: Any) -> None:
+    if not isinstance(params, list):
+        raise ValueError("'params' must be a list")
+    for param in params:
+        if isinstance(param, dict):
+            _interval(param)
+
+
+def resolve_params(params: Sequence[Any], now: Optional[datetime] = None) -> List[Any]:
+    """Resolve query parameters to the values bound for this run.
+
+    ``{now_minus: {minutes: 30}}`` becomes the current UTC time (naive, as SQL Server ``datetime2`` expects)
+    minus that interval; any other value is bound as-is.
+    """
+    if not any(isinstance(param, dict) for param in params):
+        return list(params)
+    if now is None:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [now - _interval(param) if isinstance(param, dict) else param for param in params]
+
+
+def _interval(param: dict) -> timedelta:
+    if set(param) != {"now_minus"} or not isinstance(param["now_minus"], dict):
+        raise ValueError(f"Unsupported query parameter {param}; expected {{now_minus: {{minutes: N}}}}")
+    interval = param["now_minus"]
+    unknown = set(interval) - set(INTERVAL_UNITS)
+    if unknown:
+        raise ValueError(f"Unknown interval units: {', '.join(sorted(unknown))}")
+    return timedelta(**interval)
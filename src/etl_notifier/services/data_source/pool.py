@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from .base import DataSource
+
+logger = logging.getLogger(__name__)
+
+
+class SourceUnavailable(Exception):
+    """A source could not be connected; raised by checkout so callers can skip that source alone."""
+
+
+class ConnectionPool:
+    """Long-lived DataSource instances keyed by source name, reused across poll cycles."""
+
+    def __init__(self, factory: Callable[[str], DataSource], max_idle_seconds: float = 600):
+        self._factory = factory
+        self.max_idle_seconds = max_idle_seconds
+        self._idle: Dict[str, List[Tuple[DataSource, float]]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self, name: str) -> Iterator[DataSource]:
+        source = self.checkout(name)
+        try:
+            yield source
+        except Exception:
+            self._close(name, source)
+            raise
+        self.release(name, source)
+
+    def checkout(self, name: str) -> DataSource:
+        while True:
+            with self._lock:
+                idle = self._idle.get(name)
+                if not idle:
+                    break
+                source, released_at = idle.pop()
+            if time.monotonic() - released_at > self.max_idle_seconds:
+                logger.info("Closing idle connection for source %s", name)
+                self._close(name, source)
+            elif self._is_alive(source):
+                return source
+            else:
+                logger.warning("Discarding broken connection for source %s", name)
+                self._close(name, source)
+        try:
+            return self._factory(name)
+        except Exception as e:
+            raise SourceUnavailable(f"Cannot connect to source {name}: {e}") from e
+
+    def release(self, name: str, source: DataSource) -> None:
+        with self._lock:
+            self._idle.setdefault(name, []).append((source, time.monotonic()))
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for name, sources in idle.items():
+            for source, _ in sources:
+                self._close(name, source)
+
+    @staticmethod
+    def _is_alive(source: DataSource) -> bool:
+        try:
+            return source.is_alive()
+        except Exception:
+            return False
+
+    def _close(self, name: str, source: DataSource) -> None:
+        try:
+            source.disconnect()
+        except Exception as e:
+            logger.warning("Error closing connection for source %s: %s", name, e)
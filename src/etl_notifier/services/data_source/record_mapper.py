@@ -0,0 +1,55 @@
+from operator import itemgetter
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
+
+from ...models.notification_record import NotificationRecord
+
+
+class RecordMapper:
+    # Default result column for each NotificationRecord field, in constructor order
+    COLUMNS: Dict[str, str] = {
+        "account_name": "AccountName",
+        "environment": "Environment",
+        "start_time": "StartTime",
+        "url": "PipelineURL",
+        "error_message": "errorMessage",
+        "over_hour": "over_hour",
+        "run_id": "PipelineRunId",
+    }
+    REQUIRED = ("account_name", "environment", "start_time")
+
+    def __init__(self, column_map: Optional[Mapping[str, str]] = None):
+        column_map = column_map or {}
+        unknown = set(column_map) - set(self.COLUMNS.values())
+        if unknown:
+            raise ValueError(f"Unknown columns in column mapping: {', '.join(sorted(unknown))}")
+        self.names = {field: column_map.get(column, column) for field, column in self.COLUMNS.items()}
+
+    def bind(self, columns: Sequence[str]) -> Callable[[Sequence[Any]], NotificationRecord]:
+        positions = {column: index for index, column in enumerate(columns)}
+        missing = [self.names[field] for field in self.REQUIRED if self.names[field] not in positions]
+        if missing:
+            raise ValueError(f"Query result is missing required columns: {', '.join(missing)}")
+
+        indexes = [positions.get(column) for column in self.names.values()]
+        if None not in indexes:
+            getter = itemgetter(*indexes)
+            return lambda row: NotificationRecord(*getter(row))
+
+        getters = [itemgetter(index) if index is not None else _none for index in indexes]
+        return lambda row: NotificationRecord(*[get(row) for get in getters])
+
+    def from_dict(self, row: Mapping[str, Any]) -> NotificationRecord:
+        names = self.names
+        return NotificationRecord(
+            account_name=row[names["account_name"]],
+            environment=row[names["environment"]],
+            start_time=row[names["start_time"]],
+            url=row.get(names["url"]),
+            error_message=row.get(names["error_message"]),
+            over_hour=row.get(names["over_hour"]),
+            run_id=row.get(names["run_id"]),
+        )
+
+
+def _none(row: Sequence[Any]) -> None:
+    return None
@@ -0,0 +1,249 @@
+import bisect
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans sub-second cache operations up to queries and sinks running against their deadlines
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric(ABC):
+    TYPE = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"Metric {self.name} expects labels {', '.join(self.labels) or '(none)'}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _format_labels(self, values: LabelValues, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = [*zip(self.labels, values), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.TYPE}", *self._samples()]
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        pass
+
+
+class Counter(Metric):
+    TYPE = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._format_labels(key)} {_number(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def replace(self, samples: Iterable[Tuple[float, Mapping[str, str]]]) -> None:
+        """Sets exactly these ``(value, labels)`` samples, so label sets that no longer exist stop being exported."""
+        values = {self._key(dict(labels)): value for value, labels in samples}
+        with self._lock:
+            self._values = values
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values = {}
+
+
+class Histogram(Metric):
+    TYPE = "histogram"
+
+    def __init__(
+        self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = sorted(buckets)
+        # Per label set: non-cumulative bucket counts (the last slot is +Inf), sum
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([], 0.0))
+            return sum(counts)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip([*self.buckets, math.inf], counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def gauge(self, name: str, description: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, description, labels))
+
+    def histogram(
+        self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(line + "\n" for metric in metrics for line in metric.render())
+
+
+class NotifierMetrics:
+    """The metrics recorded by ETLNotifier and its dispatcher."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.cycle_duration = r.histogram("etl_cycle_duration_seconds", "Duration of a full run over the due queries")
+        self.cycle_errors = r.counter("etl_cycle_errors_total", "Runs aborted by an error")
+        self.phase_duration = r.histogram(
+            "etl_phase_duration_seconds", "Duration of the cache phases of a run", ["phase"]
+        )
+        self.source_errors = r.counter(
+            "etl_source_errors_total", "Runs in which a source could not be connected", ["source"]
+        )
+        self.query_duration = r.histogram(
+            "etl_query_duration_seconds",
+            "Duration of a query, from execution through fetching, record mapping and processing",
+            ["source", "query"],
+        )
+        self.query_rows = r.counter("etl_query_rows_total", "Rows returned by a query", ["source", "query"])
+        self.query_errors = r.counter("etl_query_errors_total", "Failed query executions", ["source", "query"])
+        self.notified_records = r.counter("etl_notified_records_total", "New records handed to sinks", ["query"])
+        self.sink_duration = r.histogram("etl_sink_duration_seconds", "Duration of a notification send", ["sink"])
+        self.sink_errors = r.counter("etl_sink_errors_total", "Failed or timed-out notification sends", ["sink"])
+        self.rate_limit = r.counter(
+            "etl_rate_limit_total", "Rate-limited sends by outcome: admitted, delayed or shed", ["sink", "outcome"]
+        )
+        self.outbox_dead_letters = r.gauge(
+            "etl_outbox_dead_letters", "Outbox messages given up on and kept for inspection", ["sink"]
+        )
+        self.cache_entries = r.gauge("etl_cache_entries", "Cache entries per query after the last run", ["query"])
+        self.cache_size = r.gauge("etl_cache_size_bytes", "Size of the cache file after the last run")
+
+
+class MetricsServer:
+    """Serves ``registry`` at ``/metrics`` from a background thread."""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = ""):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("metrics: " + format, *args)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="etl-metrics", daemon=True)
+        self._thread.start()
+        logger.info("Serving metrics on port %d", self.port)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+        self._server.server_close()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
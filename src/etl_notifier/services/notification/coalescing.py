@@ -0,0 +1,87 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ...models.notification_record import NotificationRecord
+from .dispatcher import NotificationDispatcher
+from .strategy import NotificationBatch, NotificationStrategy
+
+logger = logging.getLogger(__name__)
+
+
+def merge_batches(batches: Iterable[NotificationBatch]) -> List[NotificationBatch]:
+    """Merges batches sharing the same templates (i.e. from the same query) into one record list, in order."""
+    merged: Dict[Tuple[str, str], List[NotificationRecord]] = {}
+    for records, template_single, template_multiple in batches:
+        merged.setdefault((template_single, template_multiple), []).extend(records)
+    return [
+        (records, template_single, template_multiple)
+        for (template_single, template_multiple), records in merged.items()
+    ]
+
+
+class CoalescingStrategy(NotificationStrategy):
+    """Buffers notifications for ``window`` seconds and delivers them to ``inner`` as one batch.
+
+    Delivery happens on a timer thread, so errors from the inner sink are logged rather than raised to the caller.
+    With a ``dispatcher``, that delivery runs through it as sink ``name``, so it is timed, traced, bounded by
+    ``deadline`` and counted in the sink metrics like an inline send.
+    """
+
+    def __init__(
+        self,
+        inner: NotificationStrategy,
+        window: float,
+        dispatcher: Optional[NotificationDispatcher] = None,
+        name: str = "coalesced",
+        deadline: Optional[float] = None,
+    ):
+        self.inner = inner
+        self.window = window
+        self.dispatcher = dispatcher
+        self.name = name
+        self.deadline = deadline
+        self._pending: List[NotificationBatch] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def send_notification(
+        self,
+        records: List[NotificationRecord],
+        template_single: str,
+        template_multiple: str,
+    ) -> None:
+        with self._lock:
+            self._pending.append((records, template_single, template_multiple))
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush_quietly)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return
+        self.inner.send_batch(merge_batches(pending))
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.inner.close()
+
+    def _flush_quietly(self) -> None:
+        try:
+            if self.dispatcher is None:
+                self.flush()
+                return
+            deadlines = {self.name: self.deadline} if self.deadline is not None else None
+            error = self.dispatcher.dispatch({self.name: self.flush}, deadlines)[self.name].error
+        except Exception as e:
+            error = e
+        if error is not None:
+            logger.error("Error sending coalesced notification to %s: %s", self.name, error)
@@ -0,0 +1,82 @@
+import contextvars
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional
+
+from ..metrics import NotifierMetrics
+from ..tracing import Tracer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DispatchResult:
+    sink: str
+    elapsed: float
+    error: Optional[BaseException] = None
+    # Set when the deadline passed: the call is still running and this future settles when it finishes
+    pending: Optional[Future] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class NotificationDispatcher:
+    """Runs one call per sink concurrently, isolating failures and bounding each by a deadline."""
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        default_deadline: float = 30,
+        metrics: Optional[NotifierMetrics] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        self.default_deadline = default_deadline
+        self.metrics = metrics
+        self.tracer = tracer or Tracer()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="etl-sink")
+
+    def dispatch(
+        self,
+        calls: Mapping[str, Callable[[], None]],
+        deadlines: Optional[Mapping[str, float]] = None,
+    ) -> Dict[str, DispatchResult]:
+        deadlines = deadlines or {}
+        start = time.monotonic()
+        # Each call runs in a copy of the caller's context so its span is a child of the caller's span
+        futures = {
+            sink: self._executor.submit(contextvars.copy_context().run, self._timed, sink, call)
+            for sink, call in calls.items()
+        }
+
+        results: Dict[str, DispatchResult] = {}
+        for sink, future in futures.items():
+            deadline = deadlines.get(sink, self.default_deadline)
+            try:
+                elapsed = future.result(timeout=max(start + deadline - time.monotonic(), 0))
+                results[sink] = DispatchResult(sink, elapsed)
+            except FutureTimeoutError:
+                # The call cannot be interrupted; it finishes in the background but no longer blocks other sinks
+                error = TimeoutError(f"sink '{sink}' exceeded its {deadline}s deadline")
+                results[sink] = DispatchResult(sink, time.monotonic() - start, error, pending=future)
+            except Exception as e:
+                results[sink] = DispatchResult(sink, time.monotonic() - start, e)
+        if self.metrics is not None:
+            for result in results.values():
+                self.metrics.sink_duration.observe(result.elapsed, sink=result.sink)
+                if not result.ok:
+                    self.metrics.sink_errors.inc(sink=result.sink)
+        return results
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _timed(self, sink: str, call: Callable[[], None]) -> float:
+        start = time.monotonic()
+        with self.tracer.span("sink.send", sink=sink):
+            call()
+        return time.monotonic() - start
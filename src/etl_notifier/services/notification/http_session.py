@@ -0,0 +1,87 @@
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# POST is not idempotent: only retry statuses that say the request was not processed. A 500, 502 or 504
+# may come after the message was posted, so retrying it could post the notification twice.
+RETRY_STATUSES = (429, 503)
+
+_sessions: Dict[Tuple, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+class BoundedRetry(Retry):
+    """Retry whose sleeps, whether exponential backoff or a server's Retry-After, never exceed ``max_sleep``."""
+
+    def __init__(self, *args: Any, max_sleep: float = 5.0, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.max_sleep = max_sleep
+
+    def new(self, **kwargs: Any) -> "BoundedRetry":
+        retry = super().new(**kwargs)
+        retry.max_sleep = self.max_sleep
+        return retry
+
+    def get_backoff_time(self) -> float:
+        return min(super().get_backoff_time(), self.max_sleep)
+
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.max_sleep)
+
+
+def get_session(
+    url: str,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    pool_maxsize: int = 10,
+    max_retry_wait: float = 10.0,
+) -> requests.Session:
+    """Shared keep-alive session for every sink posting to the same host with the same retry policy.
+
+    ``max_retry_wait`` bounds the total time spent sleeping between retries, so retries fit in the sink's deadline.
+    """
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc, retries, backoff_factor, pool_maxsize, max_retry_wait)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = _build_session(retries, backoff_factor, pool_maxsize, max_retry_wait)
+        return session
+
+
+def close_sessions() -> None:
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def _build_session(
+    retries: int, backoff_factor: float, pool_maxsize: int, max_retry_wait: float
+) -> requests.Session:
+    # Connection errors happen before the request is sent and are safe to retry. Read errors may happen after
+    # the message was posted, so they are not retried.
+    retry = BoundedRetry(
+        total=retries,
+        connect=retries,
+        read=0,
+        other=0,
+        status=retries,
+        max_sleep=max_retry_wait / max(retries, 1),
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -1,18 +1,49 @@
+import os
 import uuid
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
-from pymongo import MongoClient
+from pymongo import InsertOne, MongoClient, UpdateOne
+from pymongo.write_concern import WriteConcern
 
 from ...models.notification_record import NotificationRecord
 from .strategy import NotificationStrategy
 
+MODES = ("insert", "upsert")
+
 
 class MongoNotificationStrategy(NotificationStrategy):
-    def __init__(self, connection_string: str, database: str, collection: str, environments: Optional[List[str]] = None):
+    """Writes one handoff document per record.
+
+    ``mode: upsert`` keys documents on the pipeline run id, so a retried notification never creates a second
+    document for the same run; a unique partial index on ``runId`` is created on startup to enforce it.
+    """
+
+    PROMPT = "Use /etl-triage to analyze ADF failure {} for {} ({})"
+
+    def __init__(
+        self,
+        connection_string: str,
+        database: str,
+        collection: str,
+        environments: Optional[List[str]] = None,
+        mode: str = "insert",
+        ordered: bool = True,
+        write_concern: Optional[Dict[str, Any]] = None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown MongoDB write mode: {mode}")
         self._client = MongoClient(connection_string)
         self._col = self._client[database][collection]
+        if write_concern:
+            self._col = self._col.with_options(write_concern=WriteConcern(**write_concern))
         self._environments = [e.lower() for e in environments] if environments is not None else None
+        self.mode = mode
+        self.ordered = ordered
+        if mode == "upsert":
+            self._col.create_index(
+                "runId", unique=True, name="runId_unique", partialFilterExpression={"runId": {"$type": "string"}}
+            )
 
     def send_notification(
         self,
@@ -23,18 +54,44 @@ class MongoNotificationStrategy(NotificationStrategy):
         filtered = [r for r in records if not self._environments or r.environment.lower() in self._environments]
         if not filtered:
             return
-        now = datetime.now(timezone.utc)
-        self._col.insert_many([self._build_doc(r, now) for r in filtered])
-
-    def _build_doc(self, record: NotificationRecord, now: datetime) -> dict:
-        return {
-            "id": str(uuid.uuid4()),
-            "type": "ETLFailure",
-            "prompt": f"Use /etl-triage to analyze ADF failure {record.run_id} for {record.account_name} ({record.environment})",
-            "status": "new",
-            "createdAt": now,
-            "source": "etlnotifier",
-            "startedAt": now,
-            "completedAt": now,
-            "handoffId": str(uuid.uuid4()),
-        }
+        docs = self._build_docs(filtered, datetime.now(timezone.utc))
+        if self.mode == "insert":
+            self._col.insert_many(docs, ordered=self.ordered)
+            return
+
+        # $setOnInsert leaves an existing document untouched; the filter's runId is added to new documents.
+        # Records without a run id cannot be deduplicated and are inserted as-is.
+        operations = [
+            UpdateOne({"runId": str(r.run_id)}, {"$setOnInsert": doc}, upsert=True)
+            if r.run_id is not None
+            else InsertOne(doc)
+            for r, doc in zip(filtered, docs)
+        ]
+        self._col.bulk_write(operations, ordered=self.ordered)
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _build_docs(self, records: List[NotificationRecord], now: datetime) -> List[dict]:
+        ids = _random_uuids(2 * len(records))
+        prompt = self.PROMPT.format
+        return [
+            {
+                "id": next(ids),
+                "type": "ETLFailure",
+                "prompt": prompt(record.run_id, record.account_name, record.environment),
+                "status": "new",
+                "createdAt": now,
+                "source": "etlnotifier",
+                "startedAt": now,
+                "completedAt": now,
+                "handoffId": next(ids),
+            }
+            for record in records
+        ]
+
+
+def _random_uuids(count: int) -> Iterator[str]:
+    # Random (version 4) UUIDs from a single urandom call instead of one uuid4() call, and syscall, per id
+    raw = os.urandom(16 * count)
+    return (str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, len(raw), 16))
@@ -0,0 +1,332 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from functools import partial
+from typing import Any, Dict, List, Mapping, Optional
+from uuid import UUID
+
+from ...models.notification_record import NotificationRecord
+from ..metrics import NotifierMetrics
+from .coalescing import merge_batches
+from .dispatcher import NotificationDispatcher
+from .strategy import NotificationStrategy
+
+logger = logging.getLogger(__name__)
+
+# Client errors that a later attempt can still fix: request timeout and too many requests
+RETRYABLE_CLIENT_ERRORS = {408, 429}
+
+
+@dataclass
+class OutboxMessage:
+    id: int
+    sink: str
+    records: List[NotificationRecord]
+    template_single: str
+    template_multiple: str
+    attempts: int
+    priority: Optional[str] = None
+    created_at: float = 0.0
+
+
+class SqliteOutbox:
+    """Durable queue of pending notifications, one FIFO per sink, with a dead-letter table for undeliverable ones."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(file_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, sink TEXT NOT NULL, payload TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, created_at REAL NOT NULL, "
+            "last_error TEXT)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS outbox_sink_id ON outbox (sink, id)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letters ("
+            "id INTEGER PRIMARY KEY, sink TEXT NOT NULL, payload TEXT NOT NULL, attempts INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, failed_at REAL NOT NULL, last_error TEXT)"
+        )
+
+    def enqueue(
+        self,
+        sinks: List[str],
+        records: List[NotificationRecord],
+        template_single: str,
+        template_multiple: str,
+        priority: Optional[str] = None,
+    ) -> None:
+        payload = json.dumps(
+            {
+                "records": [list(record.astuple()) for record in records],
+                "template_single": template_single,
+                "template_multiple": template_multiple,
+                "priority": priority,
+            },
+            default=_encode_value,
+        )
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO outbox (sink, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+                [(sink, payload, now, now) for sink in sinks],
+            )
+
+    def due(self, now: float) -> List[OutboxMessage]:
+        # Only the head of each sink's queue is eligible, so a failing message holds back later ones for that sink
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, sink, payload, attempts, created_at FROM outbox AS o "
+                "WHERE id = (SELECT MIN(id) FROM outbox WHERE sink = o.sink) AND next_attempt_at <= ?",
+                (now,),
+            ).fetchall()
+        return [self._message(*row) for row in rows]
+
+    def queued(self, sink: str) -> List[OutboxMessage]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, sink, payload, attempts, created_at FROM outbox WHERE sink = ? ORDER BY id", (sink,)
+            ).fetchall()
+        return [self._message(*row) for row in rows]
+
+    @staticmethod
+    def _message(message_id: int, sink: str, payload: str, attempts: int, created_at: float) -> OutboxMessage:
+        data = json.loads(payload, object_hook=_decode_value)
+        return OutboxMessage(
+            id=message_id,
+            sink=sink,
+            records=[NotificationRecord(*fields) for fields in data["records"]],
+            template_single=data["template_single"],
+            template_multiple=data["template_multiple"],
+            attempts=attempts,
+            priority=data.get("priority"),
+            created_at=created_at,
+        )
+
+    def ack(self, *message_ids: int) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM outbox WHERE id = ?", [(message_id,) for message_id in message_ids]
+            )
+
+    def retry(self, message_id: int, error: str, next_attempt_at: float) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                (error, next_attempt_at, message_id),
+            )
+
+    def dead_letter(self, message_ids: List[int], error: str) -> None:
+        # Moves messages out of the queue so they stop blocking their sink but stay available for inspection
+        now = time.time()
+        with self._lock, self._connection:
+            for message_id in message_ids:
+                self._connection.execute(
+                    "INSERT INTO dead_letters (id, sink, payload, attempts, created_at, failed_at, last_error) "
+                    "SELECT id, sink, payload, attempts + 1, created_at, ?, ? FROM outbox WHERE id = ?",
+                    (now, error, message_id),
+                )
+                self._connection.execute("DELETE FROM outbox WHERE id = ?", (message_id,))
+
+    def dead_letters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._connection.execute("SELECT sink, COUNT(*) FROM dead_letters GROUP BY sink").fetchall())
+
+    def pending(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._connection.execute("SELECT sink, COUNT(*) FROM outbox GROUP BY sink").fetchall())
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class OutboxWorker:
+    """Background thread draining the outbox with per-sink ordering, retries and at-least-once delivery.
+
+    Sinks with a coalescing window are sent their whole queue as one batch once the oldest message is ``window``
+    seconds old. Messages are only removed after that batch is delivered, so coalescing keeps the outbox guarantee.
+    A message is dead-lettered after ``max_attempts`` failed sends, or at once when the sink rejects it with a
+    client error that retrying cannot fix.
+    """
+
+    def __init__(
+        self,
+        outbox: SqliteOutbox,
+        strategies: Mapping[str, NotificationStrategy],
+        dispatcher: NotificationDispatcher,
+        deadlines: Optional[Mapping[str, float]] = None,
+        windows: Optional[Mapping[str, float]] = None,
+        poll_interval: float = 1.0,
+        base_backoff: float = 5.0,
+        max_backoff: float = 300.0,
+        max_attempts: int = 10,
+        metrics: Optional[NotifierMetrics] = None,
+    ):
+        self.outbox = outbox
+        self.strategies = strategies
+        self.dispatcher = dispatcher
+        self.deadlines = deadlines or {}
+        self.windows = windows or {}
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.metrics = metrics
+        # Sinks whose last send outlived its deadline; they are skipped until that send settles
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._record_dead_letters()
+        self._thread = threading.Thread(target=self._run, name="etl-outbox", daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def drain_once(self) -> int:
+        now = time.time()
+        calls = {}
+        batches: Dict[str, List[OutboxMessage]] = {}
+        with self._in_flight_lock:
+            in_flight = set(self._in_flight)
+        for message in self.outbox.due(now):
+            if message.sink in in_flight:
+                continue
+            strategy = self.strategies.get(message.sink)
+            if strategy is None:
+                logger.warning("Dropping outbox message %d for unknown sink %s", message.id, message.sink)
+                self.outbox.ack(message.id)
+                continue
+            window = self.windows.get(message.sink)
+            if window:
+                if now - message.created_at < window:
+                    continue
+                queue = batches[message.sink] = self.outbox.queued(message.sink)
+                merged = merge_batches((m.records, m.template_single, m.template_multiple) for m in queue)
+                calls[message.sink] = partial(strategy.send_batch, merged)
+                continue
+            batches[message.sink] = [message]
+            args = (message.records, message.template_single, message.template_multiple)
+            if message.priority:
+                calls[message.sink] = partial(strategy.send_with_priority, *args, message.priority)
+            else:
+                calls[message.sink] = partial(strategy.send_notification, *args)
+
+        delivered = 0
+        for result in self.dispatcher.dispatch(calls, self.deadlines).values():
+            batch = batches[result.sink]
+            if result.ok:
+                self.outbox.ack(*(message.id for message in batch))
+                delivered += len(batch)
+            elif result.pending is not None:
+                # Retrying now would send again while the first attempt may still succeed; wait for it instead
+                logger.warning("Delivery to %s is past its deadline, waiting for it to finish", result.sink)
+                with self._in_flight_lock:
+                    self._in_flight[result.sink] = result.pending
+                result.pending.add_done_callback(partial(self._settle, result.sink, batch))
+            else:
+                self._retry(result.sink, batch, result.error)
+        return delivered
+
+    def _settle(self, sink: str, batch: List[OutboxMessage], future: Future) -> None:
+        try:
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is None:
+                self.outbox.ack(*(message.id for message in batch))
+            else:
+                self._retry(sink, batch, error)
+        except Exception as e:
+            logger.error("Error settling late delivery to %s: %s", sink, e)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(sink, None)
+            self.wake()
+
+    def _retry(self, sink: str, batch: List[OutboxMessage], error: BaseException) -> None:
+        # Retries are tracked on the head message, which keeps the rest of the sink's queue behind it
+        message = batch[0]
+        if not _is_retryable(error) or message.attempts + 1 >= self.max_attempts:
+            logger.error(
+                "Delivery to %s failed (attempt %d), moving %d message(s) to dead letters: %s",
+                sink, message.attempts + 1, len(batch), error,
+            )
+            self.outbox.dead_letter([message.id for message in batch], str(error))
+            self._record_dead_letters()
+            return
+        delay = min(self.base_backoff * 2 ** message.attempts, self.max_backoff)
+        logger.error(
+            "Delivery to %s failed (attempt %d), retrying in %.0fs: %s",
+            sink, message.attempts + 1, delay, error,
+        )
+        self.outbox.retry(message.id, str(error), time.time() + delay)
+
+    def _record_dead_letters(self) -> None:
+        if self.metrics is None:
+            return
+        self.metrics.outbox_dead_letters.replace(
+            (count, {"sink": sink}) for sink, count in self.outbox.dead_letters().items()
+        )
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                if self.drain_once():
+                    continue
+            except Exception as e:
+                logger.error("Error draining notification outbox: %s", e)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+
+def _is_retryable(error: BaseException) -> bool:
+    # HTTP errors carry the response; anything else (timeouts, connection errors, rate limiting) is transient
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if not isinstance(status, int):
+        return True
+    return not 400 <= status < 500 or status in RETRYABLE_CLIENT_ERRORS
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"__decimal__": str(value)}
+    if isinstance(value, UUID):
+        return {"__uuid__": str(value)}
+    # Anything else would come back as a string and no longer compare equal, so refuse it at enqueue time
+    raise TypeError(f"Object of type {type(value).__name__} cannot be stored in the outbox")
+
+
+def _decode_value(obj: Dict[str, Any]) -> Any:
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    if "__decimal__" in obj:
+        return Decimal(obj["__decimal__"])
+    if "__uuid__" in obj:
+        return UUID(obj["__uuid__"])
+    return obj
@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Callable, List, Optional
+
+from ...models.notification_record import NotificationRecord
+from ..metrics import Counter
+from .strategy import NotificationBatch, NotificationStrategy
+
+HIGH = "high"
+NORMAL = "normal"
+LOW = "low"
+PRIORITIES = (HIGH, NORMAL, LOW)
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``rate`` tokens per second accumulate up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """Take a token, returning how long the caller must wait before using it.
+
+        Returns ``None`` without taking a token if the wait would exceed ``max_wait``. Tokens may go negative,
+        so concurrent callers queue up in reservation order instead of racing for the next refill.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+class RateLimitedStrategy(NotificationStrategy):
+    """Sends through ``inner`` at no more than ``rate`` calls per second, with bursts of up to ``burst``.
+
+    When the bucket is empty, ``high`` priority sends wait for a token, ``normal`` sends wait up to ``max_delay``
+    seconds and ``low`` sends never wait. ``max_wait`` caps the wait for every priority, so time spent waiting
+    for a token never uses up the sink's delivery deadline. Sends that cannot be admitted raise RateLimitExceeded.
+    Outcomes are counted in ``outcomes`` under this sink's ``name``.
+    """
+
+    def __init__(
+        self,
+        inner: NotificationStrategy,
+        rate: float,
+        burst: Optional[float] = None,
+        max_delay: float = 30,
+        max_wait: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        outcomes: Optional[Counter] = None,
+        name: str = "",
+    ):
+        self.inner = inner
+        self.bucket = TokenBucket(rate, burst if burst is not None else max(1.0, rate), clock)
+        self.max_delay = max_delay if max_wait is None else min(max_delay, max_wait)
+        self.max_wait = max_wait
+        self._sleep = sleep
+        self.outcomes = outcomes or Counter(
+            "etl_rate_limit_total", "Rate-limited sends by outcome", ["sink", "outcome"]
+        )
+        self.name = name
+
+    @property
+    def admitted(self) -> int:
+        return int(self.outcomes.value(sink=self.name, outcome="admitted"))
+
+    @property
+    def delayed(self) -> int:
+        return int(self.outcomes.value(sink=self.name, outcome="delayed"))
+
+    @property
+    def shed(self) -> int:
+        return int(self.outcomes.value(sink=self.name, outcome="shed"))
+
+    def send_notification(
+        self,
+        records: List[NotificationRecord],
+        template_single: str,
+        template_multiple: str,
+    ) -> None:
+        self.send_with_priority(records, template_single, template_multiple, NORMAL)
+
+    def send_with_priority(
+        self,
+        records: List[NotificationRecord],
+        template_single: str,
+        template_multiple: str,
+        priority: str,
+    ) -> None:
+        self._admit(priority)
+        self.inner.send_notification(records, template_single, template_multiple)
+
+    def send_batch(self, batches: List[NotificationBatch]) -> None:
+        # A batch is already the product of coalescing, so it waits like a high priority send, up to ``max_wait``
+        self._admit(HIGH)
+        self.inner.send_batch(batches)
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def _admit(self, priority: str) -> None:
+        max_wait = {HIGH: self.max_wait, NORMAL: self.max_delay, LOW: 0.0}.get(priority, self.max_delay)
+        wait = self.bucket.reserve(max_wait)
+        if wait is None:
+            self.outcomes.inc(sink=self.name, outcome="shed")
+            raise RateLimitExceeded(f"rate limit of {self.bucket.rate}/s exceeded, {priority} priority send shed")
+        # Delayed sends are admitted too, so ``delayed`` is a subset of ``admitted``
+        self.outcomes.inc(sink=self.name, outcome="admitted")
+        if wait > 0:
+            self.outcomes.inc(sink=self.name, outcome="delayed")
+            self._sleep(wait)
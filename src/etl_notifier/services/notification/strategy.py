@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Tuple
 
 from ...models.notification_record import NotificationRecord
 
+# (records, template_single, template_multiple) as passed to send_notification
+NotificationBatch = Tuple[List[NotificationRecord], str, str]
+
 
 class NotificationStrategy(ABC):
     @abstractmethod
@@ -13,3 +16,21 @@ class NotificationStrategy(ABC):
         template_multiple: str,
     ) -> None:
         pass
+
+    def send_with_priority(
+        self,
+        records: List[NotificationRecord],
+        template_single: str,
+        template_multiple: str,
+        priority: str,
+    ) -> None:
+        # Priority only matters to sinks that can delay or shed sends, such as RateLimitedStrategy
+        self.send_notification(records, template_single, template_multiple)
+
+    def send_batch(self, batches: List[NotificationBatch]) -> None:
+        # Sinks that can merge several notifications into one outbound call override this
+        for records, template_single, template_multiple in batches:
+            self.send_notification(records, template_single, template_multiple)
+
+    def close(self) -> None:
+        pass
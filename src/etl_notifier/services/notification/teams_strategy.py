@@ -1,16 +1,34 @@
-from typing import Any, Dict, List
-
-import requests
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ...models.notification_record import NotificationRecord
-from .strategy import NotificationStrategy
+from ..tracing import current_span
+from .http_session import get_session
+from .strategy import NotificationBatch, NotificationStrategy
+from .template import compile_template
 
 
 class TeamsNotificationStrategy(NotificationStrategy):
     MESSAGE_INTRO = "\r **[ETL Notifier]** [Automated Message] \n\n"
+    JSON_HEADERS = {"Content-Type": "application/json"}
+    _payload_skeleton: Optional[Tuple[bytes, bytes]] = None
 
-    def __init__(self, webhook_url: str):
+    def __init__(
+        self,
+        webhook_url: str,
+        timeout: float = 10,
+        connect_timeout: float = 3.05,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_retry_wait: float = 10,
+        max_message_chars: Optional[int] = 20000,
+    ):
         self.webhook_url = webhook_url
+        self.max_message_chars = max_message_chars
+        self.timeout = (connect_timeout, timeout)
+        self._session = get_session(
+            webhook_url, retries=retries, backoff_factor=backoff_factor, max_retry_wait=max_retry_wait
+        )
 
     def send_notification(
         self,
@@ -18,8 +36,20 @@ class TeamsNotificationStrategy(NotificationStrategy):
         template_single: str,
         template_multiple: str,
     ) -> None:
-        message = self._format(records, template_single, template_multiple)
-        response = requests.post(self.webhook_url, json=self._build_payload(message))
+        self._post(self._format(records, template_single, template_multiple))
+
+    def send_batch(self, batches: List[NotificationBatch]) -> None:
+        if len(batches) == 1:
+            self.send_notification(*batches[0])
+            return
+        # One message for all batches: each keeps its own multiple-template header
+        self._post(self._compose([(template_multiple, records) for records, _, template_multiple in batches]))
+
+    def _post(self, message: str) -> None:
+        response = self._session.post(
+            self.webhook_url, data=self._encode_payload(message), headers=self.JSON_HEADERS, timeout=self.timeout
+        )
+        current_span().set_attribute("http.status_code", response.status_code)
         response.raise_for_status()
 
     def _format(self, records: List[NotificationRecord], template_single: str, template_multiple: str) -> str:
@@ -28,22 +58,44 @@ class TeamsNotificationStrategy(NotificationStrategy):
         return self._format_multiple(records, template_multiple)
 
     def _format_single(self, record: NotificationRecord, template: str) -> str:
-        return self.MESSAGE_INTRO + template.format_map({
-            "account": record.account_name,
-            "env": record.environment,
-            "url": record.url or "",
-            "errorMessage": record.error_message or "",
-            "over_hour": record.over_hour or "",
-        })
+        return self.MESSAGE_INTRO + compile_template(template).render(record)
 
     def _format_multiple(self, records: List[NotificationRecord], template: str) -> str:
-        lines = []
-        for record in records:
-            if record.url:
-                lines.append(f" \n\n- [**{record.account_name}**: **{record.environment}**]({record.url})")
-            else:
-                lines.append(f" \n\n- **{record.account_name}**: **{record.environment}({record.url})**")
-        return self.MESSAGE_INTRO + template + "".join(lines)
+        return self._compose([(template, records)])
+
+    def _format_line(self, record: NotificationRecord) -> str:
+        if record.url:
+            return f" \n\n- [**{record.account_name}**: **{record.environment}**]({record.url})"
+        return f" \n\n- **{record.account_name}**: **{record.environment}({record.url})**"
+
+    def _compose(self, sections: Sequence[Tuple[str, List[NotificationRecord]]]) -> str:
+        # Lines that would push the message past max_message_chars are summarised in a final overflow line
+        limit = self.max_message_chars
+        if limit is not None:
+            limit -= len(self._overflow_line(sum(len(records) for _, records in sections)))
+        parts = [self.MESSAGE_INTRO]
+        size = len(self.MESSAGE_INTRO)
+        omitted = 0
+        for template, records in sections:
+            if omitted:
+                omitted += len(records)
+                continue
+            parts.append(template)
+            size += len(template)
+            for index, record in enumerate(records):
+                line = self._format_line(record)
+                if limit is not None and size + len(line) > limit:
+                    omitted = len(records) - index
+                    break
+                parts.append(line)
+                size += len(line)
+        if omitted:
+            parts.append(self._overflow_line(omitted))
+        return "".join(parts)
+
+    @staticmethod
+    def _overflow_line(omitted: int) -> str:
+        return f" \n\n- ... and {omitted} more"
 
     def _build_payload(self, message: str) -> Dict[str, Any]:
         return {
@@ -60,3 +112,12 @@ class TeamsNotificationStrategy(NotificationStrategy):
                 }
             ],
         }
+
+    def _encode_payload(self, message: str) -> bytes:
+        # The card around the message never changes: serialize it once and splice each message into it
+        skeleton = type(self)._payload_skeleton
+        if skeleton is None:
+            marker = json.dumps("\0message\0")
+            prefix, suffix = json.dumps(self._build_payload("\0message\0")).split(marker)
+            skeleton = type(self)._payload_skeleton = (prefix.encode(), suffix.encode())
+        return skeleton[0] + json.dumps(message).encode() + skeleton[1]
@@ -0,0 +1,57 @@
+from functools import lru_cache
+from string import Formatter
+
+from ...models.notification_record import NotificationRecord
+
+# Placeholders available to message templates, in the positional order MessageTemplate renders them
+PLACEHOLDERS = ("account", "env", "url", "errorMessage", "over_hour")
+
+
+class MessageTemplate:
+    """A ``message_single`` template parsed and validated once, rendered with a single ``str.format`` call."""
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = []
+        try:
+            parsed = list(Formatter().parse(source))
+        except ValueError as e:
+            raise ValueError(f"Malformed template: {e}")
+        for literal, field, format_spec, conversion in parsed:
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is None:
+                continue
+            if field not in PLACEHOLDERS:
+                raise ValueError(
+                    f"Unknown placeholder {{{field}}} in template; expected one of "
+                    + ", ".join(f"{{{name}}}" for name in PLACEHOLDERS)
+                )
+            if "{" in format_spec:
+                raise ValueError(f"Nested placeholders are not supported in {{{field}}}")
+            parts.append(
+                "{" + str(PLACEHOLDERS.index(field))
+                + (f"!{conversion}" if conversion else "")
+                + (f":{format_spec}" if format_spec else "")
+                + "}"
+            )
+        self._format = "".join(parts).format
+        try:
+            # Catches bad conversions and format specs now rather than on the first send
+            self._format(*[""] * len(PLACEHOLDERS))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid template: {e}")
+
+    def render(self, record: NotificationRecord) -> str:
+        return self._format(
+            record.account_name,
+            record.environment,
+            record.url or "",
+            record.error_message or "",
+            record.over_hour or "",
+        )
+
+
+@lru_cache(maxsize=256)
+def compile_template(source: str) -> MessageTemplate:
+    # Templates come from static config, so each distinct string is parsed once per process
+    return MessageTemplate(source)
@@ -0,0 +1,108 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import signal
+import time
+import tracemalloc
+from contextlib import nullcontext
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_NOOP_SCOPE = nullcontext()
+
+
+class CycleProfiler:
+    """Profiles the next requested poll cycles with cProfile and tracemalloc.
+
+    For every profiled cycle it writes ``cycle-<time>-<n>.prof`` (pstats) and ``.tracemalloc`` (a snapshot of the
+    allocations still alive at the end of the cycle) to ``directory``, and logs the ``top`` hotspots and allocation
+    sites. cProfile only sees the thread calling ``run``; tracemalloc covers every thread. When no cycles are
+    requested ``profile`` returns a shared no-op context.
+    """
+
+    def __init__(self, directory: str = "profiles", top: int = 20):
+        self.directory = directory
+        self.top = top
+        self.profiled = 0
+        # Only touched from the main thread (serve loop and signal handlers), so no lock is needed
+        self._remaining = 0
+
+    @property
+    def pending(self) -> int:
+        return self._remaining
+
+    def request(self, cycles: int) -> None:
+        self._remaining += cycles
+
+    def profile(self) -> Any:
+        if self._remaining <= 0:
+            return _NOOP_SCOPE
+        self._remaining -= 1
+        return _ProfileScope(self)
+
+    def _report(self, profile: cProfile.Profile, snapshot: tracemalloc.Snapshot, elapsed: float, peak: int) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self.profiled += 1
+        base = os.path.join(self.directory, f"cycle-{time.strftime('%Y%m%d-%H%M%S')}-{self.profiled}")
+        profile.dump_stats(f"{base}.prof")
+        snapshot.dump(f"{base}.tracemalloc")
+
+        hotspots = io.StringIO()
+        pstats.Stats(profile, stream=hotspots).sort_stats("cumulative").print_stats(self.top)
+        allocations = "\n".join(str(stat) for stat in snapshot.statistics("lineno")[: self.top])
+        logger.info(
+            "Profiled cycle in %.2fs, peak traced memory %.1f MiB; wrote %s.prof and %s.tracemalloc\n"
+            "Top %d functions by cumulative time:%s\nTop %d allocation sites:\n%s",
+            elapsed, peak / (1024 * 1024), base, base, self.top, hotspots.getvalue(), self.top, allocations,
+        )
+
+
+class _ProfileScope:
+    def __init__(self, profiler: CycleProfiler):
+        self._profiler = profiler
+        self._profile = cProfile.Profile()
+        self._started_tracing = False
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        # Leave tracemalloc running afterwards if something else started it
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        self._profile.enable()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._start
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if self._started_tracing:
+            tracemalloc.stop()
+        try:
+            self._profiler._report(self._profile, snapshot, elapsed, peak)
+        except Exception as e:
+            logger.error("Error writing cycle profile: %s", e)
+        return False
+
+
+def install_signal_handler(profiler: CycleProfiler, cycles: int = 1, signum: Optional[int] = None) -> bool:
+    """Profile the next ``cycles`` cycles whenever the process receives ``signum`` (SIGUSR1 by default).
+
+    Returns False where the signal does not exist, e.g. on Windows.
+    """
+    if signum is None:
+        signum = getattr(signal, "SIGUSR1", None)
+        if signum is None:
+            return False
+
+    def handle(received, frame):
+        profiler.request(cycles)
+        logger.info("Profiling the next %d cycle(s)", cycles)
+
+    signal.signal(signum, handle)
+    return True
@@ -0,0 +1,139 @@
+import heapq
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+
+class CronExpression:
+    """Standard five-field cron expression (minute hour day-of-month month day-of-week), in local time.
+
+    Fields accept ``*``, numbers, ranges ``a-b``, steps ``*/n`` / ``a-b/n`` and comma-separated lists.
+    Day-of-week runs 0-7 with both 0 and 7 meaning Sunday.
+    """
+
+    FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+    # Give up on expressions that can never match (e.g. 30 February) instead of searching forever
+    MAX_SEARCH_DAYS = 5 * 366
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        parts = expression.split()
+        if len(parts) != len(self.FIELDS):
+            raise ValueError(f"Cron expression '{expression}' must have {len(self.FIELDS)} fields")
+        values = [self._parse_field(part, *spec) for part, spec in zip(parts, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        self.weekdays = {day % 7 for day in weekdays}
+        # As in cron, when both day fields are restricted a day matching either one qualifies
+        self._day_restricted = parts[2] != "*"
+        self._weekday_restricted = parts[4] != "*"
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=self.MAX_SEARCH_DAYS)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day or weekday
+        return day and weekday
+
+    @staticmethod
+    def _parse_field(field: str, name: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for item in field.split(","):
+            spec, _, step_text = item.partition("/")
+            try:
+                step = int(step_text) if step_text else 1
+                if spec == "*":
+                    start, end = low, high
+                elif "-" in spec:
+                    start, end = (int(value) for value in spec.split("-", 1))
+                else:
+                    start = end = int(spec)
+                    if step_text:
+                        end = high
+            except ValueError:
+                raise ValueError(f"Invalid cron {name} field '{field}'")
+            if step < 1 or not low <= start <= end <= high:
+                raise ValueError(f"Cron {name} field '{field}' is out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return values
+
+
+class Schedule:
+    """When a query runs: every ``interval`` seconds on ticks aligned to the epoch, or on a cron expression."""
+
+    def __init__(self, interval: Optional[float] = None, cron: Optional[str] = None):
+        if (interval is None) == (cron is None):
+            raise ValueError("A schedule needs exactly one of 'interval' or 'cron'")
+        if interval is not None and interval <= 0:
+            raise ValueError("Schedule interval must be positive")
+        self.interval = interval
+        self.cron = CronExpression(cron) if cron is not None else None
+
+    def next_after(self, timestamp: float) -> float:
+        if self.interval is not None:
+            return (math.floor(timestamp / self.interval) + 1) * self.interval
+        return self.cron.next_after(datetime.fromtimestamp(timestamp)).timestamp()
+
+
+class QueryScheduler:
+    """Heap of next-run times per query.
+
+    Every query is due at start-up; afterwards each runs on its next aligned tick. Ticks are computed from
+    the previous tick rather than from when a run finished, so slow runs never shift the cadence; ticks
+    missed while a run overran are skipped. ``jitter`` adds up to that many seconds to each dispatch
+    without moving the underlying tick.
+    """
+
+    def __init__(
+        self,
+        schedules: Dict[str, Schedule],
+        jitter: float = 0,
+        clock: Callable[[], float] = time.time,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.schedules = schedules
+        self.jitter = jitter
+        self._clock = clock
+        self._rng = rng
+        now = clock()
+        # (dispatch time, tick, query name)
+        self._heap: List[Tuple[float, float, str]] = [(now, now, name) for name in schedules]
+        heapq.heapify(self._heap)
+
+    def next_due(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    def due(self) -> List[str]:
+        now = self._clock()
+        names = []
+        while self._heap and self._heap[0][0] <= now:
+            _, tick, name = heapq.heappop(self._heap)
+            names.append(name)
+            next_tick = self.schedules[name].next_after(max(tick, now))
+            heapq.heappush(self._heap, (next_tick + self.jitter * self._rng(), next_tick, name))
+        return names
+
+
+def build_schedule(query_info: Dict, default_interval: float) -> Schedule:
+    if "cron" in query_info:
+        return Schedule(cron=query_info["cron"])
+    interval: Union[int, float] = query_info.get("interval", default_interval)
+    return Schedule(interval=float(interval))
@@ -0,0 +1,187 @@
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """A timed operation within a trace, linked to the span that was current when it started."""
+
+    recording = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# The span operations on this thread (or task) are attributed to; NOOP_SPAN inside a trace that was not sampled
+_current: "contextvars.ContextVar[Any]" = contextvars.ContextVar("etl_current_span", default=None)
+
+
+def current_span() -> Any:
+    """The active span, or a no-op span when tracing is off, so callers can always set attributes."""
+    return _current.get() or NOOP_SPAN
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlFileExporter(SpanExporter):
+    """Appends one JSON object per finished span, rotating to ``path.1`` .. ``path.<backup_count>`` at ``max_bytes``."""
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        if self.backup_count < 1:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+class _Scope:
+    def __init__(self, tracer: "Tracer", span: Any):
+        self._tracer = tracer
+        self._span = span
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> Any:
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current.reset(self._token)
+        if self._span.recording:
+            self._span.end(exc)
+            self._tracer._export(self._span)
+        return False
+
+
+class _NoopScope:
+    def __enter__(self) -> Any:
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to ``exporter``.
+
+    Sampling is decided once per trace, at its root span: an unsampled trace records none of its children.
+    Without an exporter, or with a sample rate of 0, ``span`` returns a shared no-op scope.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter] = None,
+        sample_rate: float = 1.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("Trace sample rate must be between 0 and 1")
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.enabled = exporter is not None and sample_rate > 0
+        self._rng = rng
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        if not self.enabled:
+            return _NOOP_SCOPE
+        parent = _current.get()
+        if parent is NOOP_SPAN:
+            return _NOOP_SCOPE
+        if parent is None:
+            if self.sample_rate < 1 and self._rng() >= self.sample_rate:
+                return _Scope(self, NOOP_SPAN)
+            return _Scope(self, Span(name, f"{random.getrandbits(128):032x}", None, attributes))
+        return _Scope(self, Span(name, parent.trace_id, parent.span_id, attributes))
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+    def _export(self, span: Span) -> None:
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            logger.warning("Error exporting span %s: %s", span.name, e)
@@ -91,9 +91,9 @@ def mock_db_cursor():
         ("StartTime", datetime),
         ("errorMessage", str),
     ]
-    cursor.fetchall.return_value = [
-        ("TestAccount", "Production", datetime(2025, 1, 1), "Test error")
-    ]
+    rows = [("TestAccount", "Production", datetime(2025, 1, 1), "Test error")]
+    cursor.fetchall.return_value = rows
+    cursor.fetchmany.side_effect = lambda size: [rows.pop(0) for _ in range(min(size, len(rows)))]
     return cursor
 
 
@@ -1,10 +1,21 @@
+import json
+import os
+import signal
+import threading
+import urllib.request
+import time
+
 import pytest
 from datetime import datetime
+from decimal import Decimal
 from unittest.mock import MagicMock, Mock, patch
 
-from etl_notifier.main import ETLNotifier
+from etl_notifier.main import ETLNotifier, create_cache_strategy, install_shutdown_handlers, main
 from etl_notifier.models.notification_record import NotificationRecord
+from etl_notifier.services.cache import JsonFileCache, SqliteCache, WriteBehindCache
 from etl_notifier.services.data_source.database import DatabaseSource
+from etl_notifier.services.notification.coalescing import CoalescingStrategy
+from etl_notifier.services.notification.rate_limit import RateLimitedStrategy
 from etl_notifier.services.notification.strategy import NotificationStrategy
 
 
@@ -72,7 +83,21 @@ class TestETLNotifier:
         cache = {}
         query_info = mock_etl_config_query(notifications=["teams_main"])
         notifier.process_query_results("failures", [record], cache, query_info)
-        assert cache["failures"][record.get_unique_key()] == "confirmed"
+        assert cache["failures"][record.get_unique_key()]["state"] == "confirmed"
+
+    def test_entries_track_first_and_last_seen(self, notifier, sample_etl_records):
+        record = sample_etl_records[0]
+        cache = {}
+        query_info = mock_etl_config_query(notifications=["teams_main"])
+        with patch("etl_notifier.main.time.time", return_value=100.0):
+            notifier.process_query_results("test_query", [record], cache, query_info)
+        with patch("etl_notifier.main.time.time", return_value=400.0):
+            notifier.process_query_results("test_query", [record], cache, query_info)
+        assert cache["test_query"][record.get_unique_key()] == {
+            "state": "confirmed",
+            "first_seen": 100.0,
+            "last_seen": 400.0,
+        }
 
     # --- process_query_results: pending/confirmed mode ---
 
@@ -82,7 +107,7 @@ class TestETLNotifier:
         query_info = mock_etl_config_query(notifications=["teams_main"])
         notifier.process_query_results("test_query", [record], cache, query_info)
         mock_sink.send_notification.assert_not_called()
-        assert cache["test_query"][record.get_unique_key()] == "pending"
+        assert cache["test_query"][record.get_unique_key()]["state"] == "pending"
 
     def test_pending_item_confirmed_triggers_notification(self, notifier, mock_sink, sample_etl_records):
         record = sample_etl_records[0]
@@ -90,7 +115,7 @@ class TestETLNotifier:
         query_info = mock_etl_config_query(notifications=["teams_main"])
         notifier.process_query_results("test_query", [record], cache, query_info)
         mock_sink.send_notification.assert_called_once()
-        assert cache["test_query"][record.get_unique_key()] == "confirmed"
+        assert cache["test_query"][record.get_unique_key()]["state"] == "confirmed"
 
     def test_confirmed_item_no_notification(self, notifier, mock_sink, sample_etl_records):
         record = sample_etl_records[0]
@@ -107,6 +132,14 @@ class TestETLNotifier:
         _, template_single, template_multiple = mock_sink.send_notification.call_args[0]
         assert template_multiple == "Multiple issues:"
 
+    def test_process_query_results_accepts_generator(self, notifier, mock_sink, sample_etl_records):
+        cache = {"test_query": {r.get_unique_key(): "pending" for r in sample_etl_records}}
+        query_info = mock_etl_config_query(notifications=["teams_main"])
+        notifier.process_query_results("test_query", (r for r in sample_etl_records), cache, query_info)
+        records = mock_sink.send_notification.call_args[0][0]
+        assert records == sample_etl_records
+        assert {entry["state"] for entry in cache["test_query"].values()} == {"confirmed"}
+
     # --- multi-sink routing ---
 
     def test_notifies_all_declared_sinks(self, mock_etl_config, mock_cache_strategy):
@@ -126,6 +159,102 @@ class TestETLNotifier:
         sink_a.send_notification.assert_called_once()
         sink_b.send_notification.assert_called_once()
 
+    def test_failing_sink_does_not_block_other_sinks(self, mock_etl_config, mock_cache_strategy):
+        sink_a = Mock(spec=NotificationStrategy)
+        sink_a.send_notification.side_effect = Exception("webhook down")
+        sink_b = Mock(spec=NotificationStrategy)
+        mock_etl_config["notifications"]["teams_b"] = {"type": "teams_b", "webhook_url": "http://b.url"}
+        mock_etl_config["queries"]["test_query"]["notifications"] = ["teams_main", "teams_b"]
+        with patch.dict(ETLNotifier.NOTIFICATION_TYPES, {
+            "teams": Mock(return_value=sink_a),
+            "teams_b": Mock(return_value=sink_b),
+        }):
+            notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy)
+
+        record = NotificationRecord("Acct", "Prod", datetime(2025, 1, 1), error_message="err")
+        cache = {"test_query": {record.get_unique_key(): "pending"}}
+        notifier.process_query_results("test_query", [record], cache, mock_etl_config["queries"]["test_query"])
+        sink_b.send_notification.assert_called_once()
+        assert cache["test_query"][record.get_unique_key()]["state"] == "confirmed"
+
+    def test_sink_deadline_not_passed_to_strategy(self, mock_etl_config, mock_cache_strategy):
+        mock_etl_config["notifications"]["teams_main"]["deadline"] = 5
+        strategy_cls = Mock()
+        with patch.dict(ETLNotifier.NOTIFICATION_TYPES, {"teams": strategy_cls}):
+            notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy)
+        strategy_cls.assert_called_once_with(webhook_url="http://test-webhook.url")
+        assert notifier.sink_deadlines == {"teams_main": 5.0}
+
+    def test_coalesce_window_wraps_strategy(self, mock_etl_config, mock_cache_strategy, mock_sink):
+        mock_etl_config["notifications"]["teams_main"]["coalesce_window"] = 60
+        strategy_cls = Mock(return_value=mock_sink)
+        with patch.dict(ETLNotifier.NOTIFICATION_TYPES, {"teams": strategy_cls}):
+            notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy)
+        strategy_cls.assert_called_once_with(webhook_url="http://test-webhook.url")
+        sink = notifier.notification_strategies["teams_main"]
+        assert isinstance(sink, CoalescingStrategy) and sink.inner is mock_sink
+        assert (sink.dispatcher, sink.name) == (notifier.dispatcher, "teams_main")
+
+        record = NotificationRecord("Acct", "Prod", datetime(2025, 1, 1), error_message="err")
+        notifier.process_query_results("failures", [record], {}, mock_etl_config["queries"]["test_query"])
+        mock_sink.send_batch.assert_not_called()
+        notifier.close()
+        mock_sink.send_batch.assert_called_once()
+
+    def test_rate_limit_wraps_strategy(self, mock_etl_config, mock_cache_strategy, mock_sink):
+        mock_etl_config["notifications"]["teams_main"].update({"rate": 2, "burst": 4})
+        strategy_cls = Mock(return_value=mock_sink)
+        with patch.dict(ETLNotifier.NOTIFICATION_TYPES, {"teams": strategy_cls}):
+            notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy)
+        strategy_cls.assert_called_once_with(webhook_url="http://test-webhook.url")
+        sink = notifier.notification_strategies["teams_main"]
+        assert isinstance(sink, RateLimitedStrategy)
+        assert (sink.bucket.rate, sink.bucket.burst) == (2.0, 4.0)
+        assert sink.outcomes is notifier.metrics.rate_limit and sink.name == "teams_main"
+
+    def test_rate_limit_wait_leaves_room_in_deadline(self, mock_etl_config, mock_cache_strategy):
+        mock_etl_config["notifications"]["teams_main"].update({"rate": 2, "deadline": 10})
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy, sink_deadline=60)
+        sink = notifier.notification_strategies["teams_main"]
+        assert (sink.max_wait, sink.max_delay) == (5.0, 5.0)
+
+    def test_query_priority_is_passed_to_sinks(self, notifier, mock_sink, sample_etl_records):
+        query_info = {**mock_etl_config_query(notifications=["teams_main"]), "priority": "high"}
+        notifier.process_query_results("failures", [sample_etl_records[0]], {}, query_info)
+        mock_sink.send_with_priority.assert_called_once()
+        assert mock_sink.send_with_priority.call_args[0][3] == "high"
+        mock_sink.send_notification.assert_not_called()
+
+    # --- outbox ---
+
+    def test_outbox_enqueues_instead_of_sending_inline(self, mock_etl_config, mock_cache_strategy, mock_sink, tmp_path):
+        notifier = ETLNotifier(
+            config=mock_etl_config, cache_strategy=mock_cache_strategy, outbox_path=str(tmp_path / "outbox.db")
+        )
+        notifier.outbox_worker.stop()  # keep delivery deterministic for the assertions below
+        record = NotificationRecord("Acct", "Prod", datetime(2025, 1, 1), error_message="err")
+        cache = {"test_query": {record.get_unique_key(): "pending"}}
+        notifier.process_query_results("test_query", [record], cache, mock_etl_config["queries"]["test_query"])
+        mock_sink.send_notification.assert_not_called()
+        assert notifier.outbox.pending() == {"teams_main": 1}
+
+        assert notifier.outbox_worker.drain_once() == 1
+        mock_sink.send_notification.assert_called_once()
+        assert notifier.outbox.pending() == {}
+        notifier.close()
+
+    def test_outbox_coalesces_instead_of_buffering_in_memory(
+        self, mock_etl_config, mock_cache_strategy, mock_sink, tmp_path
+    ):
+        mock_etl_config["notifications"]["teams_main"]["coalesce_window"] = 60
+        notifier = ETLNotifier(
+            config=mock_etl_config, cache_strategy=mock_cache_strategy, outbox_path=str(tmp_path / "outbox.db")
+        )
+        notifier.outbox_worker.stop()
+        assert notifier.notification_strategies["teams_main"] is mock_sink
+        assert notifier.outbox_worker.windows == {"teams_main": 60.0}
+        notifier.close()
+
     # --- run() ---
 
     def test_run_saves_cache(self, notifier, mock_cache_strategy, mock_data_source):
@@ -133,15 +262,437 @@ class TestETLNotifier:
             notifier.run()
         mock_cache_strategy.save.assert_called_once()
 
+    def test_run_streams_rows_from_source(self, notifier, mock_cache_strategy, mock_data_source):
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_data_source)}):
+            with patch.object(type(mock_data_source), "stream_query", autospec=True,
+                              side_effect=lambda self, q: iter(self.execute_query(q))) as stream:
+                notifier.run()
+        stream.assert_called_once()
+        assert "test_query" in mock_cache_strategy.save.call_args[0][0]
+
     def test_run_query_error_does_not_propagate(self, notifier, mock_cache_strategy):
         mock_source = MagicMock()
         mock_source.__enter__.return_value = mock_source
         mock_source.__exit__.return_value = False
-        mock_source.execute_query.side_effect = Exception("DB error")
+        mock_source.stream_records.side_effect = Exception("DB error")
         with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
             notifier.run()
         mock_cache_strategy.save.assert_called_once()
 
+    def test_run_evicts_entries_past_query_retention(self, mock_etl_config, mock_cache_strategy):
+        mock_etl_config["queries"]["test_query"]["retention"] = 60
+        mock_cache_strategy.load.return_value = {
+            "test_query": {"old": {"state": "pending", "first_seen": 0, "last_seen": 0}},
+            "removed_query": {"stale": {"state": "confirmed", "first_seen": 0, "last_seen": 900}},
+        }
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy, cache_retention=3600)
+        mock_source = MagicMock()
+        mock_source.stream_records.side_effect = Exception("DB error")
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}), \
+                patch("etl_notifier.main.time.time", return_value=1000.0):
+            notifier.run()
+        saved = mock_cache_strategy.save.call_args[0][0]
+        assert "test_query" not in saved
+        assert list(saved["removed_query"]) == ["stale"]
+
+    # --- concurrent execution ---
+
+    def test_create_data_source_strips_notifier_options(self, notifier):
+        source_cls = Mock()
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": source_cls}):
+            notifier._create_data_source({"type": "database", "connection_string": "c", "max_workers": 4})
+        source_cls.assert_called_once_with(connection_string="c")
+
+    def test_run_parallel_sources_merges_cache(self, mock_etl_config, mock_cache_strategy, mock_data_source):
+        mock_etl_config["sources"]["other"] = {"type": "database", "connection_string": "other"}
+        mock_etl_config["queries"]["other_query"] = {**mock_etl_config["queries"]["test_query"], "source": "other"}
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy, max_workers=4)
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_data_source)}):
+            notifier.run()
+        saved = mock_cache_strategy.save.call_args[0][0]
+        assert set(saved) == {"test_query", "other_query"}
+
+    def test_run_source_max_workers_opens_connection_per_query(self, mock_etl_config, mock_cache_strategy, mock_data_source):
+        mock_etl_config["sources"]["database"]["max_workers"] = 2
+        mock_etl_config["queries"]["second_query"] = dict(mock_etl_config["queries"]["test_query"])
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy)
+        barrier = threading.Barrier(2, timeout=5)
+
+        def stream_records(query):
+            barrier.wait()  # both queries must hold a connection at the same time
+            return []
+
+        def make_source(**kwargs):
+            source = MagicMock()
+            source.stream_records.side_effect = stream_records
+            return source
+
+        source_cls = Mock(side_effect=make_source)
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": source_cls}):
+            notifier.run()
+        assert source_cls.call_count == 2
+        saved = mock_cache_strategy.save.call_args[0][0]
+        assert set(saved) == {"test_query", "second_query"}
+
+    def test_etl_max_workers_bounds_sources_polled_by_serve(self, mock_etl_config, monkeypatch, tmp_path):
+        for name in ("a", "b", "c"):
+            mock_etl_config["sources"][name] = {"type": "database", "connection_string": name}
+            query_info = {**mock_etl_config["queries"]["test_query"], "source": name}
+            mock_etl_config["queries"][f"{name}_query"] = query_info
+        del mock_etl_config["queries"]["test_query"]
+        monkeypatch.setenv("ETL_MAX_WORKERS", "2")
+        monkeypatch.setenv("ETL_CACHE_PATH", str(tmp_path / "cache.json"))
+        barrier = threading.Barrier(2, timeout=5)
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def stream_records(query):
+            with lock:
+                active.append(query)
+                peak.append(len(active))
+                arrival = len(peak)
+            if arrival <= 2:
+                barrier.wait()  # the first two sources must be polled at the same time
+            time.sleep(0.05)
+            with lock:
+                active.remove(query)
+            return []
+
+        source = MagicMock()
+        source.stream_records.side_effect = stream_records
+        stops = []
+        run = ETLNotifier.run
+
+        def run_once(self, query_names=None):
+            run(self, query_names)
+            stops[0].set()
+
+        with patch("etl_notifier.main.ConfigLoader.load_queries", return_value=mock_etl_config), \
+                patch("etl_notifier.main.install_signal_handler"), \
+                patch("etl_notifier.main.install_shutdown_handlers", side_effect=stops.append), \
+                patch.object(ETLNotifier, "run", run_once), \
+                patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=source)}):
+            main()
+        assert source.stream_records.call_count == 3
+        assert max(peak) == 2
+
+    def test_unreachable_source_does_not_abort_cycle(self, mock_etl_config, mock_cache_strategy, mock_sink):
+        mock_etl_config["sources"]["broken"] = {"type": "broken"}
+        mock_etl_config["queries"]["broken_query"] = {**mock_etl_config["queries"]["test_query"], "source": "broken"}
+        mock_etl_config["queries"]["failures"] = mock_etl_config["queries"].pop("test_query")
+        record = NotificationRecord("Acct", "Prod", datetime(2025, 1, 1), error_message="err")
+        healthy = MagicMock()
+        healthy.stream_records.side_effect = lambda query: iter([record])
+        stored = {}
+        mock_cache_strategy.load.side_effect = lambda: dict(stored)
+        mock_cache_strategy.save.side_effect = stored.update
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy, max_workers=2)
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {
+            "database": Mock(return_value=healthy),
+            "broken": Mock(side_effect=OSError("login timeout")),
+        }):
+            for _ in range(3):
+                notifier.run()
+        notifier.close()
+
+        assert mock_cache_strategy.save.call_count == 3
+        assert record.get_unique_key() in stored["failures"]
+        mock_sink.send_notification.assert_called_once()
+        assert notifier.metrics.source_errors.value(source="broken") == 3
+        assert notifier.metrics.cycle_errors.value() == 0
+
+    def test_run_keeps_cache_for_failed_query(self, notifier, mock_cache_strategy):
+        mock_cache_strategy.load.return_value = {"test_query": {"k": "pending"}}
+        mock_source = MagicMock()
+        mock_source.__enter__.return_value = mock_source
+        mock_source.stream_records.side_effect = Exception("DB error")
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
+            notifier.run()
+        saved = mock_cache_strategy.save.call_args[0][0]
+        assert list(saved["test_query"]) == ["k"]
+        assert saved["test_query"]["k"]["state"] == "pending"
+
+    # --- watermark delta mode ---
+
+    @pytest.fixture
+    def watermark_notifier(self, mock_etl_config, mock_cache_strategy):
+        query_info = mock_etl_config["queries"].pop("test_query")
+        query_info["watermark"] = "EndTime"
+        mock_etl_config["queries"]["failures"] = query_info
+        return ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy)
+
+    def test_watermark_query_binds_and_advances_high_water_mark(self, watermark_notifier, mock_cache_strategy, mock_sink):
+        early = NotificationRecord("A", "Prod", datetime(2025, 1, 1, 9))
+        late = NotificationRecord("B", "Prod", datetime(2025, 1, 1, 10))
+
+        mock_source = MagicMock()
+        mock_source.stream_watermarked_records.return_value = [(late, datetime(2025, 1, 1, 10, 30)), (early, None)]
+        mock_cache_strategy.load.return_value = {}
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
+            watermark_notifier.run()
+            query, column = mock_source.stream_watermarked_records.call_args[0]
+            assert (query["params"], column) == ([None], "EndTime")
+            saved = mock_cache_strategy.save.call_args[0][0]
+            assert saved["failures"]["_watermark"]["value"] == "2025-01-01T10:30:00"
+
+            # The next cycle only returns newer rows; earlier entries stay cached for deduplication
+            newer = NotificationRecord("C", "Prod", datetime(2025, 1, 1, 11))
+            mock_source.stream_watermarked_records.return_value = [(newer, datetime(2025, 1, 1, 11, 5))]
+            mock_cache_strategy.load.return_value = saved
+            watermark_notifier.run()
+        assert mock_source.stream_watermarked_records.call_args[0][0]["params"] == [datetime(2025, 1, 1, 10, 30)]
+        mock_source.stream_records.assert_not_called()
+        saved = mock_cache_strategy.save.call_args[0][0]
+        assert {early.get_unique_key(), late.get_unique_key(), newer.get_unique_key()} <= set(saved["failures"])
+        assert saved["failures"]["_watermark"]["value"] == "2025-01-01T11:05:00"
+        notified = [call[0][0] for call in mock_sink.send_notification.call_args_list]
+        assert notified == [[late, early], [newer]]
+
+    def test_late_failure_of_earlier_run_is_notified(self, watermark_notifier, mock_cache_strategy, mock_sink):
+        # Run A starts before run B but fails after B was seen; an EndTime watermark still returns it
+        run_b = NotificationRecord("B", "Prod", datetime(2025, 1, 1, 10))
+        run_a = NotificationRecord("A", "Prod", datetime(2025, 1, 1, 9))
+        mock_source = MagicMock()
+        mock_source.stream_watermarked_records.return_value = [(run_b, datetime(2025, 1, 1, 10, 15))]
+        mock_cache_strategy.load.return_value = {}
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
+            watermark_notifier.run()
+            mock_source.stream_watermarked_records.return_value = [(run_a, datetime(2025, 1, 1, 10, 45))]
+            mock_cache_strategy.load.return_value = mock_cache_strategy.save.call_args[0][0]
+            watermark_notifier.run()
+        assert mock_source.stream_watermarked_records.call_args[0][0]["params"] == [datetime(2025, 1, 1, 10, 15)]
+        notified = [call[0][0] for call in mock_sink.send_notification.call_args_list]
+        assert notified == [[run_b], [run_a]]
+
+    def test_watermark_not_lowered_by_empty_cycle(self, watermark_notifier, mock_cache_strategy, sample_etl_records):
+        mock_source = MagicMock()
+        mock_source.stream_watermarked_records.return_value = [(sample_etl_records[0], datetime(2025, 1, 2))]
+        mock_cache_strategy.load.return_value = {}
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
+            watermark_notifier.run()
+            saved = mock_cache_strategy.save.call_args[0][0]
+            mock_source.stream_watermarked_records.return_value = []
+            mock_cache_strategy.load.return_value = saved
+            watermark_notifier.run()
+        assert mock_cache_strategy.save.call_args[0][0]["failures"]["_watermark"]["value"] == "2025-01-02T00:00:00"
+
+    def test_decimal_watermark_survives_json_cache(self, mock_etl_config, mock_sink, tmp_path):
+        # pyodbc returns DECIMAL columns (e.g. an ingestion id) as Decimal, which json cannot serialize by itself
+        query_info = mock_etl_config["queries"].pop("test_query")
+        query_info["watermark"] = "IngestionId"
+        mock_etl_config["queries"]["failures"] = query_info
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=JsonFileCache(str(tmp_path / "cache.json")))
+        record = NotificationRecord("A", "Prod", datetime(2025, 1, 1, 9))
+        mock_source = MagicMock()
+        mock_source.stream_watermarked_records.return_value = [(record, Decimal("1042.5"))]
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
+            notifier.run()
+            notifier.run()
+        assert mock_source.stream_watermarked_records.call_args[0][0]["params"] == [Decimal("1042.5")]
+        assert notifier.metrics.cycle_errors.value() == 0
+        mock_sink.send_notification.assert_called_once()
+
+    def test_failed_watermark_query_keeps_watermark(self, watermark_notifier, mock_cache_strategy):
+        now = time.time()
+        watermark = {"value": "2025-01-02T00:00:00", "type": "datetime", "first_seen": now, "last_seen": now}
+        mock_cache_strategy.load.return_value = {"failures": {"_watermark": watermark}}
+        mock_source = MagicMock()
+        mock_source.stream_watermarked_records.side_effect = ValueError("Query result is missing watermark column")
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
+            watermark_notifier.run()
+        assert mock_cache_strategy.save.call_args[0][0]["failures"]["_watermark"] == watermark
+
+    def test_query_without_watermark_binds_no_params(self, notifier, mock_cache_strategy):
+        mock_source = MagicMock()
+        mock_source.stream_records.return_value = []
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
+            notifier.run()
+        assert "params" not in mock_source.stream_records.call_args[0][0]
+
+    # --- scheduling ---
+
+    def test_run_only_given_queries(self, mock_etl_config, mock_cache_strategy, mock_data_source):
+        mock_etl_config["queries"]["other_query"] = dict(mock_etl_config["queries"]["test_query"])
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy)
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_data_source)}):
+            notifier.run(["other_query"])
+        assert set(mock_cache_strategy.save.call_args[0][0]) == {"other_query"}
+
+    def test_serve_runs_due_queries_until_stopped(self, notifier):
+        stop = threading.Event()
+        runs = []
+
+        def run(query_names=None):
+            runs.append(sorted(query_names))
+            stop.set()
+
+        with patch.object(notifier, "run", side_effect=run):
+            notifier.serve(stop)
+        assert runs == [["test_query"]]
+
+    def test_serve_without_queries_waits_default_interval(self, mock_etl_config, mock_cache_strategy):
+        mock_etl_config["queries"] = {}
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy, default_interval=42)
+        stop = Mock(is_set=Mock(side_effect=[False, True]))
+        notifier.serve(stop)
+        stop.wait.assert_called_once_with(42)
+
+    def test_serve_runs_a_sources_queries_on_one_connection(self, mock_etl_config, mock_cache_strategy):
+        # Without a source ``max_workers``, queries that fall due together share one worker and connection
+        mock_etl_config["queries"]["other_query"] = dict(mock_etl_config["queries"]["test_query"])
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy, max_workers=4)
+        stop = threading.Event()
+        source = MagicMock()
+        source.stream_records.side_effect = lambda query: stop.set() or []
+        source_cls = Mock(return_value=source)
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": source_cls}):
+            notifier.serve(stop)
+        assert source_cls.call_count == 1
+        assert source.stream_records.call_count == 2
+
+    # --- connection pooling ---
+
+    def test_run_reuses_pooled_connection_across_cycles(self, notifier, mock_data_source):
+        source_cls = Mock(return_value=mock_data_source)
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": source_cls}):
+            notifier.run()
+            notifier.run()
+        source_cls.assert_called_once()
+        assert len(mock_data_source.executed_queries) == 2
+
+    def test_close_disconnects_pooled_connections(self, notifier):
+        mock_source = MagicMock()
+        mock_source.stream_records.return_value = []
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
+            notifier.run()
+        mock_source.disconnect.assert_not_called()
+        notifier.close()
+        mock_source.disconnect.assert_called_once()
+
+    # --- metrics ---
+
+    def test_run_records_query_and_cache_metrics(self, notifier, mock_cache_strategy, mock_data_source):
+        mock_cache_strategy.size_bytes.return_value = 2048
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_data_source)}):
+            notifier.run()
+        metrics = notifier.metrics
+        labels = {"source": "database", "query": "test_query"}
+        assert metrics.query_rows.value(**labels) == 1
+        assert metrics.query_duration.count(**labels) == 1
+        assert metrics.cycle_duration.count() == 1
+        assert metrics.phase_duration.count(phase="cache_save") == 1
+        assert metrics.cache_entries.value(query="test_query") == 1
+        assert metrics.cache_size.value() == 2048
+
+    def test_cache_entries_gauge_drops_evicted_sections(self, notifier, mock_cache_strategy, mock_data_source):
+        mock_cache_strategy.load.return_value = {"removed_query": {"k": {"state": "confirmed", "last_seen": 0}}}
+        mock_cache_strategy.size_bytes.return_value = None
+        notifier.metrics.cache_entries.set(1, query="removed_query")
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_data_source)}):
+            notifier.run()
+        assert "removed_query" not in notifier.metrics.registry.render()
+
+    def test_run_counts_query_errors(self, notifier):
+        mock_source = MagicMock()
+        mock_source.stream_records.side_effect = Exception("DB error")
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
+            notifier.run()
+        assert notifier.metrics.query_errors.value(source="database", query="test_query") == 1
+        assert notifier.metrics.query_duration.count(source="database", query="test_query") == 1
+
+    def test_run_counts_cycle_errors(self, notifier, mock_cache_strategy):
+        mock_cache_strategy.load.side_effect = Exception("disk gone")
+        notifier.run()
+        assert notifier.metrics.cycle_errors.value() == 1
+        assert notifier.metrics.cycle_duration.count() == 1
+
+    def test_notified_records_are_counted(self, notifier, sample_etl_records):
+        query_info = mock_etl_config_query(notifications=["teams_main"])
+        notifier.process_query_results("failures", sample_etl_records[:2], {}, query_info)
+        assert notifier.metrics.notified_records.value(query="failures") == 2
+
+    def test_metrics_port_serves_registry(self, mock_etl_config, mock_cache_strategy):
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy, metrics_port=0)
+        try:
+            url = f"http://127.0.0.1:{notifier.metrics_server.port}/metrics"
+            with urllib.request.urlopen(url) as response:
+                assert "etl_cycle_duration_seconds" in response.read().decode()
+        finally:
+            notifier.close()
+
+    # --- tracing ---
+
+    def test_trace_file_records_nested_spans(self, mock_etl_config, mock_cache_strategy, mock_data_source, tmp_path):
+        trace_path = tmp_path / "trace.jsonl"
+        notifier = ETLNotifier(config=mock_etl_config, cache_strategy=mock_cache_strategy, trace_path=str(trace_path))
+        mock_cache_strategy.load.return_value = {"test_query": {}}
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_data_source)}):
+            notifier.run()
+            mock_cache_strategy.load.return_value = mock_cache_strategy.save.call_args[0][0]
+            notifier.run()
+        notifier.close()
+
+        spans = [json.loads(line) for line in trace_path.read_text().splitlines()]
+        by_name = {}
+        for span in spans:
+            by_name.setdefault(span["name"], []).append(span)
+        assert len(by_name["cycle"]) == 2
+        # The connection is created once and reused from the pool on the second run
+        assert len(by_name["source.connect"]) == 1
+        query, process = by_name["query"][1], by_name["query.process"][1]
+        assert query["attributes"] == {"source": "database", "query": "test_query", "rows": 1}
+        assert process["attributes"]["new_items"] == 1
+        send = by_name["sink.send"][0]
+        assert send["attributes"] == {"sink": "teams_main"}
+        assert send["parent_id"] == process["span_id"]
+        assert process["parent_id"] == query["span_id"]
+        cycle = by_name["cycle"][1]
+        assert by_name["source"][1]["parent_id"] == cycle["span_id"]
+        assert send["trace_id"] == query["trace_id"] == cycle["trace_id"]
+
+    def test_tracing_disabled_by_default(self, notifier):
+        assert not notifier.tracer.enabled
+
+    # --- profiling ---
+
+    def test_profile_cycles_profiles_next_runs(self, mock_etl_config, mock_cache_strategy, tmp_path):
+        notifier = ETLNotifier(
+            config=mock_etl_config,
+            cache_strategy=mock_cache_strategy,
+            profile_dir=str(tmp_path),
+            profile_cycles=1,
+        )
+        mock_source = MagicMock()
+        mock_source.stream_records.return_value = []
+        with patch.dict(ETLNotifier.SOURCE_TYPES, {"database": Mock(return_value=mock_source)}):
+            notifier.run()
+            notifier.run()
+        assert len(list(tmp_path.glob("*.prof"))) == 1
+        assert len(list(tmp_path.glob("*.tracemalloc"))) == 1
+
+
+class TestCreateCacheStrategy:
+    def test_defaults_to_type_specific_path(self):
+        cache = create_cache_strategy("sqlite")
+        assert isinstance(cache, SqliteCache)
+        assert cache.file_path == "cache.db"
+
+    def test_explicit_path(self, tmp_path):
+        cache = create_cache_strategy("json", str(tmp_path / "c.json"))
+        assert isinstance(cache, JsonFileCache)
+        assert cache.file_path == str(tmp_path / "c.json")
+
+    def test_unknown_type_raises(self):
+        with pytest.raises(ValueError, match="Unknown cache type"):
+            create_cache_strategy("redis")
+
+    def test_flush_interval_wraps_in_write_behind_cache(self, tmp_path):
+        cache = create_cache_strategy("json", str(tmp_path / "c.json"), flush_interval=60, max_dirty_entries=5)
+        assert isinstance(cache, WriteBehindCache)
+        assert isinstance(cache.backing, JsonFileCache)
+        assert (cache.flush_interval, cache.max_dirty_entries) == (60, 5)
+
 
 def mock_etl_config_query(notifications):
     return {
@@ -149,3 +700,16 @@ def mock_etl_config_query(notifications):
         "message_single": "Pipeline {account} in {env}: {errorMessage}",
         "message_multiple": "Multiple issues:",
     }
+
+
+@pytest.mark.parametrize("signum", [signal.SIGTERM, signal.SIGINT])
+def test_shutdown_signal_sets_stop(signum):
+    previous = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT)}
+    stop = threading.Event()
+    try:
+        install_shutdown_handlers(stop)
+        os.kill(os.getpid(), signum)
+        assert stop.is_set()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+
+hypothesis = pytest.importorskip("hypothesis")
+from hypothesis import given, settings, strategies as st  # noqa: E402
+
+from etl_notifier.main import ETLNotifier  # noqa: E402
+from etl_notifier.models.notification_record import NotificationRecord  # noqa: E402
+from etl_notifier.services.cache.entry import entry_state  # noqa: E402
+from etl_notifier.services.notification.strategy import NotificationStrategy  # noqa: E402
+
+
+def reference_process_query_results(query_name, records, cache):
+    """The original two-pass implementation, kept as the behavioural spec."""
+    current_keys = {record.get_unique_key() for record in records}
+    existing_cache = cache.get(query_name, {})
+
+    if query_name == "failures":
+        cache[query_name] = {k: "confirmed" for k in current_keys}
+        new_items = [r for r in records if r.get_unique_key() in (current_keys - existing_cache.keys())]
+    else:
+        new_pending_items = {k: "pending" for k in (current_keys - existing_cache.keys())}
+        confirmed_items = [r for r in records if existing_cache.get(r.get_unique_key()) == "pending"]
+        cache[query_name] = {
+            **{k: "confirmed" for k in current_keys if existing_cache.get(k) in ("pending", "confirmed")},
+            **new_pending_items,
+        }
+        new_items = confirmed_items
+    return new_items
+
+
+# A small universe so generated result sets and caches overlap often, with duplicates
+records_strategy = st.builds(
+    lambda account, env, hours, url: NotificationRecord(account, env, datetime(2025, 1, 1) + timedelta(hours=hours), url),
+    st.sampled_from(["A", "B", "C"]),
+    st.sampled_from(["Prod", "UAT"]),
+    st.integers(0, 3),
+    st.none() | st.just("http://pipeline"),
+)
+keys_strategy = st.builds(
+    lambda a, e, h: f"{a}|{e}|{datetime(2025, 1, 1) + timedelta(hours=h)}",
+    st.sampled_from(["A", "B", "C"]),
+    st.sampled_from(["Prod", "UAT"]),
+    st.integers(0, 3),
+)
+section_strategy = st.dictionaries(keys_strategy, st.sampled_from(["pending", "confirmed", "unknown"]))
+
+
+@pytest.fixture(scope="module")
+def notifier_and_sink():
+    sink = Mock(spec=NotificationStrategy)
+    config = {
+        "notifications": {"sink": {"type": "teams"}},
+        "sources": {},
+        "queries": {},
+    }
+    with patch.dict(ETLNotifier.NOTIFICATION_TYPES, {"teams": Mock(return_value=sink)}):
+        notifier = ETLNotifier(config=config, cache_strategy=Mock())
+    return notifier, sink
+
+
+QUERY_INFO = {"notifications": ["sink"], "message_single": "s", "message_multiple": "m"}
+
+
+class TestProcessQueryResultsProperties:
+    @settings(max_examples=200, deadline=None)
+    @given(
+        query_name=st.sampled_from(["failures", "long_running"]),
+        records=st.lists(records_strategy, max_size=12),
+        section=section_strategy,
+        other_sections=st.booleans(),
+    )
+    def test_matches_reference_implementation(self, notifier_and_sink, query_name, records, section, other_sections):
+        notifier, sink = notifier_and_sink
+        sink.reset_mock()
+        cache = {query_name: dict(section)}
+        expected_cache = {query_name: dict(section)}
+        if other_sections:
+            cache["other"] = {"k": "pending"}
+            expected_cache["other"] = {"k": "pending"}
+
+        expected_items = reference_process_query_results(query_name, records, expected_cache)
+        notifier.process_query_results(query_name, iter(records), cache, QUERY_INFO)
+
+        assert {name: {k: entry_state(v) for k, v in entries.items()} for name, entries in cache.items()} == expected_cache
+        if expected_items:
+            sink.send_notification.assert_called_once_with(expected_items, "s", "m")
+        else:
+            sink.send_notification.assert_not_called()
+
+    @settings(max_examples=50, deadline=None)
+    @given(records=st.lists(records_strategy, max_size=12))
+    def test_second_cycle_confirms_exactly_the_first_cycle_pending(self, notifier_and_sink, records):
+        notifier, sink = notifier_and_sink
+        cache = {}
+        notifier.process_query_results("long_running", records, cache, QUERY_INFO)
+        assert {entry_state(v) for v in cache["long_running"].values()} <= {"pending"}
+        sink.reset_mock()
+        notifier.process_query_results("long_running", records, cache, QUERY_INFO)
+        assert {entry_state(v) for v in cache["long_running"].values()} <= {"confirmed"}
+        if records:
+            assert sink.send_notification.call_args[0][0] == records
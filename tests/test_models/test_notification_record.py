@@ -1,3 +1,6 @@
+import copy
+import pickle
+
 import pytest
 from datetime import datetime
 
@@ -108,4 +111,69 @@ class TestNotificationRecord:
             error_message="Error"
         )
         
-        assert record1 != record2
\ No newline at end of file
+        assert record1 != record2
+
+    def test_notification_record_is_frozen(self):
+        """Test that notification records cannot be mutated after construction"""
+        record = NotificationRecord("TestAccount", "Production", datetime(2025, 1, 1))
+        with pytest.raises(AttributeError):
+            record.account_name = "Other"
+
+    def test_notification_record_is_hashable(self):
+        """Test that equal records hash equally and can be used in sets"""
+        record1 = NotificationRecord("TestAccount", "Production", datetime(2025, 1, 1))
+        record2 = NotificationRecord("TestAccount", "Production", datetime(2025, 1, 1))
+        assert len({record1, record2}) == 1
+
+    def test_notification_record_has_no_instance_dict(self):
+        """Test that records carry no per-instance __dict__"""
+        record = NotificationRecord("TestAccount", "Production", datetime(2025, 1, 1))
+        assert not hasattr(record, "__dict__")
+
+    def test_unique_key_is_computed_once(self):
+        """Test that the unique key is built at construction and reused"""
+        record = NotificationRecord("TestAccount", "Production", datetime(2025, 1, 1))
+        assert record.get_unique_key() is record.get_unique_key()
+
+    def test_repeated_names_are_interned(self):
+        """Test that account and environment strings are shared between records"""
+        record1 = NotificationRecord("".join(["Test", "Account"]), "".join(["Prod", "uction"]), datetime(2025, 1, 1))
+        record2 = NotificationRecord("".join(["Test", "Account"]), "".join(["Prod", "uction"]), datetime(2025, 1, 2))
+        assert record1.account_name is record2.account_name
+        assert record1.environment is record2.environment
+
+    def test_unique_key_not_in_repr(self):
+        """Test that the cached key is left out of the repr"""
+        record = NotificationRecord("TestAccount", "Production", datetime(2025, 1, 1))
+        assert repr(record).startswith("NotificationRecord(account_name='TestAccount'")
+        assert "unique_key" not in repr(record)
+
+    def test_record_survives_pickle(self):
+        """Test that records pickle and unpickle to an equal record"""
+        record = NotificationRecord("TestAccount", "Production", datetime(2025, 1, 1), run_id="r1")
+        restored = pickle.loads(pickle.dumps(record))
+        assert restored == record
+        assert restored.get_unique_key() == record.get_unique_key()
+
+    def test_record_survives_deepcopy(self):
+        """Test that deep copies are equal records"""
+        record = NotificationRecord("TestAccount", "Production", datetime(2025, 1, 1), url="http://x")
+        assert copy.deepcopy(record) == record
+        assert copy.copy(record) == record
+
+    def test_record_is_not_a_tuple(self):
+        """Test that records do not iterate, unpack or order like tuples"""
+        record = NotificationRecord("TestAccount", "Production", datetime(2025, 1, 1))
+        with pytest.raises(TypeError):
+            iter(record)
+        with pytest.raises(TypeError):
+            len(record)
+        with pytest.raises(TypeError):
+            record < ("a",)
+        assert record != record.astuple()
+        assert NotificationRecord(*record.astuple()) == record
+
+    def test_astuple_leaves_out_unique_key(self):
+        """Test that astuple returns the constructor arguments only"""
+        record = NotificationRecord("TestAccount", "Production", datetime(2025, 1, 1), run_id="r1")
+        assert record.astuple() == ("TestAccount", "Production", datetime(2025, 1, 1), None, None, None, "r1")
@@ -0,0 +1,97 @@
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+from etl_notifier.services.cache.entry import (
+    entry_state,
+    evict_expired,
+    make_entry,
+    make_watermark,
+    watermark_value,
+)
+
+
+class TestCacheEntry:
+    def test_make_entry_new(self):
+        assert make_entry("pending", 10.0) == {"state": "pending", "first_seen": 10.0, "last_seen": 10.0}
+
+    def test_make_entry_keeps_first_seen(self):
+        previous = make_entry("pending", 10.0)
+        assert make_entry("confirmed", 20.0, previous) == {"state": "confirmed", "first_seen": 10.0, "last_seen": 20.0}
+
+    def test_make_entry_from_legacy_string(self):
+        assert make_entry("confirmed", 20.0, "pending")["first_seen"] == 20.0
+
+    def test_entry_state_supports_legacy_strings(self):
+        assert entry_state("pending") == "pending"
+        assert entry_state({"state": "confirmed"}) == "confirmed"
+
+
+class TestEvictExpired:
+    def test_evicts_entries_past_default_retention(self):
+        data = {"q": {"old": make_entry("pending", 0.0), "new": make_entry("pending", 90.0)}}
+        assert evict_expired(data, 100.0, default_retention=50) == 1
+        assert list(data["q"]) == ["new"]
+
+    def test_per_section_retention_overrides_default(self):
+        data = {"q": {"k": make_entry("pending", 0.0)}, "r": {"k": make_entry("pending", 0.0)}}
+        evict_expired(data, 100.0, default_retention=1000, retention={"q": 10})
+        assert "q" not in data
+        assert "r" in data
+
+    def test_none_retention_keeps_everything(self):
+        data = {"q": {"k": make_entry("pending", 0.0)}}
+        assert evict_expired(data, 1e9, default_retention=None) == 0
+        assert "k" in data["q"]
+
+    def test_legacy_entries_are_stamped_not_evicted(self):
+        data = {"q": {"k": "confirmed"}}
+        assert evict_expired(data, 100.0, default_retention=10) == 0
+        assert data["q"]["k"] == {"state": "confirmed", "first_seen": 100.0, "last_seen": 100.0}
+
+    def test_empty_sections_are_kept(self):
+        data = {"q": {}}
+        evict_expired(data, 100.0, default_retention=10)
+        assert data == {"q": {}}
+
+    def test_non_mapping_sections_are_ignored(self):
+        data = {"meta": "value"}
+        evict_expired(data, 100.0, default_retention=10)
+        assert data == {"meta": "value"}
+
+
+class TestWatermark:
+    def test_datetime_round_trips(self):
+        entry = make_watermark(datetime(2025, 1, 1, 10, 30), 10.0)
+        assert entry["type"] == "datetime"
+        assert watermark_value(entry) == datetime(2025, 1, 1, 10, 30)
+
+    def test_date_round_trips(self):
+        assert watermark_value(make_watermark(date(2025, 1, 1), 10.0)) == date(2025, 1, 1)
+
+    def test_decimal_and_uuid_round_trip(self):
+        uuid = UUID("12345678-1234-5678-1234-567812345678")
+        assert watermark_value(make_watermark(Decimal("1042.50"), 10.0)) == Decimal("1042.50")
+        assert watermark_value(make_watermark(uuid, 10.0)) == uuid
+
+    def test_unsupported_type_raises(self):
+        with pytest.raises(TypeError, match="bytes"):
+            make_watermark(b"\x00\x01", 10.0)
+
+    def test_plain_values_are_stored_as_is(self):
+        assert watermark_value(make_watermark(42, 10.0)) == 42
+
+    def test_missing_watermark_is_none(self):
+        assert watermark_value(None) is None
+        assert watermark_value(make_watermark(None, 10.0)) is None
+
+    def test_keeps_first_seen(self):
+        previous = make_watermark(1, 10.0)
+        entry = make_watermark(2, 20.0, previous)
+        assert (entry["first_seen"], entry["last_seen"]) == (10.0, 20.0)
+
+    def test_watermark_is_evicted_like_an_entry(self):
+        data = {"failures": {"_watermark": make_watermark(1, 0.0)}}
+        assert evict_expired(data, 100.0, 50) == 1
@@ -49,3 +49,57 @@ class TestJsonFileCache:
         monkeypatch.setattr("builtins.open", lambda *a, **kw: (_ for _ in ()).throw(PermissionError("denied")))
         with pytest.raises(CacheSaveError, match="Error saving to cache"):
             cache.save({"key": "value"})
+
+    def test_save_is_compact(self, cache, cache_path):
+        cache.save({"query": {"key1": "confirmed"}})
+        with open(cache_path, "r") as f:
+            assert f.read() == '{"query":{"key1":"confirmed"}}'
+
+    def test_save_leaves_no_temp_files(self, cache, cache_path, tmp_path):
+        cache.load()
+        cache.save({"a": {}})
+        cache.save({"b": {}})
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["test_cache.json", "test_cache.json.bak"]
+
+    def test_save_rotates_previous_cache_to_backup(self, cache, cache_path):
+        cache.load()
+        cache.save({"first": {}})
+        cache.save({"second": {}})
+        with open(cache.backup_path, "r") as f:
+            assert json.load(f) == {"first": {}}
+
+    def test_failed_write_keeps_existing_cache(self, cache, cache_path, monkeypatch):
+        cache.save({"good": {}})
+        monkeypatch.setattr("json.dump", lambda *a, **kw: (_ for _ in ()).throw(OSError("disk full")))
+        with pytest.raises(CacheSaveError):
+            cache.save({"bad": {}})
+        with open(cache_path, "r") as f:
+            assert json.load(f) == {"good": {}}
+        assert [p for p in os.listdir(os.path.dirname(cache_path)) if p.endswith(".tmp")] == []
+
+    def test_load_falls_back_to_backup_when_corrupt(self, cache, cache_path):
+        with open(cache.backup_path, "w") as f:
+            json.dump({"query": {"k": "confirmed"}}, f)
+        with open(cache_path, "w") as f:
+            f.write('{"query": {"k": "conf')
+        assert cache.load() == {"query": {"k": "confirmed"}}
+
+    def test_load_falls_back_to_backup_when_missing(self, cache, cache_path):
+        with open(cache.backup_path, "w") as f:
+            json.dump({"query": {}}, f)
+        assert cache.load() == {"query": {}}
+
+    def test_corrupt_cache_is_not_rotated_into_backup(self, cache, cache_path):
+        with open(cache.backup_path, "w") as f:
+            json.dump({"good": {}}, f)
+        with open(cache_path, "w") as f:
+            f.write("torn")
+        cache.load()
+        cache.save({"next": {}})
+        with open(cache.backup_path, "r") as f:
+            assert json.load(f) == {"good": {}}
+
+    def test_size_bytes(self, cache, cache_path):
+        assert cache.size_bytes() is None
+        cache.save({"q": {"k": "v"}})
+        assert cache.size_bytes() == len('{"q":{"k":"v"}}')
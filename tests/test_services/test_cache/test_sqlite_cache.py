@@ -0,0 +1,82 @@
+import os
+import sqlite3
+
+import pytest
+
+from etl_notifier.services.cache.exceptions import CacheLoadError, CacheSaveError
+from etl_notifier.services.cache.sqlite_cache import SqliteCache
+
+
+class TestSqliteCache:
+    @pytest.fixture
+    def cache_path(self, tmp_path):
+        return str(tmp_path / "test_cache.db")
+
+    @pytest.fixture
+    def cache(self, cache_path):
+        cache = SqliteCache(cache_path)
+        yield cache
+        cache.close()
+
+    def rows(self, cache_path):
+        with sqlite3.connect(cache_path) as connection:
+            return sorted(connection.execute("SELECT section, key, value FROM cache_entries").fetchall())
+
+    def test_load_empty_creates_database(self, cache, cache_path):
+        assert cache.load() == {}
+        assert self.rows(cache_path) == []
+
+    def test_save_and_load_round_trip(self, cache, cache_path):
+        data = {"query": {"key1": "confirmed", "key2": "pending"}, "other": {"k": {"nested": 1}}}
+        cache.save(data)
+        assert SqliteCache(cache_path).load() == data
+
+    def test_save_writes_only_changed_entries(self, cache):
+        cache.load()
+        cache.save({"query": {"a": "pending", "b": "pending"}})
+        statements = []
+        cache._connection.set_trace_callback(statements.append)
+        cache.save({"query": {"a": "confirmed", "b": "pending"}})
+        writes = [s for s in statements if s.startswith(("INSERT", "DELETE"))]
+        assert len(writes) == 1
+        assert "'a'" in writes[0]
+
+    def test_save_deletes_removed_keys_and_sections(self, cache, cache_path):
+        cache.save({"query": {"a": "pending", "b": "pending"}, "gone": {"x": "confirmed"}})
+        cache.save({"query": {"a": "pending"}})
+        assert self.rows(cache_path) == [("query", "a", '"pending"')]
+
+    def test_save_before_load_removes_stale_rows(self, cache_path):
+        first = SqliteCache(cache_path)
+        first.save({"query": {"old": "pending"}})
+        first.close()
+        second = SqliteCache(cache_path)
+        second.save({"query": {"new": "pending"}})
+        second.close()
+        assert self.rows(cache_path) == [("query", "new", '"pending"')]
+
+    def test_periodic_compaction(self, cache_path):
+        cache = SqliteCache(cache_path, compact_every=2)
+        statements = []
+        cache.load()
+        cache._connection.set_trace_callback(statements.append)
+        cache.save({"query": {"a": "pending"}})
+        assert "VACUUM" not in statements
+        cache.save({"query": {}})
+        assert "VACUUM" in statements
+        cache.close()
+
+    def test_save_non_mapping_section_raises(self, cache):
+        with pytest.raises(CacheSaveError, match="must be a mapping"):
+            cache.save({"query": "not-a-dict"})
+
+    def test_load_corrupt_database_raises(self, cache_path):
+        with open(cache_path, "w") as f:
+            f.write("not a database" * 100)
+        with pytest.raises(CacheLoadError, match="Error loading cache"):
+            SqliteCache(cache_path).load()
+
+    def test_size_bytes_includes_write_ahead_log(self, cache, cache_path):
+        assert cache.size_bytes() is None
+        cache.save({"q": {"k": "v"}})
+        assert cache.size_bytes() >= os.path.getsize(cache_path) > 0
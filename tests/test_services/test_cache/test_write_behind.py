@@ -0,0 +1,103 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from etl_notifier.services.cache import CacheStrategy, JsonFileCache, WriteBehindCache
+from etl_notifier.services.cache.exceptions import CacheSaveError
+
+
+@pytest.fixture
+def backing():
+    backing = Mock(spec=CacheStrategy)
+    backing.load.return_value = {"q": {"k": {"state": "pending"}}}
+    return backing
+
+
+@pytest.fixture
+def cache(backing):
+    cache = WriteBehindCache(backing, flush_interval=3600, max_dirty_entries=100)
+    yield cache
+    cache.close()
+
+
+class TestWriteBehindCache:
+    def test_loads_backing_store_once(self, cache, backing):
+        assert cache.load() == {"q": {"k": {"state": "pending"}}}
+        cache.save({"q": {"k": {"state": "confirmed"}}})
+        assert cache.load() == {"q": {"k": {"state": "confirmed"}}}
+        backing.load.assert_called_once()
+
+    def test_save_does_not_write_through(self, cache, backing):
+        cache.load()
+        cache.save({"q": {"k": {"state": "confirmed"}}})
+        backing.save.assert_not_called()
+
+    def test_flush_writes_dirty_state_once(self, cache, backing):
+        cache.load()
+        cache.save({"q": {"k": {"state": "confirmed"}}})
+        cache.flush()
+        cache.flush()
+        backing.save.assert_called_once_with({"q": {"k": {"state": "confirmed"}}})
+
+    def test_unchanged_state_is_not_flushed(self, cache, backing):
+        data = cache.load()
+        cache.save({name: dict(section) for name, section in data.items()})
+        cache.flush()
+        backing.save.assert_not_called()
+
+    def test_removed_section_is_dirty(self, cache, backing):
+        cache.load()
+        cache.save({})
+        cache.flush()
+        backing.save.assert_called_once_with({})
+
+    def test_size_threshold_triggers_flush(self, backing):
+        cache = WriteBehindCache(backing, flush_interval=3600, max_dirty_entries=3)
+        cache.load()
+        cache.save({"q": {"a": 1, "b": 2}})
+        backing.save.assert_not_called()
+        cache.save({"q": {"a": 1, "b": 2}, "other": {"c": 3}})
+        backing.save.assert_called_once()
+        cache.close()
+
+    def test_interval_flushes_in_background(self, backing):
+        cache = WriteBehindCache(backing, flush_interval=0.05)
+        cache.load()
+        cache.save({"q": {}})
+        deadline = time.monotonic() + 2
+        while not backing.save.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        backing.save.assert_called_once_with({"q": {}})
+        cache.close()
+
+    def test_close_flushes_and_closes_backing(self, backing):
+        cache = WriteBehindCache(backing, flush_interval=3600)
+        cache.load()
+        cache.save({"q": {}})
+        cache.close()
+        backing.save.assert_called_once_with({"q": {}})
+        backing.close.assert_called_once()
+
+    def test_failed_flush_keeps_state_dirty(self, cache, backing):
+        cache.load()
+        cache.save({"q": {}})
+        backing.save.side_effect = CacheSaveError("disk full")
+        with pytest.raises(CacheSaveError):
+            cache.flush()
+        backing.save.side_effect = None
+        cache.flush()
+        assert backing.save.call_count == 2
+
+    def test_loaded_dict_is_isolated_from_resident_state(self, cache):
+        data = cache.load()
+        data["q"] = {}
+        assert cache.load() == {"q": {"k": {"state": "pending"}}}
+
+    def test_wraps_json_cache(self, tmp_path):
+        path = str(tmp_path / "cache.json")
+        cache = WriteBehindCache(JsonFileCache(path), flush_interval=3600)
+        cache.load()
+        cache.save({"q": {"k": {"state": "confirmed"}}})
+        cache.close()
+        assert JsonFileCache(path).load() == {"q": {"k": {"state": "confirmed"}}}
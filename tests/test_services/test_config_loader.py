@@ -211,6 +211,197 @@ queries:
         with pytest.raises(ValueError, match="must specify 'notifications'"):
             ConfigLoader.load_queries(str(f))
 
+    def test_query_unknown_column_mapping_raises(self, tmp_path):
+        f = tmp_path / "config.yml"
+        f.write_text("""
+notifications:
+    t:
+        type: teams
+        webhook_url: test
+sources:
+    db:
+        type: database
+queries:
+    q:
+        source: db
+        notifications: [t]
+        query:
+            sql: SELECT 1
+            columns:
+                Acount: acct
+        message_single: "t"
+        message_multiple: "t"
+""")
+        with pytest.raises(ValueError, match="invalid column mapping"):
+            ConfigLoader.load_queries(str(f))
+
+    def test_query_invalid_message_template_raises(self, tmp_path):
+        f = tmp_path / "config.yml"
+        f.write_text("""
+notifications:
+    t:
+        type: teams
+        webhook_url: test
+sources:
+    db:
+        type: database
+queries:
+    q:
+        source: db
+        notifications: [t]
+        query:
+            sql: SELECT 1
+        message_single: "{acount} failed"
+        message_multiple: "t"
+""")
+        with pytest.raises(ValueError, match="invalid 'message_single' template"):
+            ConfigLoader.load_queries(str(f))
+
+    def test_watermark_only_for_failures_query(self, tmp_path):
+        f = tmp_path / "config.yml"
+        f.write_text("""
+notifications:
+    t:
+        type: teams
+        webhook_url: test
+sources:
+    db:
+        type: database
+queries:
+    long_running:
+        source: db
+        notifications: [t]
+        watermark: StartTime
+        query:
+            sql: SELECT 1
+        message_single: "t"
+        message_multiple: "t"
+""")
+        with pytest.raises(ValueError, match="only supported for the 'failures' query"):
+            ConfigLoader.load_queries(str(f))
+
+    def test_watermark_must_be_column_name(self, tmp_path):
+        f = tmp_path / "config.yml"
+        f.write_text("""
+notifications:
+    t:
+        type: teams
+        webhook_url: test
+sources:
+    db:
+        type: database
+queries:
+    failures:
+        source: db
+        notifications: [t]
+        watermark: [EndTime]
+        query:
+            sql: SELECT 1
+        message_single: "t"
+        message_multiple: "t"
+""")
+        with pytest.raises(ValueError, match="'watermark' must be a column name"):
+            ConfigLoader.load_queries(str(f))
+
+    def test_query_invalid_params_raises(self, tmp_path):
+        f = tmp_path / "config.yml"
+        f.write_text("""
+notifications:
+    t:
+        type: teams
+        webhook_url: test
+sources:
+    db:
+        type: database
+queries:
+    q:
+        source: db
+        notifications: [t]
+        query:
+            sql: SELECT 1 WHERE x >= ?
+            params:
+                - now_minus: {fortnights: 1}
+        message_single: "t"
+        message_multiple: "t"
+""")
+        with pytest.raises(ValueError, match="invalid params"):
+            ConfigLoader.load_queries(str(f))
+
+    def test_query_invalid_schedule_raises(self, tmp_path):
+        f = tmp_path / "config.yml"
+        f.write_text("""
+notifications:
+    t:
+        type: teams
+        webhook_url: test
+sources:
+    db:
+        type: database
+queries:
+    q:
+        source: db
+        notifications: [t]
+        cron: "*/15 * * *"
+        query:
+            sql: SELECT 1
+        message_single: "t"
+        message_multiple: "t"
+""")
+        with pytest.raises(ValueError, match="invalid schedule"):
+            ConfigLoader.load_queries(str(f))
+
+    def test_query_invalid_priority_raises(self, tmp_path):
+        f = tmp_path / "config.yml"
+        f.write_text("""
+notifications:
+    t:
+        type: teams
+        webhook_url: test
+sources:
+    db:
+        type: database
+queries:
+    q:
+        source: db
+        notifications: [t]
+        priority: urgent
+        query:
+            sql: SELECT 1
+        message_single: "t"
+        message_multiple: "t"
+""")
+        with pytest.raises(ValueError, match="invalid priority"):
+            ConfigLoader.load_queries(str(f))
+
+    @pytest.mark.parametrize(
+        "option, value",
+        [("rate", 0), ("rate", "fast"), ("burst", 0.5), ("max_delay", -1), ("coalesce_window", -1), ("deadline", True)],
+    )
+    def test_invalid_sink_number_option_raises(self, tmp_path, option, value):
+        config = yaml.safe_load(VALID_CONFIG)
+        config["notifications"]["teams_main"][option] = value
+        f = tmp_path / "config.yml"
+        f.write_text(yaml.safe_dump(config))
+        with pytest.raises(ValueError, match=f"'teams_main' has invalid '{option}'"):
+            ConfigLoader.load_queries(str(f))
+
+    def test_sink_number_options_from_env_vars_are_accepted(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ETL_TEAMS_RATE", "0.5")
+        config = yaml.safe_load(VALID_CONFIG)
+        config["notifications"]["teams_main"].update({"rate": "${ETL_TEAMS_RATE}", "coalesce_window": 0})
+        f = tmp_path / "config.yml"
+        f.write_text(yaml.safe_dump(config))
+        assert ConfigLoader.load_queries(str(f))["notifications"]["teams_main"]["rate"] == "0.5"
+
+    @pytest.mark.parametrize("retention", [0, -3600, "week"])
+    def test_invalid_retention_raises(self, tmp_path, retention):
+        config = yaml.safe_load(VALID_CONFIG)
+        config["queries"]["database_failures"]["retention"] = retention
+        f = tmp_path / "config.yml"
+        f.write_text(yaml.safe_dump(config))
+        with pytest.raises(ValueError, match="invalid 'retention'"):
+            ConfigLoader.load_queries(str(f))
+
     def test_env_var_interpolation(self, tmp_path, monkeypatch):
         monkeypatch.setenv("MY_WEBHOOK", "http://my-webhook.url")
         monkeypatch.setenv("MY_CONN", "my-conn-string")
@@ -0,0 +1,137 @@
+import os
+import struct
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from etl_notifier.services.data_source.azure_sql_db import SQL_COPT_SS_ACCESS_TOKEN, AzureSqlDBSource
+from etl_notifier.services.data_source.azure_token import SQL_DATABASE_SCOPE, AzureTokenProvider
+
+MODULE = "etl_notifier.services.data_source.azure_token"
+
+
+def make_token(value="tok", expires_on=10_000):
+    return Mock(token=value, expires_on=expires_on)
+
+
+@pytest.fixture
+def credential_cls():
+    with patch(f"{MODULE}.DefaultAzureCredential") as cls:
+        cls.return_value.get_token.return_value = make_token()
+        yield cls
+
+
+@pytest.fixture
+def timer_cls():
+    with patch(f"{MODULE}.threading.Timer") as cls:
+        yield cls
+
+
+@pytest.fixture
+def clock():
+    with patch(f"{MODULE}.time.time", return_value=1_000) as mock_time:
+        yield mock_time
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    yield
+    AzureTokenProvider._providers.clear()
+
+
+class TestAzureTokenProvider:
+    def test_token_struct_is_length_prefixed_utf16(self, credential_cls, timer_cls, clock):
+        token_struct = AzureTokenProvider("client").get_token_struct()
+        token_bytes = "tok".encode("UTF-16-LE")
+        assert token_struct == struct.pack(f"<I{len(token_bytes)}s", len(token_bytes), token_bytes)
+
+    def test_client_id_passed_explicitly(self, credential_cls, timer_cls, clock, monkeypatch):
+        monkeypatch.delenv("AZURE_CLIENT_ID", raising=False)
+        AzureTokenProvider("client").get_token_struct()
+        kwargs = credential_cls.call_args.kwargs
+        assert kwargs["managed_identity_client_id"] == "client"
+        credential_cls.return_value.get_token.assert_called_once_with(SQL_DATABASE_SCOPE)
+        assert "AZURE_CLIENT_ID" not in os.environ
+
+    def test_cached_until_expiry_margin(self, credential_cls, timer_cls, clock):
+        provider = AzureTokenProvider("client", expiry_margin=60)
+        provider.get_token_struct()
+        clock.return_value = 10_000 - 61
+        provider.get_token_struct()
+        assert credential_cls.return_value.get_token.call_count == 1
+        clock.return_value = 10_000 - 59
+        provider.get_token_struct()
+        assert credential_cls.return_value.get_token.call_count == 2
+
+    def test_background_refresh_scheduled_ahead_of_expiry(self, credential_cls, timer_cls, clock):
+        AzureTokenProvider("client", refresh_ahead=600).get_token_struct()
+        delay, callback = timer_cls.call_args[0]
+        assert delay == 10_000 - 600 - 1_000
+        assert timer_cls.return_value.daemon is True
+        timer_cls.return_value.start.assert_called_once()
+
+    def test_short_lived_token_is_not_refreshed_in_a_loop(self, credential_cls, timer_cls, clock):
+        # 400s left is inside refresh_ahead; the credential keeps returning the same cached token
+        credential_cls.return_value.get_token.return_value = make_token("tok", 1_400)
+        provider = AzureTokenProvider("client", refresh_ahead=600)
+        provider.get_token_struct()
+        assert timer_cls.call_args[0][0] == AzureTokenProvider.RETRY_SECONDS
+        provider._background_refresh()
+        assert timer_cls.call_count == 1
+        assert credential_cls.return_value.get_token.call_count == 2
+
+    def test_background_refresh_replaces_token(self, credential_cls, timer_cls, clock):
+        provider = AzureTokenProvider("client")
+        provider.get_token_struct()
+        credential_cls.return_value.get_token.return_value = make_token("new", 20_000)
+        provider._background_refresh()
+        token_bytes = "new".encode("UTF-16-LE")
+        assert provider.get_token_struct().endswith(token_bytes)
+        assert credential_cls.return_value.get_token.call_count == 2
+
+    def test_background_refresh_failure_keeps_token_and_retries(self, credential_cls, timer_cls, clock):
+        provider = AzureTokenProvider("client")
+        original = provider.get_token_struct()
+        credential_cls.return_value.get_token.side_effect = Exception("IMDS timeout")
+        provider._background_refresh()
+        assert provider._token_struct == original
+        assert timer_cls.call_args[0][0] == AzureTokenProvider.RETRY_SECONDS
+
+    def test_background_refresh_fetches_without_holding_lock(self, credential_cls, timer_cls, clock):
+        provider = AzureTokenProvider("client")
+        original = provider.get_token_struct()
+
+        def get_token(scope):
+            # A connection opened during the refresh gets the current token instead of blocking on the lock
+            assert provider._lock.acquire(blocking=False)
+            provider._lock.release()
+            assert provider.get_token_struct() == original
+            return make_token("new", 20_000)
+
+        credential_cls.return_value.get_token.side_effect = get_token
+        provider._background_refresh()
+        assert provider._expires_on == 20_000
+
+    def test_close_cancels_refresh(self, credential_cls, timer_cls, clock):
+        provider = AzureTokenProvider("client")
+        provider.get_token_struct()
+        provider.close()
+        timer_cls.return_value.cancel.assert_called()
+        provider._background_refresh()
+        assert credential_cls.return_value.get_token.call_count == 1
+
+    def test_for_client_shares_provider_per_client_and_scope(self):
+        assert AzureTokenProvider.for_client("a") is AzureTokenProvider.for_client("a")
+        assert AzureTokenProvider.for_client("a") is not AzureTokenProvider.for_client("b")
+        assert AzureTokenProvider.for_client("a") is not AzureTokenProvider.for_client("a", "other-scope")
+
+
+class TestAzureSqlDBSource:
+    def test_connect_uses_cached_token_struct(self):
+        provider = MagicMock()
+        provider.get_token_struct.return_value = b"token"
+        with patch.object(AzureTokenProvider, "for_client", return_value=provider) as for_client, \
+                patch("pyodbc.connect") as mock_connect:
+            AzureSqlDBSource("conn", "client")
+        for_client.assert_called_once_with("client")
+        mock_connect.assert_called_once_with("conn", attrs_before={SQL_COPT_SS_ACCESS_TOKEN: b"token"})
@@ -1,5 +1,6 @@
 import pytest
-from unittest.mock import patch
+from datetime import datetime
+from unittest.mock import MagicMock, Mock, patch
 
 from etl_notifier.services.data_source.database import DatabaseSource
 
@@ -18,6 +19,89 @@ class TestDatabaseSource:
         assert results[0]["AccountName"] == "TestAccount"
         assert results[0]["Environment"] == "Production"
 
+    def test_stream_query_fetches_in_batches(self, source, mock_db_cursor):
+        source.cursor = mock_db_cursor
+        batches = [[("A", "Prod", datetime(2025, 1, 1), None)] * 2, [("B", "UAT", datetime(2025, 1, 2), None)], []]
+        mock_db_cursor.fetchmany.side_effect = batches
+        rows = source.stream_query({"sql": "SELECT 1", "batch_size": 2})
+        assert next(rows)["AccountName"] == "A"
+        assert mock_db_cursor.fetchmany.call_count == 1
+        assert [row["AccountName"] for row in rows] == ["A", "B"]
+        mock_db_cursor.fetchmany.assert_called_with(2)
+        mock_db_cursor.fetchall.assert_not_called()
+
+    def test_stream_query_default_batch_size(self, source, mock_db_cursor):
+        source.cursor = mock_db_cursor
+        list(source.stream_query({"sql": "SELECT 1"}))
+        mock_db_cursor.fetchmany.assert_called_with(DatabaseSource.DEFAULT_BATCH_SIZE)
+
+    def test_stream_records_maps_rows_without_dicts(self, source, mock_db_cursor):
+        source.cursor = mock_db_cursor
+        records = list(source.stream_records({"sql": "SELECT 1"}))
+        assert len(records) == 1
+        assert records[0].account_name == "TestAccount"
+        assert records[0].error_message == "Test error"
+        assert records[0].url is None
+
+    def test_stream_records_applies_column_mapping(self, source, mock_db_cursor):
+        source.cursor = mock_db_cursor
+        mock_db_cursor.description = [("acct",), ("env",), ("StartTime",), ("errorMessage",)]
+        query = {"sql": "SELECT 1", "columns": {"AccountName": "acct", "Environment": "env"}}
+        records = list(source.stream_records(query))
+        assert records[0].environment == "Production"
+
+    def test_stream_watermarked_records_pairs_rows_with_column(self, source, mock_db_cursor):
+        source.cursor = mock_db_cursor
+        mock_db_cursor.description = [*mock_db_cursor.description, ("EndTime", datetime)]
+        mock_db_cursor.fetchmany.side_effect = [[("A", "Prod", datetime(2025, 1, 1), None, datetime(2025, 1, 2))], []]
+        [(record, end_time)] = source.stream_watermarked_records({"sql": "SELECT 1"}, "EndTime")
+        assert record.account_name == "A"
+        assert end_time == datetime(2025, 1, 2)
+
+    def test_stream_watermarked_records_missing_column_raises(self, source, mock_db_cursor):
+        with pytest.raises(ValueError, match="missing watermark column: EndTime"):
+            source.stream_watermarked_records({"sql": "SELECT 1"}, "EndTime")
+
+    def test_params_are_bound(self, source, mock_db_cursor):
+        source.cursor = mock_db_cursor
+        watermark = datetime(2025, 1, 1)
+        list(source.stream_records({"sql": "SELECT ... WHERE StartTime >= ?", "params": [watermark]}))
+        mock_db_cursor.execute.assert_called_once_with("SELECT ... WHERE StartTime >= ?", watermark)
+
+    def test_now_minus_params_are_resolved(self, source, mock_db_cursor):
+        list(source.stream_records({"sql": "SELECT ... WHERE StartTime >= ?", "params": [{"now_minus": {"minutes": 5}}]}))
+        (bound,) = mock_db_cursor.execute.call_args[0][1:]
+        assert isinstance(bound, datetime)
+
+    def test_cursor_is_reused_per_statement(self):
+        with patch("pyodbc.connect") as mock_connect:
+            connection = mock_connect.return_value
+            connection.cursor.side_effect = lambda: MagicMock(description=[("AccountName",)], fetchmany=Mock(return_value=[]))
+            source = DatabaseSource("test_connection_string")
+            for sql in ("SELECT a", "SELECT b", "SELECT a"):
+                list(source.stream_query({"sql": sql, "batch_size": 50}))
+        # One default cursor plus one per distinct statement
+        assert connection.cursor.call_count == 3
+        first = source._statements["SELECT a"]
+        assert first.execute.call_count == 2
+        assert first.arraysize == 50
+
+    def test_prepared_statements_are_bounded(self):
+        with patch("pyodbc.connect") as mock_connect:
+            mock_connect.return_value.cursor.side_effect = lambda: MagicMock(fetchmany=Mock(return_value=[]))
+            source = DatabaseSource("test_connection_string")
+            source.MAX_PREPARED_STATEMENTS = 2
+            for sql in ("SELECT a", "SELECT b", "SELECT c"):
+                list(source.stream_query({"sql": sql}))
+        assert list(source._statements) == ["SELECT b", "SELECT c"]
+
+    def test_disconnect_closes_statement_cursors(self, source, mock_db_cursor):
+        list(source.stream_query({"sql": "SELECT 1"}))
+        statement = source._statements["SELECT 1"]
+        source.disconnect()
+        statement.close.assert_called()
+        assert source._statements == {}
+
     def test_execute_query_missing_sql_raises(self, source, mock_db_cursor):
         source.cursor = mock_db_cursor
         with pytest.raises(ValueError):
@@ -31,3 +115,17 @@ class TestDatabaseSource:
                 assert source.connection == mock_connection
             mock_cursor.close.assert_called_once()
             mock_connection.close.assert_called_once()
+
+    def test_is_alive_runs_probe_query(self, source, mock_db_cursor):
+        source.cursor = mock_db_cursor
+        assert source.is_alive() is True
+        mock_db_cursor.execute.assert_called_with("SELECT 1")
+
+    def test_is_alive_false_when_probe_fails(self, source, mock_db_cursor):
+        source.cursor = mock_db_cursor
+        mock_db_cursor.execute.side_effect = Exception("link failure")
+        assert source.is_alive() is False
+
+    def test_is_alive_false_when_disconnected(self, source):
+        source.disconnect()
+        assert source.is_alive() is False
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from etl_notifier.services.data_source.params import resolve_params, validate_params
+
+
+class TestParams:
+    def test_literals_pass_through(self):
+        assert resolve_params(["Failed", 3, None]) == ["Failed", 3, None]
+
+    def test_now_minus_is_resolved_at_run_time(self):
+        now = datetime(2025, 1, 1, 12, 0)
+        params = ["Failed", {"now_minus": {"minutes": 30}}, {"now_minus": {"days": 1, "hours": 2}}]
+        assert resolve_params(params, now=now) == ["Failed", datetime(2025, 1, 1, 11, 30), datetime(2024, 12, 31, 10, 0)]
+
+    def test_now_defaults_to_naive_utc(self):
+        (value,) = resolve_params([{"now_minus": {"minutes": 0}}])
+        assert value.tzinfo is None
+        assert abs((datetime.now(timezone.utc).replace(tzinfo=None) - value).total_seconds()) < 5
+
+    @pytest.mark.parametrize("params", [
+        "SELECT",
+        [{"now_plus": {"minutes": 5}}],
+        [{"now_minus": {"fortnights": 1}}],
+        [{"now_minus": 5}],
+    ])
+    def test_validate_rejects_invalid_params(self, params):
+        with pytest.raises(ValueError):
+            validate_params(params)
+
+    def test_validate_accepts_valid_params(self):
+        validate_params(["x", 1, {"now_minus": {"hours": 1}}])
@@ -0,0 +1,97 @@
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from etl_notifier.services.data_source.pool import ConnectionPool, SourceUnavailable
+
+
+@pytest.fixture
+def factory():
+    return Mock(side_effect=lambda name: MagicMock(name=f"source-{name}"))
+
+
+@pytest.fixture
+def pool(factory):
+    return ConnectionPool(factory, max_idle_seconds=60)
+
+
+class TestConnectionPool:
+    def test_checkout_creates_source_when_empty(self, pool, factory):
+        source = pool.checkout("db")
+        factory.assert_called_once_with("db")
+        assert source is not None
+
+    def test_released_source_is_reused(self, pool, factory):
+        with pool.connection("db") as first:
+            pass
+        with pool.connection("db") as second:
+            pass
+        assert first is second
+        factory.assert_called_once()
+
+    def test_pool_is_keyed_by_source_name(self, pool, factory):
+        with pool.connection("a") as a:
+            pass
+        with pool.connection("b") as b:
+            pass
+        assert a is not b
+        assert factory.call_count == 2
+
+    def test_concurrent_checkouts_get_distinct_sources(self, pool, factory):
+        first = pool.checkout("db")
+        second = pool.checkout("db")
+        assert first is not second
+
+    def test_broken_source_is_replaced(self, pool, factory):
+        with pool.connection("db") as first:
+            pass
+        first.is_alive.return_value = False
+        with pool.connection("db") as second:
+            pass
+        assert second is not first
+        first.disconnect.assert_called_once()
+
+    def test_idle_source_is_replaced(self, pool, factory):
+        with patch("etl_notifier.services.data_source.pool.time.monotonic", return_value=0):
+            with pool.connection("db") as first:
+                pass
+        with patch("etl_notifier.services.data_source.pool.time.monotonic", return_value=120):
+            second = pool.checkout("db")
+        assert second is not first
+        first.disconnect.assert_called_once()
+        first.is_alive.assert_not_called()
+
+    def test_source_discarded_when_block_raises(self, pool, factory):
+        with pytest.raises(RuntimeError):
+            with pool.connection("db") as source:
+                raise RuntimeError("boom")
+        source.disconnect.assert_called_once()
+        assert pool.checkout("db") is not source
+
+    def test_close_disconnects_idle_sources(self, pool):
+        with pool.connection("db") as source:
+            pass
+        pool.close()
+        source.disconnect.assert_called_once()
+
+    def test_close_tolerates_disconnect_errors(self, pool):
+        with pool.connection("db") as source:
+            pass
+        source.disconnect.side_effect = Exception("gone")
+        pool.close()
+
+    def test_failed_connect_raises_source_unavailable(self, pool, factory):
+        factory.side_effect = OSError("login timeout")
+        with pytest.raises(SourceUnavailable, match="db: login timeout") as excinfo:
+            with pool.connection("db"):
+                pass
+        assert isinstance(excinfo.value.__cause__, OSError)
+
+    def test_raising_liveness_probe_discards_source(self, pool, factory):
+        with pool.connection("db") as first:
+            pass
+        first.is_alive.side_effect = RuntimeError("connection reset")
+        with pool.connection("db") as second:
+            pass
+        assert second is not first
+        first.disconnect.assert_called_once()
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+from etl_notifier.models.notification_record import NotificationRecord
+from etl_notifier.services.data_source.record_mapper import RecordMapper
+
+ALL_COLUMNS = ["AccountName", "Environment", "StartTime", "PipelineURL", "errorMessage", "over_hour", "PipelineRunId"]
+
+
+class TestRecordMapper:
+    def test_bind_maps_rows_by_position(self):
+        to_record = RecordMapper().bind(list(reversed(ALL_COLUMNS)))
+        row = ("run-1", "yes", "err", "http://x", datetime(2025, 1, 1), "Prod", "Acct")
+        assert to_record(row) == NotificationRecord(
+            account_name="Acct",
+            environment="Prod",
+            start_time=datetime(2025, 1, 1),
+            url="http://x",
+            error_message="err",
+            over_hour="yes",
+            run_id="run-1",
+        )
+
+    def test_bind_missing_optional_columns_are_none(self):
+        to_record = RecordMapper().bind(["StartTime", "AccountName", "Environment", "Extra"])
+        record = to_record((datetime(2025, 1, 1), "Acct", "Prod", "ignored"))
+        assert record.account_name == "Acct"
+        assert record.url is None
+        assert record.run_id is None
+
+    def test_bind_missing_required_column_raises(self):
+        with pytest.raises(ValueError, match="missing required columns: Environment"):
+            RecordMapper().bind(["AccountName", "StartTime"])
+
+    def test_column_map_renames_source_columns(self):
+        mapper = RecordMapper({"AccountName": "acct", "PipelineRunId": "run"})
+        record = mapper.bind(["acct", "Environment", "StartTime", "run"])(("A", "Prod", datetime(2025, 1, 1), "r1"))
+        assert record.account_name == "A"
+        assert record.run_id == "r1"
+
+    def test_column_map_unknown_column_raises(self):
+        with pytest.raises(ValueError, match="Unknown columns in column mapping: Acount"):
+            RecordMapper({"Acount": "acct"})
+
+    def test_from_dict_uses_column_map(self):
+        record = RecordMapper({"Environment": "env"}).from_dict(
+            {"AccountName": "A", "env": "UAT", "StartTime": datetime(2025, 1, 1), "errorMessage": "boom"}
+        )
+        assert record.environment == "UAT"
+        assert record.error_message == "boom"
+        assert record.over_hour is None
+
+    def test_from_dict_missing_required_column_raises(self):
+        with pytest.raises(KeyError):
+            RecordMapper().from_dict({"AccountName": "A", "StartTime": datetime(2025, 1, 1)})
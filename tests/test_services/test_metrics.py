@@ -0,0 +1,111 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from etl_notifier.services.metrics import Metric, MetricsRegistry, MetricsServer
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+class TestCounter:
+    def test_renders_help_type_and_labelled_samples(self, registry):
+        counter = registry.counter("etl_rows_total", "Rows returned", ["query"])
+        counter.inc(3, query="failures")
+        counter.inc(query="failures")
+        counter.inc(2, query="pending")
+        assert registry.render() == (
+            "# HELP etl_rows_total Rows returned\n"
+            "# TYPE etl_rows_total counter\n"
+            'etl_rows_total{query="failures"} 4\n'
+            'etl_rows_total{query="pending"} 2\n'
+        )
+
+    def test_rejects_negative_increment(self, registry):
+        with pytest.raises(ValueError):
+            registry.counter("etl_total", "help").inc(-1)
+
+    def test_rejects_wrong_labels(self, registry):
+        counter = registry.counter("etl_total", "help", ["sink"])
+        with pytest.raises(ValueError, match="expects labels sink"):
+            counter.inc(query="x")
+
+    def test_escapes_label_values(self, registry):
+        registry.counter("etl_total", "help", ["query"]).inc(query='a"b\\c\nd')
+        assert 'etl_total{query="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+class TestGauge:
+    def test_set_replaces_value(self, registry):
+        gauge = registry.gauge("etl_cache_size_bytes", "help")
+        gauge.set(100)
+        gauge.set(2.5)
+        assert "# TYPE etl_cache_size_bytes gauge\netl_cache_size_bytes 2.5\n" in registry.render()
+
+    def test_replace_drops_stale_label_sets(self, registry):
+        gauge = registry.gauge("etl_cache_entries", "help", ["query"])
+        gauge.set(5, query="removed")
+        gauge.replace([(3, {"query": "failures"})])
+        assert registry.render().splitlines()[2:] == ['etl_cache_entries{query="failures"} 3']
+
+    def test_clear_removes_all_samples(self, registry):
+        gauge = registry.gauge("etl_cache_entries", "help", ["query"])
+        gauge.set(5, query="failures")
+        gauge.clear()
+        assert registry.render().splitlines()[2:] == []
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative_and_inclusive(self, registry):
+        histogram = registry.histogram("etl_seconds", "help", ["sink"], buckets=[0.1, 1])
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, sink="teams")
+        assert registry.render().splitlines()[2:] == [
+            'etl_seconds_bucket{sink="teams",le="0.1"} 2',
+            'etl_seconds_bucket{sink="teams",le="1"} 3',
+            'etl_seconds_bucket{sink="teams",le="+Inf"} 4',
+            'etl_seconds_sum{sink="teams"} 3.65',
+            'etl_seconds_count{sink="teams"} 4',
+        ]
+
+    def test_time_observes_even_on_error(self, registry):
+        histogram = registry.histogram("etl_seconds", "help")
+        with pytest.raises(RuntimeError):
+            with histogram.time():
+                raise RuntimeError("boom")
+        assert histogram.count() == 1
+
+
+def test_metric_requires_samples():
+    with pytest.raises(TypeError):
+        Metric("etl_total", "help")
+
+
+class TestMetricsRegistry:
+    def test_duplicate_name_raises(self, registry):
+        registry.counter("etl_total", "help")
+        with pytest.raises(ValueError, match="already registered"):
+            registry.gauge("etl_total", "help")
+
+
+class TestMetricsServer:
+    @pytest.fixture
+    def server(self, registry):
+        server = MetricsServer(registry, 0, host="127.0.0.1")
+        server.start()
+        yield server
+        server.close()
+
+    def test_serves_metrics(self, registry, server):
+        registry.counter("etl_total", "help").inc()
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert response.read().decode() == registry.render()
+
+    def test_other_paths_return_404(self, server):
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(f"http://127.0.0.1:{server.port}/")
+        assert excinfo.value.code == 404
@@ -0,0 +1,80 @@
+"""In-process stand-in for a pymongo Collection, covering what MongoNotificationStrategy uses.
+
+pymongo's InsertOne and UpdateOne keep their arguments in private attributes, so tests patch the strategy
+module to build these write models instead and FakeCollection reads their public fields.
+"""
+
+import copy
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+@dataclass
+class InsertOne:
+    document: Dict[str, Any]
+
+
+@dataclass
+class UpdateOne:
+    filter: Dict[str, Any]
+    update: Dict[str, Any]
+    upsert: bool = False
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs: List[Dict[str, Any]] = []
+        self.unique_fields: List[str] = []
+        self.write_concern = None
+
+    def with_options(self, write_concern=None, **kwargs) -> "FakeCollection":
+        self.write_concern = write_concern
+        return self
+
+    def create_index(self, field: str, unique: bool = False, **kwargs) -> str:
+        if unique and field not in self.unique_fields:
+            self.unique_fields.append(field)
+        return kwargs.get("name", f"{field}_1")
+
+    def insert_many(self, docs: List[Dict[str, Any]], ordered: bool = True) -> None:
+        self.bulk_write([InsertOne(doc) for doc in docs], ordered=ordered)
+
+    def bulk_write(self, operations: List[Any], ordered: bool = True) -> None:
+        errors = []
+        for index, operation in enumerate(operations):
+            try:
+                if isinstance(operation, InsertOne):
+                    self._insert(copy.deepcopy(operation.document))
+                elif isinstance(operation, UpdateOne):
+                    self._upsert(operation.filter, operation.update, operation.upsert)
+                else:
+                    raise NotImplementedError(type(operation).__name__)
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    def find_one(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return next((doc for doc in self.docs if self._matches(doc, query)), None)
+
+    def count_documents(self, query: Dict[str, Any]) -> int:
+        return sum(1 for doc in self.docs if self._matches(doc, query))
+
+    def _insert(self, doc: Dict[str, Any]) -> None:
+        for field in self.unique_fields:
+            if isinstance(doc.get(field), str) and self.find_one({field: doc[field]}) is not None:
+                raise DuplicateKeyError(f"duplicate key {field}: {doc[field]}")
+        self.docs.append(doc)
+
+    def _upsert(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool) -> None:
+        if self.find_one(query) is not None or not upsert:
+            return
+        self._insert({**query, **copy.deepcopy(update.get("$setOnInsert", {}))})
+
+    @staticmethod
+    def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+        return all(doc.get(key) == value for key, value in query.items())
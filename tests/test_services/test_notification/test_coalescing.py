@@ -0,0 +1,101 @@
+import time
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from etl_notifier.models.notification_record import NotificationRecord
+from etl_notifier.services.metrics import NotifierMetrics
+from etl_notifier.services.notification.coalescing import CoalescingStrategy, merge_batches
+from etl_notifier.services.notification.dispatcher import NotificationDispatcher
+from etl_notifier.services.notification.strategy import NotificationStrategy
+
+
+def make_record(account):
+    return NotificationRecord(account, "dev", datetime(2025, 1, 1))
+
+
+@pytest.fixture
+def inner():
+    return Mock(spec=NotificationStrategy)
+
+
+class TestCoalescingStrategy:
+    def test_buffers_until_flush(self, inner):
+        strategy = CoalescingStrategy(inner, window=60)
+        strategy.send_notification([make_record("a")], "s", "m")
+        inner.send_batch.assert_not_called()
+        strategy.flush()
+        inner.send_batch.assert_called_once_with([([make_record("a")], "s", "m")])
+
+    def test_same_templates_are_merged(self, inner):
+        strategy = CoalescingStrategy(inner, window=60)
+        strategy.send_notification([make_record("a")], "s", "m")
+        strategy.send_notification([make_record("b")], "s", "m")
+        strategy.send_notification([make_record("c")], "s2", "m2")
+        strategy.flush()
+        batches = inner.send_batch.call_args[0][0]
+        assert batches == [
+            ([make_record("a"), make_record("b")], "s", "m"),
+            ([make_record("c")], "s2", "m2"),
+        ]
+
+    def test_window_timer_flushes(self, inner):
+        strategy = CoalescingStrategy(inner, window=0.05)
+        strategy.send_notification([make_record("a")], "s", "m")
+        deadline = time.monotonic() + 2
+        while not inner.send_batch.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        inner.send_batch.assert_called_once()
+
+    def test_flush_with_nothing_pending_sends_nothing(self, inner):
+        CoalescingStrategy(inner, window=60).flush()
+        inner.send_batch.assert_not_called()
+
+    def test_timer_flush_errors_are_logged(self, inner, caplog):
+        inner.send_batch.side_effect = RuntimeError("webhook down")
+        strategy = CoalescingStrategy(inner, window=60)
+        strategy.send_notification([make_record("a")], "s", "m")
+        strategy._flush_quietly()
+        assert "webhook down" in caplog.text
+
+    def test_timer_flush_runs_through_dispatcher(self, inner, caplog):
+        inner.send_batch.side_effect = RuntimeError("webhook down")
+        metrics = NotifierMetrics()
+        dispatcher = NotificationDispatcher(metrics=metrics)
+        strategy = CoalescingStrategy(inner, window=60, dispatcher=dispatcher, name="teams", deadline=5)
+        strategy.send_notification([make_record("a")], "s", "m")
+        strategy._flush_quietly()
+        dispatcher.close()
+        assert metrics.sink_duration.count(sink="teams") == 1
+        assert metrics.sink_errors.value(sink="teams") == 1
+        assert "webhook down" in caplog.text
+
+    def test_close_flushes_and_closes_inner(self, inner):
+        strategy = CoalescingStrategy(inner, window=60)
+        strategy.send_notification([make_record("a")], "s", "m")
+        strategy.close()
+        inner.send_batch.assert_called_once()
+        inner.close.assert_called_once()
+
+
+def test_merge_batches_groups_by_templates_in_order():
+    batches = [([make_record("a")], "s", "m"), ([make_record("b")], "s2", "m2"), ([make_record("c")], "s", "m")]
+    assert merge_batches(batches) == [
+        ([make_record("a"), make_record("c")], "s", "m"),
+        ([make_record("b")], "s2", "m2"),
+    ]
+
+
+class TestNotificationStrategyDefaults:
+    def test_send_batch_sends_each_batch(self):
+        class Recording(NotificationStrategy):
+            def __init__(self):
+                self.sent = []
+
+            def send_notification(self, records, template_single, template_multiple):
+                self.sent.append((records, template_single))
+
+        strategy = Recording()
+        strategy.send_batch([([make_record("a")], "s", "m"), ([make_record("b")], "s2", "m2")])
+        assert strategy.sent == [([make_record("a")], "s"), ([make_record("b")], "s2")]
@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from etl_notifier.services.metrics import NotifierMetrics
+from etl_notifier.services.notification.dispatcher import NotificationDispatcher
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = NotificationDispatcher(max_workers=4, default_deadline=5)
+    yield dispatcher
+    dispatcher.close()
+
+
+class TestNotificationDispatcher:
+    def test_all_calls_run(self, dispatcher):
+        called = []
+        results = dispatcher.dispatch({"a": lambda: called.append("a"), "b": lambda: called.append("b")})
+        assert sorted(called) == ["a", "b"]
+        assert all(result.ok for result in results.values())
+
+    def test_calls_run_concurrently(self, dispatcher):
+        barrier = threading.Barrier(2, timeout=2)
+        results = dispatcher.dispatch({"a": barrier.wait, "b": barrier.wait})
+        assert all(result.ok for result in results.values())
+
+    def test_failing_sink_does_not_affect_others(self, dispatcher):
+        called = []
+
+        def fail():
+            raise RuntimeError("webhook down")
+
+        results = dispatcher.dispatch({"bad": fail, "good": lambda: called.append("good")})
+        assert called == ["good"]
+        assert isinstance(results["bad"].error, RuntimeError)
+        assert results["good"].ok
+
+    def test_slow_sink_is_cut_off_at_deadline(self, dispatcher):
+        release = threading.Event()
+        start = time.monotonic()
+        results = dispatcher.dispatch({"slow": lambda: release.wait(5), "fast": lambda: None}, {"slow": 0.1})
+        release.set()
+        assert time.monotonic() - start < 2
+        assert isinstance(results["slow"].error, TimeoutError)
+        assert "deadline" in str(results["slow"].error)
+        assert results["fast"].ok
+        assert results["fast"].pending is None
+        results["slow"].pending.result(timeout=2)
+
+    def test_result_records_elapsed_time(self, dispatcher):
+        results = dispatcher.dispatch({"a": lambda: time.sleep(0.05)})
+        assert results["a"].elapsed >= 0.05
+
+    def test_empty_dispatch(self, dispatcher):
+        assert dispatcher.dispatch({}) == {}
+
+    def test_records_sink_metrics(self):
+        metrics = NotifierMetrics()
+        dispatcher = NotificationDispatcher(max_workers=2, metrics=metrics)
+
+        def fail():
+            raise RuntimeError("webhook down")
+
+        dispatcher.dispatch({"bad": fail, "good": lambda: None})
+        dispatcher.close()
+        assert metrics.sink_duration.count(sink="good") == 1
+        assert metrics.sink_duration.count(sink="bad") == 1
+        assert metrics.sink_errors.value(sink="bad") == 1
+        assert metrics.sink_errors.value(sink="good") == 0
@@ -90,3 +90,17 @@ class TestTeamsFormatting:
         msg = strategy._format([record, second], "single", "Multiple:")
         assert "Multiple:" in msg
         assert "single" not in msg
+
+    def test_multiple_caps_message_size_with_overflow_summary(self, record):
+        strategy = TeamsNotificationStrategy(webhook_url="http://test-webhook.url", max_message_chars=400)
+        msg = strategy._format_multiple([record] * 50, "Header:")
+        assert len(msg) <= 400
+        listed = msg.count("[**TestAccount**")
+        assert 0 < listed < 50
+        assert msg.endswith(f"... and {50 - listed} more")
+
+    def test_multiple_uncapped_when_limit_disabled(self, record):
+        strategy = TeamsNotificationStrategy(webhook_url="http://test-webhook.url", max_message_chars=None)
+        msg = strategy._format_multiple([record] * 500, "Header:")
+        assert msg.count("[**TestAccount**") == 500
+        assert "more" not in msg
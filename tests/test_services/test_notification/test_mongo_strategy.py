@@ -7,6 +7,10 @@ import pytest
 from etl_notifier.models.notification_record import NotificationRecord
 from etl_notifier.services.notification.mongo_strategy import MongoNotificationStrategy
 
+from .fake_mongo import FakeCollection, InsertOne, UpdateOne
+
+MODULE = "etl_notifier.services.notification.mongo_strategy"
+
 
 @pytest.fixture
 def mock_col():
@@ -67,3 +71,58 @@ class TestMongoNotificationStrategy:
         mock_col.insert_many.side_effect = Exception("connection refused")
         with pytest.raises(Exception, match="connection refused"):
             strategy.send_notification([record], "", "")
+
+
+@pytest.fixture
+def fake_col():
+    with patch(f"{MODULE}.MongoClient") as mock_client, patch(f"{MODULE}.InsertOne", InsertOne), \
+            patch(f"{MODULE}.UpdateOne", UpdateOne):
+        col = FakeCollection()
+        mock_client.return_value.__getitem__.return_value.__getitem__.return_value = col
+        yield col
+
+
+class TestMongoWriteModes:
+    def test_insert_mode_passes_ordered_flag(self, mock_col, record):
+        strategy = MongoNotificationStrategy("mongodb://test", "CHUCK", "queue", ordered=False)
+        strategy.send_notification([record], "", "")
+        assert mock_col.insert_many.call_args[1] == {"ordered": False}
+
+    def test_write_concern_is_applied(self, fake_col):
+        MongoNotificationStrategy("mongodb://test", "CHUCK", "queue", write_concern={"w": 1, "j": False})
+        assert fake_col.write_concern.document == {"w": 1, "j": False}
+
+    def test_unknown_mode_raises(self, fake_col):
+        with pytest.raises(ValueError, match="Unknown MongoDB write mode"):
+            MongoNotificationStrategy("mongodb://test", "CHUCK", "queue", mode="replace")
+
+    def test_upsert_creates_unique_index_on_startup(self, fake_col):
+        MongoNotificationStrategy("mongodb://test", "CHUCK", "queue", mode="upsert")
+        assert fake_col.unique_fields == ["runId"]
+
+    def test_upsert_is_idempotent_per_run_id(self, fake_col, record):
+        strategy = MongoNotificationStrategy("mongodb://test", "CHUCK", "queue", mode="upsert")
+        strategy.send_notification([record], "", "")
+        first = dict(fake_col.find_one({"runId": "abc-123-run-id"}))
+        strategy.send_notification([record], "", "")
+        assert fake_col.count_documents({"runId": "abc-123-run-id"}) == 1
+        assert fake_col.find_one({"runId": "abc-123-run-id"}) == first
+
+    def test_upsert_mixed_batch(self, fake_col, record):
+        strategy = MongoNotificationStrategy("mongodb://test", "CHUCK", "queue", mode="upsert", ordered=False)
+        no_run_id = NotificationRecord("Other", "UAT", datetime(2026, 4, 27))
+        strategy.send_notification([record, no_run_id], "", "")
+        strategy.send_notification([record, no_run_id], "", "")
+        assert fake_col.count_documents({"runId": "abc-123-run-id"}) == 1
+        assert len(fake_col.docs) == 3  # records without a run id cannot be deduplicated
+
+    def test_insert_mode_duplicates_on_retry(self, fake_col, record):
+        strategy = MongoNotificationStrategy("mongodb://test", "CHUCK", "queue")
+        strategy.send_notification([record], "", "")
+        strategy.send_notification([record], "", "")
+        assert len(fake_col.docs) == 2
+
+    def test_close_closes_client(self):
+        with patch("etl_notifier.services.notification.mongo_strategy.MongoClient") as mock_client:
+            MongoNotificationStrategy("mongodb://test", "CHUCK", "queue").close()
+        mock_client.return_value.close.assert_called_once()
@@ -0,0 +1,263 @@
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from etl_notifier.models.notification_record import NotificationRecord
+from etl_notifier.services.metrics import NotifierMetrics
+from etl_notifier.services.notification.dispatcher import NotificationDispatcher
+from etl_notifier.services.notification.outbox import OutboxWorker, SqliteOutbox
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = SqliteOutbox(str(tmp_path / "outbox.db"))
+    yield outbox
+    outbox.close()
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = NotificationDispatcher(max_workers=2, default_deadline=5)
+    yield dispatcher
+    dispatcher.close()
+
+
+def make_record(account="acc1"):
+    return NotificationRecord(account, "dev", datetime(2024, 1, 1, 10, 0), "http://x", "boom", None, "run1")
+
+
+class TestSqliteOutbox:
+    def test_enqueue_round_trips_records(self, outbox):
+        record = make_record()
+        outbox.enqueue(["teams"], [record], "single", "multiple")
+        (message,) = outbox.due(time.time())
+        assert message.sink == "teams"
+        assert message.records == [record]
+        assert message.records[0].start_time == datetime(2024, 1, 1, 10, 0)
+        assert (message.template_single, message.template_multiple) == ("single", "multiple")
+        assert message.attempts == 0
+
+    def test_typed_values_round_trip(self, outbox):
+        record = NotificationRecord("acc", "dev", date(2024, 1, 1), run_id=uuid.uuid4(), over_hour=Decimal("1.5"))
+        outbox.enqueue(["teams"], [record], "s", "m")
+        (message,) = outbox.due(time.time())
+        assert message.records == [record]
+        assert isinstance(message.records[0].run_id, uuid.UUID)
+
+    def test_unsupported_value_is_rejected(self, outbox):
+        with pytest.raises(TypeError, match="cannot be stored in the outbox"):
+            outbox.enqueue(["teams"], [NotificationRecord("acc", "dev", datetime(2024, 1, 1), url=object())], "s", "m")
+        assert outbox.pending() == {}
+
+    def test_dead_letter_moves_messages_out_of_queue(self, outbox):
+        outbox.enqueue(["teams"], [make_record("first")], "s", "m")
+        outbox.enqueue(["teams"], [make_record("second")], "s", "m")
+        (message,) = outbox.due(time.time())
+        outbox.dead_letter([message.id], "bad request")
+        assert outbox.dead_letters() == {"teams": 1}
+        (head,) = outbox.due(time.time())
+        assert head.records[0].account_name == "second"
+
+    def test_one_message_per_sink(self, outbox):
+        outbox.enqueue(["teams", "mongo"], [make_record()], "s", "m")
+        assert outbox.pending() == {"teams": 1, "mongo": 1}
+
+    def test_only_head_of_each_sink_is_due(self, outbox):
+        outbox.enqueue(["teams"], [make_record("first")], "s", "m")
+        outbox.enqueue(["teams"], [make_record("second")], "s", "m")
+        (message,) = outbox.due(time.time())
+        assert message.records[0].account_name == "first"
+
+    def test_retry_holds_back_sink_until_due(self, outbox):
+        outbox.enqueue(["teams"], [make_record("first")], "s", "m")
+        outbox.enqueue(["teams"], [make_record("second")], "s", "m")
+        (message,) = outbox.due(time.time())
+        outbox.retry(message.id, "down", time.time() + 60)
+        assert outbox.due(time.time()) == []
+        (retried,) = outbox.due(time.time() + 61)
+        assert retried.attempts == 1
+        assert retried.records[0].account_name == "first"
+
+    def test_ack_removes_message(self, outbox):
+        outbox.enqueue(["teams"], [make_record()], "s", "m")
+        (message,) = outbox.due(time.time())
+        outbox.ack(message.id)
+        assert outbox.pending() == {}
+
+    def test_queued_returns_whole_sink_queue(self, outbox):
+        outbox.enqueue(["teams", "mongo"], [make_record("first")], "s", "m")
+        outbox.enqueue(["teams"], [make_record("second")], "s", "m")
+        queued = outbox.queued("teams")
+        assert [message.records[0].account_name for message in queued] == ["first", "second"]
+        assert all(message.created_at <= time.time() for message in queued)
+
+    def test_ack_removes_several_messages(self, outbox):
+        outbox.enqueue(["teams"], [make_record("first")], "s", "m")
+        outbox.enqueue(["teams"], [make_record("second")], "s", "m")
+        outbox.ack(*(message.id for message in outbox.queued("teams")))
+        assert outbox.pending() == {}
+
+    def test_messages_survive_reopen(self, tmp_path):
+        path = str(tmp_path / "outbox.db")
+        first = SqliteOutbox(path)
+        first.enqueue(["teams"], [make_record()], "s", "m")
+        first.close()
+        reopened = SqliteOutbox(path)
+        assert reopened.pending() == {"teams": 1}
+        reopened.close()
+
+
+class TestOutboxWorker:
+    def test_delivers_and_acks(self, outbox, dispatcher):
+        sink = MagicMock()
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher)
+        record = make_record()
+        outbox.enqueue(["teams"], [record], "s", "m")
+        assert worker.drain_once() == 1
+        sink.send_notification.assert_called_once_with([record], "s", "m")
+        assert outbox.pending() == {}
+
+    def test_failed_delivery_is_retried_with_backoff(self, outbox, dispatcher):
+        sink = MagicMock()
+        sink.send_notification.side_effect = RuntimeError("webhook down")
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher, base_backoff=30)
+        outbox.enqueue(["teams"], [make_record()], "s", "m")
+        assert worker.drain_once() == 0
+        assert outbox.pending() == {"teams": 1}
+        assert outbox.due(time.time()) == []
+        (message,) = outbox.due(time.time() + 31)
+        assert message.attempts == 1
+
+    def test_failing_sink_does_not_block_others(self, outbox, dispatcher):
+        bad, good = MagicMock(), MagicMock()
+        bad.send_notification.side_effect = RuntimeError("down")
+        worker = OutboxWorker(outbox, {"bad": bad, "good": good}, dispatcher)
+        outbox.enqueue(["bad", "good"], [make_record()], "s", "m")
+        assert worker.drain_once() == 1
+        assert outbox.pending() == {"bad": 1}
+
+    def test_priority_is_preserved(self, outbox, dispatcher):
+        sink = MagicMock()
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher)
+        outbox.enqueue(["teams"], [make_record()], "s", "m", "high")
+        worker.drain_once()
+        sink.send_with_priority.assert_called_once_with([make_record()], "s", "m", "high")
+
+    def test_unknown_sink_is_dropped(self, outbox, dispatcher):
+        worker = OutboxWorker(outbox, {}, dispatcher)
+        outbox.enqueue(["removed"], [make_record()], "s", "m")
+        worker.drain_once()
+        assert outbox.pending() == {}
+
+    def test_background_thread_drains_on_wake(self, outbox, dispatcher):
+        sink = MagicMock()
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher, poll_interval=5)
+        worker.start()
+        try:
+            outbox.enqueue(["teams"], [make_record()], "s", "m")
+            worker.wake()
+            deadline = time.monotonic() + 2
+            while outbox.pending() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            worker.stop()
+        assert outbox.pending() == {}
+        sink.send_notification.assert_called_once()
+
+    def test_coalesced_sink_waits_for_window(self, outbox, dispatcher):
+        sink = MagicMock()
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher, windows={"teams": 60})
+        outbox.enqueue(["teams"], [make_record()], "s", "m")
+        assert worker.drain_once() == 0
+        sink.send_batch.assert_not_called()
+        assert outbox.pending() == {"teams": 1}
+
+    def test_coalesced_sink_sends_queue_as_one_batch(self, outbox, dispatcher):
+        sink = MagicMock()
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher, windows={"teams": 60})
+        first, second, other = make_record("first"), make_record("second"), make_record("other")
+        outbox.enqueue(["teams"], [first], "s", "m")
+        outbox.enqueue(["teams"], [other], "s2", "m2")
+        outbox.enqueue(["teams"], [second], "s", "m")
+        with patch("etl_notifier.services.notification.outbox.time.time", return_value=time.time() + 61):
+            assert worker.drain_once() == 3
+        sink.send_batch.assert_called_once_with([([first, second], "s", "m"), ([other], "s2", "m2")])
+        sink.send_notification.assert_not_called()
+        assert outbox.pending() == {}
+
+    def test_failed_coalesced_batch_is_kept(self, outbox, dispatcher):
+        sink = MagicMock()
+        sink.send_batch.side_effect = RuntimeError("webhook down")
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher, windows={"teams": 60}, base_backoff=30)
+        outbox.enqueue(["teams"], [make_record("first")], "s", "m")
+        outbox.enqueue(["teams"], [make_record("second")], "s", "m")
+        with patch("etl_notifier.services.notification.outbox.time.time", return_value=time.time() + 61):
+            assert worker.drain_once() == 0
+        assert outbox.pending() == {"teams": 2}
+        assert [message.attempts for message in outbox.queued("teams")] == [1, 0]
+
+    def test_send_past_deadline_is_not_retried_while_running(self, outbox, dispatcher):
+        release = threading.Event()
+        sink = MagicMock()
+        sink.send_notification.side_effect = lambda *args: release.wait(5)
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher, deadlines={"teams": 0.05})
+        outbox.enqueue(["teams"], [make_record()], "s", "m")
+        assert worker.drain_once() == 0
+        assert worker.drain_once() == 0
+        sink.send_notification.assert_called_once()
+        assert outbox.pending() == {"teams": 1}
+
+        release.set()
+        deadline = time.monotonic() + 2
+        while outbox.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert outbox.pending() == {}
+
+    def test_late_failure_is_retried_after_it_settles(self, outbox, dispatcher):
+        release = threading.Event()
+        sink = MagicMock()
+
+        def fail_late(*args):
+            release.wait(5)
+            raise RuntimeError("webhook down")
+
+        sink.send_notification.side_effect = fail_late
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher, deadlines={"teams": 0.05}, base_backoff=30)
+        outbox.enqueue(["teams"], [make_record()], "s", "m")
+        worker.drain_once()
+        release.set()
+        deadline = time.monotonic() + 2
+        while not outbox.queued("teams")[0].attempts and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert outbox.queued("teams")[0].attempts == 1
+        assert outbox.due(time.time()) == []
+
+    def test_gives_up_after_max_attempts(self, outbox, dispatcher):
+        sink = MagicMock()
+        sink.send_notification.side_effect = RuntimeError("webhook down")
+        metrics = NotifierMetrics()
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher, base_backoff=0, max_attempts=2, metrics=metrics)
+        outbox.enqueue(["teams"], [make_record()], "s", "m")
+        worker.drain_once()
+        assert outbox.pending() == {"teams": 1}
+        worker.drain_once()
+        assert outbox.pending() == {}
+        assert outbox.dead_letters() == {"teams": 1}
+        assert metrics.outbox_dead_letters.value(sink="teams") == 1
+
+    @pytest.mark.parametrize("status, dead", [(400, True), (404, True), (408, False), (429, False), (503, False)])
+    def test_client_errors_are_not_retried(self, outbox, dispatcher, status, dead):
+        error = RuntimeError(f"HTTP {status}")
+        error.response = MagicMock(status_code=status)
+        sink = MagicMock()
+        sink.send_notification.side_effect = error
+        worker = OutboxWorker(outbox, {"teams": sink}, dispatcher)
+        outbox.enqueue(["teams"], [make_record()], "s", "m")
+        worker.drain_once()
+        assert outbox.dead_letters() == ({"teams": 1} if dead else {})
+        assert outbox.pending() == ({} if dead else {"teams": 1})
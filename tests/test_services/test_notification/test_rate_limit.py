@@ -0,0 +1,158 @@
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from etl_notifier.models.notification_record import NotificationRecord
+from etl_notifier.services.metrics import NotifierMetrics
+from etl_notifier.services.notification.rate_limit import (
+    HIGH,
+    LOW,
+    NORMAL,
+    RateLimitedStrategy,
+    RateLimitExceeded,
+    TokenBucket,
+)
+from etl_notifier.services.notification.strategy import NotificationStrategy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def inner():
+    return Mock(spec=NotificationStrategy)
+
+
+@pytest.fixture
+def records():
+    return [NotificationRecord("acc", "dev", datetime(2025, 1, 1))]
+
+
+def make_strategy(inner, clock, rate=1.0, burst=2, max_delay=5, **kwargs):
+    return RateLimitedStrategy(
+        inner, rate=rate, burst=burst, max_delay=max_delay, sleep=clock.sleep, clock=clock, **kwargs
+    )
+
+
+class TestTokenBucket:
+    def test_burst_is_available_immediately(self, clock):
+        bucket = TokenBucket(rate=1, burst=3, clock=clock)
+        assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    def test_reservations_queue_behind_each_other(self, clock):
+        bucket = TokenBucket(rate=2, burst=1, clock=clock)
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_refills_up_to_burst(self, clock):
+        bucket = TokenBucket(rate=1, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        clock.now = 100
+        assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_reserve_beyond_max_wait_takes_nothing(self, clock):
+        bucket = TokenBucket(rate=1, burst=1, clock=clock)
+        bucket.reserve()
+        assert bucket.reserve(max_wait=0.5) is None
+        assert bucket.reserve(max_wait=1.0) == pytest.approx(1.0)
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0, burst=1)
+
+
+class TestRateLimitedStrategy:
+    def test_sends_within_burst_without_delay(self, inner, clock, records):
+        strategy = make_strategy(inner, clock)
+        strategy.send_notification(records, "s", "m")
+        strategy.send_notification(records, "s", "m")
+        assert inner.send_notification.call_count == 2
+        assert clock.now == 0
+        assert (strategy.admitted, strategy.delayed, strategy.shed) == (2, 0, 0)
+
+    def test_normal_priority_waits_up_to_max_delay(self, inner, clock, records):
+        strategy = make_strategy(inner, clock, burst=1, max_delay=5)
+        strategy.send_notification(records, "s", "m")
+        strategy.send_notification(records, "s", "m")
+        assert clock.now == pytest.approx(1.0)
+        assert strategy.delayed == 1
+
+    def test_normal_priority_sheds_beyond_max_delay(self, inner, clock, records):
+        strategy = make_strategy(inner, clock, rate=0.1, burst=1, max_delay=5)
+        strategy.send_notification(records, "s", "m")
+        with pytest.raises(RateLimitExceeded):
+            strategy.send_notification(records, "s", "m")
+        assert inner.send_notification.call_count == 1
+        assert strategy.shed == 1
+
+    def test_high_priority_always_waits(self, inner, clock, records):
+        strategy = make_strategy(inner, clock, rate=0.1, burst=1, max_delay=5)
+        strategy.send_with_priority(records, "s", "m", HIGH)
+        strategy.send_with_priority(records, "s", "m", HIGH)
+        assert inner.send_notification.call_count == 2
+        assert clock.now == pytest.approx(10.0)
+
+    def test_max_wait_caps_every_priority(self, inner, clock, records):
+        strategy = make_strategy(inner, clock, rate=0.1, burst=1, max_delay=30, max_wait=5)
+        assert strategy.max_delay == 5
+        strategy.send_with_priority(records, "s", "m", HIGH)
+        with pytest.raises(RateLimitExceeded):
+            strategy.send_with_priority(records, "s", "m", HIGH)
+        with pytest.raises(RateLimitExceeded):
+            strategy.send_batch([(records, "s", "m")])
+        assert clock.now == 0
+        assert strategy.shed == 2
+
+    def test_outcomes_are_recorded_in_shared_counter(self, inner, clock, records):
+        outcomes = NotifierMetrics().rate_limit
+        strategy = make_strategy(inner, clock, burst=1, outcomes=outcomes, name="teams")
+        strategy.send_notification(records, "s", "m")
+        strategy.send_notification(records, "s", "m")
+        with pytest.raises(RateLimitExceeded):
+            strategy.send_with_priority(records, "s", "m", LOW)
+        assert outcomes.value(sink="teams", outcome="admitted") == 2
+        assert outcomes.value(sink="teams", outcome="delayed") == 1
+        assert outcomes.value(sink="teams", outcome="shed") == 1
+
+    def test_low_priority_never_waits(self, inner, clock, records):
+        strategy = make_strategy(inner, clock, burst=1)
+        strategy.send_with_priority(records, "s", "m", LOW)
+        with pytest.raises(RateLimitExceeded):
+            strategy.send_with_priority(records, "s", "m", LOW)
+        assert clock.now == 0
+
+    def test_shed_send_does_not_consume_capacity(self, inner, clock, records):
+        strategy = make_strategy(inner, clock, burst=1)
+        strategy.send_with_priority(records, "s", "m", LOW)
+        with pytest.raises(RateLimitExceeded):
+            strategy.send_with_priority(records, "s", "m", LOW)
+        clock.now = 1.0
+        strategy.send_with_priority(records, "s", "m", NORMAL)
+        assert clock.now == 1.0
+
+    def test_batches_are_never_shed(self, inner, clock, records):
+        strategy = make_strategy(inner, clock, rate=0.1, burst=1, max_delay=0)
+        strategy.send_batch([(records, "s", "m")])
+        strategy.send_batch([(records, "s", "m")])
+        assert inner.send_batch.call_count == 2
+
+    def test_close_closes_inner(self, inner, clock):
+        make_strategy(inner, clock).close()
+        inner.close.assert_called_once()
@@ -1,10 +1,14 @@
+import json
+
 import pytest
 import requests
 from datetime import datetime
 from unittest.mock import Mock, patch
 
 from etl_notifier.models.notification_record import NotificationRecord
+from etl_notifier.services.notification.http_session import RETRY_STATUSES, close_sessions, get_session
 from etl_notifier.services.notification.teams_strategy import TeamsNotificationStrategy
+from etl_notifier.services.tracing import SpanExporter, Tracer
 
 
 @pytest.fixture
@@ -25,25 +29,41 @@ def records():
     ]
 
 
+def posted_message(mock_post):
+    return json.loads(mock_post.call_args[1]["data"])["attachments"][0]["content"]["content"]
+
+
 class TestTeamsNotificationStrategy:
     def test_send_notification_posts_to_webhook(self, strategy, records):
-        with patch("requests.post") as mock_post:
+        with patch.object(strategy._session, "post") as mock_post:
             mock_post.return_value.raise_for_status = Mock()
             strategy.send_notification(records, "{account} {env}", "Multiple:")
             mock_post.assert_called_once()
             assert mock_post.call_args[0][0] == "http://test-webhook.url"
 
     def test_send_notification_calls_raise_for_status(self, strategy, records):
-        with patch("requests.post") as mock_post:
+        with patch.object(strategy._session, "post") as mock_post:
             strategy.send_notification(records, "{account}", "Multiple:")
             mock_post.return_value.raise_for_status.assert_called_once()
 
     def test_send_notification_raises_on_http_error(self, strategy, records):
-        with patch("requests.post") as mock_post:
+        with patch.object(strategy._session, "post") as mock_post:
             mock_post.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError("500")
             with pytest.raises(requests.exceptions.HTTPError):
                 strategy.send_notification(records, "{account}", "Multiple:")
 
+    def test_http_status_is_recorded_on_current_span(self, strategy, records):
+        exporter = Mock(spec=SpanExporter)
+        with patch.object(strategy._session, "post") as mock_post:
+            mock_post.return_value.status_code = 500
+            mock_post.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError("500")
+            with pytest.raises(requests.exceptions.HTTPError):
+                with Tracer(exporter).span("sink.send"):
+                    strategy.send_notification(records, "{account}", "Multiple:")
+        span = exporter.export.call_args[0][0]
+        assert span.attributes["http.status_code"] == 500
+        assert span.error.startswith("HTTPError")
+
     def test_build_payload_structure(self, strategy):
         payload = strategy._build_payload("Test message")
         assert payload["type"] == "message"
@@ -51,3 +71,73 @@ class TestTeamsNotificationStrategy:
         attachment = payload["attachments"][0]
         assert attachment["contentType"] == "application/vnd.microsoft.teams.card.o365connector"
         assert attachment["content"]["content"] == "Test message"
+
+    def test_posted_body_matches_built_payload(self, strategy, records):
+        with patch.object(strategy._session, "post") as mock_post:
+            strategy.send_notification(records, "{account} \"quoted\" ü", "Multiple:")
+        body = json.loads(mock_post.call_args[1]["data"])
+        assert body == strategy._build_payload(posted_message(mock_post))
+        assert posted_message(mock_post).endswith('TestAccount "quoted" ü')
+        assert mock_post.call_args[1]["headers"]["Content-Type"] == "application/json"
+
+    def test_send_notification_uses_connect_and_read_timeouts(self, records):
+        strategy = TeamsNotificationStrategy(webhook_url="http://test-webhook.url", timeout=7, connect_timeout=2)
+        with patch.object(strategy._session, "post") as mock_post:
+            strategy.send_notification(records, "{account}", "Multiple:")
+            assert mock_post.call_args.kwargs["timeout"] == (2, 7)
+
+    def test_strategies_on_same_host_share_session(self):
+        first = TeamsNotificationStrategy(webhook_url="https://hooks.example/a")
+        second = TeamsNotificationStrategy(webhook_url="https://hooks.example/b")
+        other = TeamsNotificationStrategy(webhook_url="https://other.example/a")
+        assert first._session is second._session
+        assert first._session is not other._session
+
+
+class TestHttpSession:
+    def test_retry_policy_honours_retry_after_on_throttling(self):
+        session = get_session("https://retry.example/hook", retries=4, backoff_factor=1.5)
+        retry = session.get_adapter("https://retry.example/hook").max_retries
+        assert retry.total == 4
+        assert retry.backoff_factor == 1.5
+        assert set(RETRY_STATUSES) <= set(retry.status_forcelist)
+        assert 429 in retry.status_forcelist
+        assert "POST" in retry.allowed_methods
+        assert retry.respect_retry_after_header
+
+    def test_post_is_only_retried_when_not_processed(self):
+        session = get_session("https://idempotent.example/hook")
+        retry = session.get_adapter("https://idempotent.example/hook").max_retries
+        assert set(retry.status_forcelist) == {429, 503}
+        assert retry.connect == 3
+        assert retry.read == 0
+
+    def test_retry_sleeps_fit_in_max_retry_wait(self):
+        session = get_session("https://bounded.example/hook", retries=4, backoff_factor=10, max_retry_wait=8)
+        retry = session.get_adapter("https://bounded.example/hook").max_retries
+        assert retry.get_retry_after(Mock(headers={"Retry-After": "3600"})) == 2
+        retry = retry.increment(method="POST", url="/hook").increment(method="POST", url="/hook")
+        assert retry.max_sleep == 2
+        assert retry.get_backoff_time() == 2
+
+    def test_close_sessions_drops_cached_sessions(self):
+        session = get_session("https://close.example/hook")
+        close_sessions()
+        assert get_session("https://close.example/hook") is not session
+
+
+class TestTeamsSendBatch:
+    def test_batches_merge_into_one_post(self, strategy, records):
+        second = NotificationRecord("Other", "Staging", datetime(2025, 1, 2), url="http://x")
+        with patch.object(strategy._session, "post") as mock_post:
+            strategy.send_batch([(records, "{account}", "Failures:"), ([second], "{account}", "Long running:")])
+        mock_post.assert_called_once()
+        message = posted_message(mock_post)
+        assert "Failures:" in message and "Long running:" in message
+        assert "TestAccount" in message and "Other" in message
+
+    def test_single_batch_uses_regular_formatting(self, strategy, records):
+        with patch.object(strategy._session, "post") as mock_post:
+            strategy.send_batch([(records, "single {account}", "Multiple:")])
+        message = posted_message(mock_post)
+        assert "single TestAccount" in message
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+
+from etl_notifier.models.notification_record import NotificationRecord
+from etl_notifier.services.notification.template import MessageTemplate, compile_template
+
+
+@pytest.fixture
+def record():
+    return NotificationRecord(
+        account_name="TestAccount",
+        environment="Production",
+        start_time=datetime(2025, 1, 1),
+        url="http://pipeline/1",
+        error_message="Boom",
+        over_hour="2",
+    )
+
+
+class TestMessageTemplate:
+    def test_renders_all_placeholders(self, record):
+        template = MessageTemplate("{account}|{env}|{url}|{errorMessage}|{over_hour}")
+        assert template.render(record) == "TestAccount|Production|http://pipeline/1|Boom|2"
+
+    def test_matches_format_map(self, record):
+        source = "{{literal}} {account!r:>15} in {env}"
+        expected = source.format_map({"account": "TestAccount", "env": "Production"})
+        assert MessageTemplate(source).render(record) == expected
+
+    def test_missing_fields_render_empty(self):
+        record = NotificationRecord("Acct", "Dev", datetime(2025, 1, 1))
+        assert MessageTemplate("{url}|{errorMessage}|{over_hour}").render(record) == "||"
+
+    def test_plain_text(self, record):
+        assert MessageTemplate("No placeholders").render(record) == "No placeholders"
+
+    @pytest.mark.parametrize("source", ["{acount}", "{}", "{0}", "{account.upper}", "{account[0]}"])
+    def test_unknown_placeholder_raises(self, source):
+        with pytest.raises(ValueError, match="Unknown placeholder"):
+            MessageTemplate(source)
+
+    @pytest.mark.parametrize("source", ["{account", "{account!x}", "{account:d}", "{account:{env}}"])
+    def test_malformed_template_raises(self, source):
+        with pytest.raises(ValueError):
+            MessageTemplate(source)
+
+    def test_compile_template_is_cached(self):
+        assert compile_template("{account}") is compile_template("{account}")
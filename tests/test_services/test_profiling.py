@@ -0,0 +1,86 @@
+import logging
+import os
+import pstats
+import signal
+import tracemalloc
+
+import pytest
+
+from etl_notifier.services.profiling import CycleProfiler, install_signal_handler
+
+
+def build_cache(size):
+    return {f"key-{i}": {"state": "confirmed"} for i in range(size)}
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    return CycleProfiler(str(tmp_path / "profiles"), top=5)
+
+
+def profile_files(profiler):
+    return sorted(os.listdir(profiler.directory)) if os.path.isdir(profiler.directory) else []
+
+
+class TestCycleProfiler:
+    def test_inactive_by_default(self, profiler):
+        assert profiler.profile() is profiler.profile()
+        with profiler.profile():
+            build_cache(10)
+        assert profile_files(profiler) == []
+
+    def test_profiles_only_requested_cycles(self, profiler):
+        profiler.request(2)
+        for _ in range(3):
+            with profiler.profile():
+                build_cache(10)
+        assert profiler.pending == 0
+        files = profile_files(profiler)
+        assert len([name for name in files if name.endswith(".prof")]) == 2
+        assert len([name for name in files if name.endswith(".tracemalloc")]) == 2
+
+    def test_writes_loadable_stats_and_logs_hotspots(self, profiler, caplog):
+        profiler.request(1)
+        with caplog.at_level(logging.INFO, logger="etl_notifier.services.profiling"):
+            with profiler.profile():
+                cache = build_cache(1000)
+        prof = next(name for name in profile_files(profiler) if name.endswith(".prof"))
+        stats = pstats.Stats(os.path.join(profiler.directory, prof))
+        assert any(func[2] == "build_cache" for func in stats.stats)
+        assert "build_cache" in caplog.text
+        assert "test_profiling.py" in caplog.text  # allocation site of the cache entries
+        assert len(cache) == 1000
+
+    def test_stops_tracemalloc_it_started(self, profiler):
+        profiler.request(1)
+        with profiler.profile():
+            assert tracemalloc.is_tracing()
+        assert not tracemalloc.is_tracing()
+
+    def test_leaves_existing_tracemalloc_running(self, profiler):
+        tracemalloc.start()
+        try:
+            profiler.request(1)
+            with profiler.profile():
+                pass
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+    def test_failed_cycle_is_still_profiled(self, profiler):
+        profiler.request(1)
+        with pytest.raises(RuntimeError):
+            with profiler.profile():
+                raise RuntimeError("boom")
+        assert any(name.endswith(".prof") for name in profile_files(profiler))
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="SIGUSR1 is not available on this platform")
+def test_signal_requests_cycles(profiler):
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert install_signal_handler(profiler, cycles=3)
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert profiler.pending == 3
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
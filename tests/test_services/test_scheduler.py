@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+
+from etl_notifier.services.scheduler import CronExpression, QueryScheduler, Schedule, build_schedule
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestCronExpression:
+    @pytest.mark.parametrize("expression, moment, expected", [
+        ("*/15 * * * *", datetime(2025, 1, 1, 10, 7, 30), datetime(2025, 1, 1, 10, 15)),
+        ("*/15 * * * *", datetime(2025, 1, 1, 10, 15), datetime(2025, 1, 1, 10, 30)),
+        ("0 2 * * *", datetime(2025, 1, 1, 10, 0), datetime(2025, 1, 2, 2, 0)),
+        ("30 9 * * 1-5", datetime(2025, 1, 3, 10, 0), datetime(2025, 1, 6, 9, 30)),  # Friday -> Monday
+        ("0 0 1 * *", datetime(2025, 12, 15), datetime(2026, 1, 1)),
+        ("0 0 * * 7", datetime(2025, 1, 1), datetime(2025, 1, 5)),  # 7 is Sunday
+        ("0 0 13 * 5", datetime(2025, 1, 1), datetime(2025, 1, 3)),  # day-of-month OR day-of-week
+        ("5,10 8-9/1 * * *", datetime(2025, 1, 1, 8, 6), datetime(2025, 1, 1, 8, 10)),
+    ])
+    def test_next_after(self, expression, moment, expected):
+        assert CronExpression(expression).next_after(moment) == expected
+
+    @pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "*/0 * * * *", "a * * * *", "5-1 * * * *"])
+    def test_invalid_expressions_raise(self, expression):
+        with pytest.raises(ValueError):
+            CronExpression(expression)
+
+    def test_impossible_date_raises(self):
+        with pytest.raises(ValueError, match="never matches"):
+            CronExpression("0 0 30 2 *").next_after(datetime(2025, 1, 1))
+
+
+class TestSchedule:
+    def test_interval_ticks_are_aligned(self):
+        schedule = Schedule(interval=30)
+        assert schedule.next_after(1000) == 1020
+        assert schedule.next_after(1020) == 1050
+
+    def test_requires_exactly_one_of_interval_or_cron(self):
+        with pytest.raises(ValueError):
+            Schedule()
+        with pytest.raises(ValueError):
+            Schedule(interval=30, cron="* * * * *")
+        with pytest.raises(ValueError):
+            Schedule(interval=0)
+
+    def test_build_schedule_defaults_to_global_interval(self):
+        assert build_schedule({}, 300).interval == 300
+        assert build_schedule({"interval": 30}, 300).interval == 30
+        assert build_schedule({"cron": "*/5 * * * *"}, 300).cron is not None
+
+
+class TestQueryScheduler:
+    def test_all_queries_due_at_start(self):
+        scheduler = QueryScheduler({"a": Schedule(interval=30), "b": Schedule(interval=900)}, clock=FakeClock(1000))
+        assert sorted(scheduler.due()) == ["a", "b"]
+        assert scheduler.due() == []
+        assert scheduler.next_due() == 1020
+
+    def test_queries_run_on_their_own_cadence(self):
+        clock = FakeClock(0)
+        scheduler = QueryScheduler({"fast": Schedule(interval=30), "slow": Schedule(interval=90)}, clock=clock)
+        runs = []
+        for now in range(0, 181, 30):
+            clock.now = now
+            runs.append(sorted(scheduler.due()))
+        assert runs == [["fast", "slow"], ["fast"], ["fast"], ["fast", "slow"], ["fast"], ["fast"], ["fast", "slow"]]
+
+    def test_late_run_does_not_drift(self):
+        clock = FakeClock(0)
+        scheduler = QueryScheduler({"a": Schedule(interval=30)}, clock=clock)
+        scheduler.due()
+        clock.now = 37  # dispatched late
+        assert scheduler.due() == ["a"]
+        assert scheduler.next_due() == 60
+
+    def test_missed_ticks_are_skipped(self):
+        clock = FakeClock(0)
+        scheduler = QueryScheduler({"a": Schedule(interval=30)}, clock=clock)
+        scheduler.due()
+        clock.now = 100
+        assert scheduler.due() == ["a"]
+        assert scheduler.next_due() == 120
+
+    def test_jitter_delays_dispatch_but_not_ticks(self):
+        clock = FakeClock(0)
+        scheduler = QueryScheduler({"a": Schedule(interval=30)}, jitter=10, clock=clock, rng=lambda: 0.5)
+        scheduler.due()
+        assert scheduler.next_due() == 35
+        clock.now = 35
+        scheduler.due()
+        assert scheduler.next_due() == 65
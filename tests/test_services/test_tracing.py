@@ -0,0 +1,132 @@
+import contextvars
+import json
+import threading
+
+import pytest
+
+from etl_notifier.services.tracing import NOOP_SPAN, JsonlFileExporter, SpanExporter, Tracer, current_span
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def exporter():
+    return ListExporter()
+
+
+class TestTracer:
+    def test_disabled_without_exporter(self):
+        tracer = Tracer()
+        with tracer.span("cycle") as span:
+            assert span is NOOP_SPAN
+            assert current_span() is NOOP_SPAN
+
+    def test_children_share_trace_and_link_to_parent(self, exporter):
+        tracer = Tracer(exporter)
+        with tracer.span("cycle") as root:
+            with tracer.span("query", query="failures") as child:
+                assert current_span() is child
+            assert current_span() is root
+        assert current_span() is NOOP_SPAN
+
+        query, cycle = exporter.spans
+        assert (query.name, cycle.name) == ("query", "cycle")
+        assert cycle.parent_id is None
+        assert query.parent_id == cycle.span_id
+        assert query.trace_id == cycle.trace_id
+        assert query.attributes == {"query": "failures"}
+        assert cycle.duration >= query.duration >= 0
+
+    def test_separate_roots_start_new_traces(self, exporter):
+        tracer = Tracer(exporter)
+        with tracer.span("a"):
+            pass
+        with tracer.span("b"):
+            pass
+        assert exporter.spans[0].trace_id != exporter.spans[1].trace_id
+
+    def test_error_is_recorded_and_propagated(self, exporter):
+        tracer = Tracer(exporter)
+        with pytest.raises(RuntimeError):
+            with tracer.span("query"):
+                raise RuntimeError("timeout")
+        record = exporter.spans[0].to_dict()
+        assert record["status"] == "error"
+        assert record["error"] == "RuntimeError: timeout"
+
+    def test_unsampled_trace_records_no_children(self, exporter):
+        tracer = Tracer(exporter, sample_rate=0.5, rng=lambda: 0.9)
+        with tracer.span("cycle") as root:
+            with tracer.span("query") as child:
+                child.set_attribute("rows", 1)
+        assert root is NOOP_SPAN
+        assert exporter.spans == []
+
+    def test_sampled_trace_is_recorded(self, exporter):
+        tracer = Tracer(exporter, sample_rate=0.5, rng=lambda: 0.1)
+        with tracer.span("cycle"):
+            with tracer.span("query"):
+                pass
+        assert [span.name for span in exporter.spans] == ["query", "cycle"]
+
+    def test_invalid_sample_rate_raises(self, exporter):
+        with pytest.raises(ValueError):
+            Tracer(exporter, sample_rate=1.5)
+
+    def test_copied_context_parents_spans_on_other_threads(self, exporter):
+        tracer = Tracer(exporter)
+        with tracer.span("cycle") as root:
+            context = contextvars.copy_context()
+
+            def work():
+                with tracer.span("sink.send"):
+                    pass
+
+            thread = threading.Thread(target=context.run, args=(work,))
+            thread.start()
+            thread.join()
+        assert exporter.spans[0].parent_id == root.span_id
+
+    def test_export_error_does_not_propagate(self):
+        class FailingExporter(SpanExporter):
+            def export(self, span):
+                raise OSError("disk full")
+
+        with Tracer(FailingExporter()).span("cycle"):
+            pass
+
+
+class TestJsonlFileExporter:
+    def test_writes_one_line_per_span(self, tmp_path):
+        path = tmp_path / "trace.jsonl"
+        exporter = JsonlFileExporter(str(path))
+        tracer = Tracer(exporter)
+        with tracer.span("cycle"):
+            with tracer.span("query", rows=3):
+                pass
+        tracer.close()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["name"] for line in lines] == ["query", "cycle"]
+        assert lines[0]["attributes"] == {"rows": 3}
+        assert lines[0]["parent_id"] == lines[1]["span_id"]
+        assert lines[0]["status"] == "ok"
+
+    def test_rotates_at_max_bytes(self, tmp_path):
+        path = tmp_path / "trace.jsonl"
+        tracer = Tracer(JsonlFileExporter(str(path), max_bytes=1, backup_count=2))
+        for name in ("a", "b", "c"):
+            with tracer.span(name):
+                pass
+        tracer.close()
+
+        assert not path.exists()
+        assert json.loads((tmp_path / "trace.jsonl.1").read_text())["name"] == "c"
+        assert json.loads((tmp_path / "trace.jsonl.2").read_text())["name"] == "b"
+        assert not (tmp_path / "trace.jsonl.3").exists()